@@ -2,10 +2,10 @@
 """
 Backup database utility - Creates a timestamped backup of the database.
 """
+import sqlite3
 import sys
 from pathlib import Path
 from datetime import datetime
-import shutil
 
 # Add src directory to Python path
 src_path = Path(__file__).parent.parent / "src"
@@ -30,8 +30,15 @@ def backup_database():
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     backup_file = backup_dir / f"pdf_insight_{timestamp}.db"
     
-    # Copy database
-    shutil.copy2(db_file, backup_file)
+    # Copy database page by page through SQLite, so a concurrent writer cannot
+    # leave a torn copy and commits still in the WAL file are included
+    source = sqlite3.connect(str(db_file))
+    target = sqlite3.connect(str(backup_file))
+    try:
+        source.backup(target, pages=1024)
+    finally:
+        target.close()
+        source.close()
     
     # Get file sizes
     original_size = db_file.stat().st_size
@@ -3,6 +3,7 @@
 Clean data directories utility.
 Removes extracted images, text files, and optionally processed PDFs.
 """
+import os
 import sys
 from pathlib import Path
 import shutil
@@ -14,11 +15,30 @@ sys.path.insert(0, str(src_path))
 import config
 
 
+def iter_files(directory):
+    """
+    Yield paths of all files below a directory.
+    
+    Walks with os.scandir so file types come from the directory entries
+    instead of a stat() call per file. Symlinked directories are not followed.
+    """
+    stack = [directory]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file():
+                    yield entry.path
+
+
 def count_files(directory):
     """Count files in a directory."""
-    if not directory.exists():
-        return 0
-    return len([f for f in directory.rglob("*") if f.is_file()])
+    return sum(1 for _ in iter_files(directory))
 
 
 def clean_directory(directory, description):
@@ -27,16 +47,16 @@ def clean_directory(directory, description):
         print(f"  {description}: Directory does not exist")
         return 0
     
-    file_count = count_files(directory)
+    # Remove all files in a single pass
+    file_count = 0
+    for path in iter_files(directory):
+        os.unlink(path)
+        file_count += 1
+    
     if file_count == 0:
         print(f"  {description}: Already empty")
         return 0
     
-    # Remove all files
-    for item in directory.rglob("*"):
-        if item.is_file():
-            item.unlink()
-    
     print(f"  {description}: Deleted {file_count} file(s)")
     return file_count
 
@@ -3,15 +3,20 @@
 Move PDFs back to pending directory.
 Useful for reprocessing PDFs with updated logic.
 """
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-import shutil
 
 # Add src directory to Python path
 src_path = Path(__file__).parent.parent / "src"
 sys.path.insert(0, str(src_path))
 
 import config
+from file_manager import FileManager
+
+# Renames are metadata-only, so a few threads are enough to overlap them
+MOVE_WORKERS = 8
 
 
 def move_pdfs_back():
@@ -24,7 +29,11 @@ def move_pdfs_back():
         return
     
     # Get all PDFs
-    pdf_files = list(processed_dir.glob("*.pdf"))
+    with os.scandir(processed_dir) as entries:
+        pdf_files = [
+            entry for entry in entries
+            if entry.name.endswith(".pdf") and entry.is_file(follow_symlinks=False)
+        ]
     
     if not pdf_files:
         print(f"✓ No PDF files found in: {processed_dir}")
@@ -42,23 +51,37 @@ def move_pdfs_back():
     # Ensure pending directory exists
     pending_dir.mkdir(parents=True, exist_ok=True)
     
-    # Move files
-    moved = 0
+    # Check duplicates against one listing of the pending directory
+    pending_names = set(os.listdir(pending_dir))
+    to_move = []
+    skipped = 0
     for pdf_file in pdf_files:
-        dest = pending_dir / pdf_file.name
-        
-        # Handle duplicates
-        if dest.exists():
+        if pdf_file.name in pending_names:
             print(f"  ⚠️  Skipping {pdf_file.name} (already exists in pending)")
-            continue
-        
-        shutil.move(str(pdf_file), str(dest))
-        moved += 1
-        print(f"  ✓ Moved: {pdf_file.name}")
+            skipped += 1
+        else:
+            to_move.append(pdf_file)
+    
+    # Move files; names are distinct, so the moves don't interfere
+    moved = 0
+    with ThreadPoolExecutor(max_workers=MOVE_WORKERS) as executor:
+        futures = {
+            executor.submit(FileManager.rename_file, pdf_file.path, pending_dir / pdf_file.name): pdf_file
+            for pdf_file in to_move
+        }
+        for future in as_completed(futures):
+            name = futures[future].name
+            try:
+                future.result()
+            except OSError as e:
+                print(f"  ✗ Failed to move {name}: {e}")
+                continue
+            moved += 1
+            print(f"  ✓ Moved: {name}")
     
     print(f"\n✓ Moved {moved} file(s) back to pending directory")
-    if moved < len(pdf_files):
-        print(f"  Skipped {len(pdf_files) - moved} duplicate(s)")
+    if skipped:
+        print(f"  Skipped {skipped} duplicate(s)")
 
 
 if __name__ == "__main__":
@@ -3,10 +3,12 @@ PDF-Insight: Batch PDF processing application.
 Extracts metadata and images from PDF files.
 """
 import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 import config
-from pdf_processor import PDFProcessor
 from file_manager import FileManager
 from database import Database
 
@@ -25,6 +27,308 @@ def setup_logging():
     )
 
 
+# Forking would copy the locks held by the parent's other threads (the web
+# server's threadpool, the embeddings warm-up) into the workers, so they are
+# started from a clean process instead
+_WORKER_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+def _init_worker(settings):
+    """
+    Set up a worker process with the configuration of the parent process.
+    
+    Workers are not forked, so they don't see configuration changed at runtime
+    or the logging set up by the parent unless it is passed on.
+    
+    Args:
+        settings (dict): Upper-case config values of the parent process
+    """
+    vars(config).update(settings)
+    setup_logging()
+
+
+def _get_max_workers(num_files):
+    """
+    Compute the number of worker processes for a batch.
+    
+    Args:
+        num_files (int): Number of PDF files in the batch
+        
+    Returns:
+        int: Number of worker processes to use
+    """
+    cpu_count = config.MAX_WORKERS or os.cpu_count() or 1
+    return min(cpu_count, max(1, num_files))
+
+
+def _read_pdf_bytes(pdf_path, max_size):
+    """
+    Read a PDF into memory ahead of parsing it.
+    
+    Args:
+        pdf_path (Path): Path to the PDF file
+        max_size (int): Files at least this large are left to open_pdf
+        
+    Returns:
+        bytes or None: File contents, or None if too large or unreadable
+    """
+    try:
+        with open(pdf_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size >= max_size:
+                return None
+            return f.read()
+    except OSError:
+        # open_pdf reports the error when it opens the file itself
+        return None
+
+
+def process_one(pdf_path, hex_id, data=None):
+    """
+    Extract metadata, images and text from a single PDF.
+    
+    Runs in a worker process, so it only touches the file system; database
+    writes are left to the parent process.
+    
+    Args:
+        pdf_path (Path): Path to the PDF file
+        hex_id (str): Hexadecimal identifier for output file naming
+        data (bytes, optional): Contents of the PDF, already read into memory
+        
+    Returns:
+        dict: Extraction result (filename, metadata, images_info,
+              text_filename, word_count, error)
+    """
+    logger = logging.getLogger(__name__)
+    filename = pdf_path.name
+    result = {
+        'filename': filename,
+        'metadata': None,
+        'images_info': [],
+        'text_filename': None,
+        'word_count': None,
+        'error': None
+    }
+    
+    # Imported here so runs with nothing to process never load pypdf
+    from pdf_processor import PDFProcessor
+    pdf_processor = PDFProcessor()
+    
+    # Open PDF
+    reader = pdf_processor.open_pdf(pdf_path, data)
+    if not reader:
+        result['error'] = f"Failed to open PDF: {filename}"
+        return result
+    
+    # Walk the pages once and share the result between extraction steps
+    scan = pdf_processor.scan_pages(reader)
+    
+    # Extract metadata
+    metadata = pdf_processor.get_complete_metadata(reader, scan)
+    if not metadata:
+        result['error'] = f"Failed to extract metadata from: {filename}"
+        return result
+    result['metadata'] = metadata
+    
+    # Extract images if configured
+    if config.EXTRACT_IMAGES:
+        result['images_info'] = pdf_processor.extract_images(
+            reader, 
+            filename, 
+            config.IMAGES_DIR,
+            hex_id,
+            config.IMAGE_NAME_TEMPLATE,
+            scan=scan
+        )
+    
+    # Extract text if configured
+    if config.EXTRACT_TEXT:
+        # Hand over the page texts as they are, save_text_file writes them one by one
+        _, word_count, _, text_pages, _ = scan
+        text_filename, text_file_path = FileManager.save_text_file(
+            pdf_path.stem, 
+            text_pages, 
+            config.TEXT_DIR,
+            hex_id
+        )
+        
+        if text_filename and text_file_path:
+            result['text_filename'] = text_filename
+            result['word_count'] = word_count
+            logger.info(f"Extracted text saved to: {text_file_path} ({word_count} words)")
+        else:
+            logger.error(f"Failed to save extracted text for: {filename}")
+    
+    return result
+
+
+def save_result(db, result, file_hash=None):
+    """
+    Persist the extraction result of a single PDF to the database.
+    
+    Args:
+        db (Database): Database instance
+        result (dict): Result returned by process_one
+        file_hash (str, optional): SHA-256 hex digest of the PDF file
+        
+    Returns:
+        bool: True if the PDF was saved, False otherwise
+    """
+    logger = logging.getLogger(__name__)
+    filename = result['filename']
+    
+    if result['error']:
+        logger.error(result['error'])
+        return False
+    
+    # Write the document, its images and its text in one transaction, so a
+    # failed write leaves nothing of this PDF behind
+    try:
+        with db.transaction():
+            pdf_id = db.add_pdf_document(filename, result['metadata'], file_hash)
+            
+            # A filename saved before keeps its id; drop the references of its previous extraction
+            db.delete_pdf_children(pdf_id)
+            
+            # Save image references to database
+            if config.EXTRACT_IMAGES:
+                db.add_images_many(pdf_id, result['images_info'])
+            
+            # Save text reference to database
+            if result['text_filename']:
+                db.add_text(pdf_id, result['text_filename'], result['word_count'])
+    except Exception as e:
+        logger.error(f"Failed to save metadata for: {filename}: {e}")
+        return False
+    
+    logger.info(f"Successfully saved metadata for: {filename} (PDF ID: {pdf_id})")
+    if config.EXTRACT_IMAGES:
+        logger.info(f"Extracted and registered {len(result['images_info'])} image(s) from: {filename}")
+    
+    return True
+
+
+def select_pending(db, file_manager, pdf_files):
+    """
+    Filter out PDFs that were already processed and assign hex IDs to the rest.
+    
+    When SKIP_PROCESSED_FILES is set, files are skipped by name and then by
+    content hash, so renamed copies of a processed file are skipped too, as
+    are repeats of the same content within pdf_files.
+    
+    Args:
+        db (Database): Database instance
+        file_manager (FileManager): File manager used to hash the files
+        pdf_files (list): Paths of the PDF files found, in processing order
+        
+    Returns:
+        tuple: (pending, file_hashes, skipped_count) where pending is a list of
+               (pdf_path, hex_id) tuples and file_hashes maps each pending path
+               to its SHA-256 hex digest
+    """
+    logger = logging.getLogger(__name__)
+    
+    pending = []
+    file_hashes = {}
+    skipped_count = 0
+    seen_hashes = set()
+    hex_ids = iter(Database.hex_id_stream(len(pdf_files), config.HEX_ID_LENGTH))
+    processed_names = (
+        db.pdf_exists_many(pdf_path.name for pdf_path in pdf_files)
+        if config.SKIP_PROCESSED_FILES else set()
+    )
+    candidates = []
+    for pdf_path in pdf_files:
+        filename = pdf_path.name
+        if filename in processed_names:
+            logger.info(f"Skipping {filename} (already processed)")
+            skipped_count += 1
+            continue
+        candidates.append(pdf_path)
+    
+    # Hash the remaining files concurrently, then keep them in listing order
+    candidate_hashes = file_manager.get_file_hashes(candidates)
+    if config.SKIP_PROCESSED_FILES:
+        # Contents already in the database, looked up in one query
+        seen_hashes = db.pdf_exists_by_hash_many(
+            file_hash for file_hash in candidate_hashes if file_hash
+        )
+    for pdf_path, file_hash in zip(candidates, candidate_hashes):
+        filename = pdf_path.name
+        
+        # Renamed copies of an already processed file are skipped by content
+        if config.SKIP_PROCESSED_FILES and file_hash and file_hash in seen_hashes:
+            logger.info(f"Skipping {filename} (identical content already processed)")
+            skipped_count += 1
+            continue
+        file_hashes[pdf_path] = file_hash
+        seen_hashes.add(file_hash)
+        
+        # Assign a unique hex ID to this PDF
+        pending.append((pdf_path, next(hex_ids)))
+    
+    return pending, file_hashes, skipped_count
+
+
+def iter_results(pending):
+    """
+    Process PDFs and yield their extraction results as they complete.
+    
+    Small batches are processed serially, reading the next PDF on a thread
+    while the current one is parsed; larger ones are spread over a process
+    pool since extraction is CPU-bound.
+    
+    Args:
+        pending (list): List of (pdf_path, hex_id) tuples
+        
+    Yields:
+        tuple: (pdf_path, result, error) where error is the raised exception or None
+    """
+    logger = logging.getLogger(__name__)
+    
+    if len(pending) < config.PARALLEL_MIN_FILES:
+        # Files large enough to be memory-mapped are not read ahead
+        from pdf_processor import MMAP_MIN_SIZE
+        
+        with ThreadPoolExecutor(max_workers=1) as prefetcher:
+            next_data = None
+            if pending:
+                next_data = prefetcher.submit(_read_pdf_bytes, pending[0][0], MMAP_MIN_SIZE)
+            for i, (pdf_path, hex_id) in enumerate(pending):
+                data = next_data.result()
+                if i + 1 < len(pending):
+                    next_data = prefetcher.submit(_read_pdf_bytes, pending[i + 1][0], MMAP_MIN_SIZE)
+                
+                logger.info(f"\n--- Processing: {pdf_path.name} ---")
+                try:
+                    yield pdf_path, process_one(pdf_path, hex_id, data), None
+                except Exception as e:
+                    yield pdf_path, None, e
+        return
+    
+    max_workers = _get_max_workers(len(pending))
+    logger.info(f"Processing {len(pending)} file(s) with {max_workers} worker(s)")
+    
+    settings = {name: value for name, value in vars(config).items() if name.isupper()}
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=_WORKER_CONTEXT,
+        initializer=_init_worker,
+        initargs=(settings,)
+    ) as executor:
+        futures = {
+            executor.submit(process_one, pdf_path, hex_id): pdf_path
+            for pdf_path, hex_id in pending
+        }
+        for future in as_completed(futures):
+            pdf_path = futures[future]
+            try:
+                yield pdf_path, future.result(), None
+            except Exception as e:
+                yield pdf_path, None, e
+
+
 def run():
     """Main application entry point."""
     setup_logging()
@@ -36,7 +340,6 @@ def run():
     
     try:
         # Initialize components
-        pdf_processor = PDFProcessor()
         file_manager = FileManager()
         db = Database(config.DATABASE_FILE)
         
@@ -49,93 +352,21 @@ def run():
         
         logger.info(f"Found {len(pdf_files)} PDF file(s) to process")
         
-        # Process each PDF file
         processed_count = 0
-        skipped_count = 0
         error_count = 0
         
-        for pdf_path in pdf_files:
-            filename = pdf_path.name
-            logger.info(f"\n--- Processing: {filename} ---")
-            
-            try:
-                # Check if already processed
-                if config.SKIP_PROCESSED_FILES and db.pdf_exists(filename):
-                    logger.info(f"Skipping {filename} (already processed)")
-                    skipped_count += 1
-                    continue
-                
-                # Generate unique hex ID for this PDF
-                hex_id = Database.generate_hex_id(config.HEX_ID_LENGTH)
-                
-                # Open PDF
-                reader = pdf_processor.open_pdf(pdf_path)
-                if not reader:
-                    logger.error(f"Failed to open PDF: {filename}")
-                    error_count += 1
-                    continue
-                
-                # Extract metadata
-                metadata = pdf_processor.get_complete_metadata(reader)
-                if not metadata:
-                    logger.error(f"Failed to extract metadata from: {filename}")
-                    error_count += 1
-                    continue
-                
-                # Save metadata to database and get PDF ID
-                pdf_id = db.add_pdf_document(filename, metadata)
-                if not pdf_id:
-                    logger.error(f"Failed to save metadata for: {filename}")
-                    error_count += 1
-                    continue
-                
-                logger.info(f"Successfully saved metadata for: {filename} (PDF ID: {pdf_id})")
-                
-                # Extract images if configured
-                if config.EXTRACT_IMAGES:
-                    images_info = pdf_processor.extract_images(
-                        reader, 
-                        filename, 
-                        config.IMAGES_DIR,
-                        hex_id,
-                        config.IMAGE_NAME_TEMPLATE
-                    )
-                    
-                    # Save image references to database
-                    for img_info in images_info:
-                        db.add_image(
-                            pdf_id,
-                            img_info['filename'],
-                            img_info['page'],
-                            img_info['index'],
-                            img_info['extension']
-                        )
-                    
-                    logger.info(f"Extracted and registered {len(images_info)} image(s) from: {filename}")
-
-                # Extract text if configured
-                if config.EXTRACT_TEXT:
-                    text_content, word_count = pdf_processor.extract_text(reader)
-                    text_filename, text_file_path = file_manager.save_text_file(
-                        pdf_path.stem, 
-                        text_content, 
-                        config.TEXT_DIR,
-                        hex_id
-                    )
-                    
-                    if text_filename and text_file_path:
-                        # Save text reference to database
-                        db.add_text(pdf_id, text_filename, word_count)
-                        logger.info(f"Extracted text saved to: {text_file_path} ({word_count} words)")
-                    else:
-                        logger.error(f"Failed to save extracted text for: {filename}")
-                
+        # Filter out already processed files and assign hex IDs
+        pending, file_hashes, skipped_count = select_pending(db, file_manager, pdf_files)
+        
+        # Extraction may run in worker processes; SQLite writes stay in this process
+        for pdf_path, result, error in iter_results(pending):
+            if error is not None:
+                logger.error(f"Error processing {pdf_path.name}: {error}", exc_info=error)
+                error_count += 1
+            elif save_result(db, result, file_hashes.get(pdf_path)):
                 processed_count += 1
-                
-            except Exception as e:
-                logger.error(f"Error processing {filename}: {e}", exc_info=True)
+            else:
                 error_count += 1
-                continue
         
         # Move processed files if configured
         if config.MOVE_AFTER_PROCESSING and processed_count > 0:
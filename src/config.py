@@ -31,6 +31,17 @@ EXTRACT_TEXT = True
 MOVE_AFTER_PROCESSING = True
 SKIP_PROCESSED_FILES = True  # Avoid reprocessing files already in metadata
 
+# Parallel processing settings
+MAX_WORKERS = None  # Worker processes for batch processing (None = CPU count)
+PARALLEL_MIN_FILES = 10  # Batches smaller than this are processed serially
+
+# Web server settings
+WEB_HOST = "0.0.0.0"
+WEB_PORT = 8011
+WEB_WORKERS = 1  # Each worker loads its own embedding model and Chroma client
+WEB_RELOAD = False  # Restart on code changes (development only, forces a single worker)
+WARM_UP_EMBEDDINGS = True  # Load the embedding model in the background when the server starts
+
 # Image extraction settings
 IMAGE_NAME_TEMPLATE = "{pdf_name}_{hex_id}_img_{index}.{ext}"  # Template for extracted image names
 
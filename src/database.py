@@ -3,12 +3,86 @@ Database module for managing PDF metadata and extracted content using SQLite.
 """
 import sqlite3
 import logging
+import os
+import random
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
 import secrets
 
 logger = logging.getLogger(__name__)
 
+# Hex IDs only make filenames unique, so a seeded PRNG is enough and avoids
+# a getrandom() call per ID; forked workers reseed so they don't repeat IDs
+_id_rng = random.Random(secrets.token_bytes(16))
+if hasattr(os, "register_at_fork"):
+    # Not available on Windows, which never forks
+    os.register_at_fork(after_in_child=lambda: _id_rng.seed(secrets.token_bytes(16)))
+
+# Bound parameters per statement; older SQLite builds allow at most 999
+SQLITE_MAX_PARAMS = 900
+
+# Prepared statements kept per connection, keyed by SQL text. Every query here
+# is a constant string, plus one IN list per batch size, so they all stay parsed
+STATEMENT_CACHE_SIZE = 256
+
+# Database path for a private in-memory database, as with sqlite3.connect
+MEMORY_DB_PATH = ':memory:'
+
+# Re-adding a filename updates its row in place and keeps its id (SQLite 3.35+)
+_UPSERT_PDF_DOCUMENT = '''
+    INSERT INTO pdf_documents (
+        filename, title, author, subject, creator, producer,
+        creation_date, modification_date, num_pages, total_words,
+        total_images, total_attachments, processed_at, file_hash
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(filename) DO UPDATE SET
+        title = excluded.title, author = excluded.author,
+        subject = excluded.subject, creator = excluded.creator,
+        producer = excluded.producer, creation_date = excluded.creation_date,
+        modification_date = excluded.modification_date,
+        num_pages = excluded.num_pages, total_words = excluded.total_words,
+        total_images = excluded.total_images,
+        total_attachments = excluded.total_attachments,
+        processed_at = excluded.processed_at, file_hash = excluded.file_hash
+    RETURNING id
+'''
+
+
+# Columns of the text and image rows joined onto a PDF document by get_pdf_with_children
+_TEXT_COLUMNS = ('id', 'pdf_id', 'filename', 'word_count', 'extracted_at')
+_IMAGE_COLUMNS = ('pdf_id', 'page_number', 'image_index', 'filename', 'file_extension', 'extracted_at')
+
+# A document with its first text row and all of its images, one row per image
+_SELECT_PDF_WITH_CHILDREN = f'''
+    SELECT p.*,
+        {', '.join(f't.{column}' for column in _TEXT_COLUMNS)},
+        {', '.join(f'i.{column}' for column in _IMAGE_COLUMNS)}
+    FROM pdf_documents p
+    LEFT JOIN texts t ON t.id = (SELECT MIN(id) FROM texts WHERE pdf_id = p.id)
+    LEFT JOIN images i ON i.pdf_id = p.id
+    WHERE p.{{key}} = ?
+    ORDER BY i.page_number, i.image_index
+'''
+_SELECT_PDF_WITH_CHILDREN_BY_ID = _SELECT_PDF_WITH_CHILDREN.format(key='id')
+_SELECT_PDF_WITH_CHILDREN_BY_FILENAME = _SELECT_PDF_WITH_CHILDREN.format(key='filename')
+
+class _TransactionConnection:
+    """Connection wrapper that leaves commit and rollback to the enclosing transaction."""
+    
+    def __init__(self, conn):
+        self._conn = conn
+    
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+    
+    def commit(self):
+        pass
+    
+    def rollback(self):
+        pass
+
 
 class Database:
     """Handle SQLite database operations for PDF metadata and content."""
@@ -18,16 +92,134 @@ class Database:
         Initialize database connection and create tables if needed.
         
         Args:
-            db_path (str or Path): Path to the SQLite database file
+            db_path (str or Path): Path to the SQLite database file, or
+                ":memory:" for a database that lives as long as this object
         """
         self.db_path = Path(db_path)
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._db_path_str = str(self.db_path)
+        self._keepalive = None
+        self._in_memory = self._db_path_str == MEMORY_DB_PATH
+        if self._in_memory:
+            # Every thread opens its own connection, so they must share one
+            # named in-memory database, which lives while a connection is open
+            self._db_path_str = f'file:pdf-insight-{secrets.token_hex(8)}?mode=memory&cache=shared'
+        else:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        if self._in_memory:
+            self._keepalive = self._connect()
         self._create_tables()
         logger.info(f"Database initialized: {self.db_path}")
     
+    def _connect(self):
+        """Open a new connection to the database file."""
+        conn = sqlite3.connect(
+            self._db_path_str,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+            uri=self._in_memory
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA cache_size=-65536')
+        conn.execute('PRAGMA mmap_size=268435456')
+        # Needed for the ON DELETE CASCADE clauses of images and texts
+        conn.execute('PRAGMA foreign_keys=ON')
+        return conn
+    
     def _get_connection(self):
-        """Get a database connection."""
-        return sqlite3.connect(str(self.db_path))
+        """
+        Get the calling thread's connection, joining the current transaction if any.
+        
+        Each thread opens one connection on first use and keeps it until
+        close(), so individual calls don't pay for connecting to the file.
+        """
+        conn = getattr(self._local, 'transaction', None)
+        if conn is not None:
+            return conn
+        
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+    
+    def close(self):
+        """Close the connections opened by all threads; an in-memory database is discarded."""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        self._local = threading.local()
+        
+        for conn in connections:
+            conn.close()
+        if self._keepalive is not None:
+            self._keepalive.close()
+            self._keepalive = None
+    
+    @contextmanager
+    def transaction(self):
+        """
+        Group several write calls into a single transaction.
+        
+        Methods called inside the block share one connection and one timestamp,
+        and their own commits are deferred, so the whole block is written with
+        one sync.
+        The block is rolled back if it raises, including when a write method
+        inside it fails: those re-raise their error instead of returning None
+        or False. Nested blocks join the outer one.
+        
+        Example:
+            with db.transaction():
+                pdf_id = db.add_pdf_document(filename, metadata)
+                db.add_images_many(pdf_id, images_info)
+        """
+        if self._in_transaction():
+            yield
+            return
+        
+        conn = self._get_connection()
+        conn.execute('BEGIN IMMEDIATE')
+        self._local.transaction = _TransactionConnection(conn)
+        self._local.timestamp = datetime.now().isoformat()
+        
+        try:
+            yield
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._local.transaction = None
+            self._local.timestamp = None
+    
+    def _in_transaction(self):
+        """Whether the calling thread is inside a transaction() block."""
+        return getattr(self._local, 'transaction', None) is not None
+    
+    def _write_failed(self, conn, exc):
+        """
+        Undo a failed write, or hand its error to the enclosing transaction.
+        
+        Inside a transaction() block the error is re-raised, so the whole block
+        is rolled back; otherwise the write is rolled back here.
+        
+        Args:
+            conn (sqlite3.Connection): Connection the write went through
+            exc (Exception): Error raised by the write
+        """
+        if self._in_transaction():
+            raise exc
+        conn.rollback()
+    
+    def _timestamp(self):
+        """Get the current time as an ISO string, fixed for the length of a transaction."""
+        timestamp = getattr(self._local, 'timestamp', None)
+        return timestamp if timestamp is not None else datetime.now().isoformat()
     
     def _create_tables(self):
         """Create database tables if they don't exist."""
@@ -35,6 +227,11 @@ class Database:
         cursor = conn.cursor()
         
         try:
+            # Write-ahead logging lets readers proceed while a batch is being written;
+            # in-memory databases always keep their journal in memory
+            if not self._in_memory:
+                cursor.execute('PRAGMA journal_mode=WAL')
+            
             # PDF documents table (main metadata)
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS pdf_documents (
@@ -59,20 +256,53 @@ class Database:
                 )
             ''')
             
-            # Images table (references to extracted images)
+            # Images from databases created before the composite key get rebuilt below,
+            # dropping rows orphaned while foreign keys were not enforced
+            cursor.execute("PRAGMA table_info(images)")
+            rebuild_images = 'id' in [column[1] for column in cursor.fetchall()]
+            if rebuild_images:
+                # DDL runs outside the implicit transactions of sqlite3, so the rebuild is
+                # one explicit transaction; a failure midway leaves the old table as it was
+                cursor.execute('BEGIN')
+                cursor.execute('ALTER TABLE images RENAME TO images_old')
+            
+            # Images table (references to extracted images), clustered by PDF
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS images (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
                     pdf_id INTEGER NOT NULL,
-                    filename TEXT NOT NULL,
                     page_number INTEGER NOT NULL,
                     image_index INTEGER NOT NULL,
+                    filename TEXT NOT NULL,
                     file_extension TEXT,
                     extracted_at TEXT NOT NULL,
+                    PRIMARY KEY (pdf_id, page_number, image_index),
                     FOREIGN KEY (pdf_id) REFERENCES pdf_documents (id) ON DELETE CASCADE
-                )
+                ) WITHOUT ROWID
             ''')
             
+            if rebuild_images:
+                cursor.execute('''
+                    SELECT COUNT(*) FROM images_old
+                    WHERE pdf_id IN (SELECT id FROM pdf_documents)
+                ''')
+                old_count = cursor.fetchone()[0]
+                cursor.execute('''
+                    INSERT OR IGNORE INTO images (pdf_id, page_number, image_index, filename,
+                                                 file_extension, extracted_at)
+                    SELECT pdf_id, page_number, image_index, filename, file_extension, extracted_at
+                    FROM images_old
+                    WHERE pdf_id IN (SELECT id FROM pdf_documents)
+                    ORDER BY id
+                ''')
+                dropped = old_count - cursor.rowcount
+                if dropped:
+                    logger.warning(
+                        f"Dropped {dropped} image row(s) repeating a PDF's page and image index"
+                    )
+                cursor.execute('DROP TABLE images_old')
+                conn.commit()
+                logger.info("Rebuilt images table without rowid")
+            
             # Texts table (references to extracted text files)
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS texts (
@@ -101,9 +331,31 @@ class Database:
                 cursor.execute('ALTER TABLE pdf_documents ADD COLUMN embeddings_generated_at TEXT')
                 logger.info("Added embeddings_generated_at column to pdf_documents table")
             
+            if 'file_hash' not in columns:
+                cursor.execute('ALTER TABLE pdf_documents ADD COLUMN file_hash TEXT')
+                logger.info("Added file_hash column to pdf_documents table")
+            
+            # Version counter of pdf_documents, bumped by triggers on every change
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS pdf_documents_version (
+                    id INTEGER PRIMARY KEY CHECK (id = 0),
+                    version INTEGER NOT NULL
+                )
+            ''')
+            cursor.execute('INSERT OR IGNORE INTO pdf_documents_version (id, version) VALUES (0, 0)')
+            for event in ('INSERT', 'UPDATE', 'DELETE'):
+                cursor.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS pdf_documents_version_{event.lower()}
+                    AFTER {event} ON pdf_documents
+                    BEGIN
+                        UPDATE pdf_documents_version SET version = version + 1 WHERE id = 0;
+                    END
+                ''')
+            
             # Create indexes for better performance
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_pdf_filename ON pdf_documents(filename)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_images_pdf_id ON images(pdf_id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_pdf_file_hash ON pdf_documents(file_hash)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_pdf_processed_at ON pdf_documents(processed_at DESC)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_texts_pdf_id ON texts(pdf_id)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_pdf_embeddings ON pdf_documents(has_embeddings)')
             
@@ -114,8 +366,6 @@ class Database:
             logger.error(f"Error creating database tables: {e}")
             conn.rollback()
             raise
-        finally:
-            conn.close()
     
     @staticmethod
     def generate_hex_id(length=8):
@@ -128,7 +378,25 @@ class Database:
         Returns:
             str: Random hexadecimal string
         """
-        return secrets.token_hex(length // 2)
+        return _id_rng.randbytes(length // 2).hex()
+    
+    @staticmethod
+    def hex_id_stream(count, length=8):
+        """
+        Generate several random hexadecimal identifiers at once.
+        
+        All identifiers are sliced from a single draw of random bytes.
+        
+        Args:
+            count (int): Number of identifiers to generate
+            length (int): Length of each hex string
+            
+        Returns:
+            list: List of random hexadecimal strings
+        """
+        nbytes = length // 2
+        buf = _id_rng.randbytes(count * nbytes)
+        return [buf[i * nbytes:(i + 1) * nbytes].hex() for i in range(count)]
     
     def pdf_exists(self, filename):
         """
@@ -143,20 +411,85 @@ class Database:
         conn = self._get_connection()
         cursor = conn.cursor()
         
-        try:
-            cursor.execute('SELECT id FROM pdf_documents WHERE filename = ?', (filename,))
-            result = cursor.fetchone()
-            return result is not None
-        finally:
-            conn.close()
+        cursor.execute('SELECT id FROM pdf_documents WHERE filename = ?', (filename,))
+        result = cursor.fetchone()
+        return result is not None
+    
+    def pdf_exists_many(self, filenames):
+        """
+        Check which of several PDFs have already been processed.
+        
+        Args:
+            filenames (iterable): Names of the PDF files
+            
+        Returns:
+            set: Filenames that exist in database
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        filenames = list(filenames)
+        existing = set()
+        # Stay below SQLite's limit on bound parameters per statement
+        for start in range(0, len(filenames), SQLITE_MAX_PARAMS):
+            batch = filenames[start:start + SQLITE_MAX_PARAMS]
+            cursor.execute(
+                f'SELECT filename FROM pdf_documents WHERE filename IN ({",".join("?" * len(batch))})',
+                batch
+            )
+            existing.update(row[0] for row in cursor.fetchall())
+        return existing
+    
+    def pdf_exists_by_hash(self, file_hash):
+        """
+        Check if a PDF with the same content has already been processed.
+        
+        Args:
+            file_hash (str): SHA-256 hex digest of the PDF file
+            
+        Returns:
+            bool: True if a document with this hash exists, False otherwise
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT id FROM pdf_documents WHERE file_hash = ?', (file_hash,))
+        result = cursor.fetchone()
+        return result is not None
     
-    def add_pdf_document(self, filename, metadata):
+    def pdf_exists_by_hash_many(self, file_hashes):
+        """
+        Check which of several file contents have already been processed.
+        
+        Args:
+            file_hashes (iterable): SHA-256 hex digests of PDF files
+            
+        Returns:
+            set: Hashes of documents that exist in database
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        file_hashes = list(file_hashes)
+        existing = set()
+        # Stay below SQLite's limit on bound parameters per statement
+        for start in range(0, len(file_hashes), SQLITE_MAX_PARAMS):
+            batch = file_hashes[start:start + SQLITE_MAX_PARAMS]
+            cursor.execute(
+                f'SELECT file_hash FROM pdf_documents WHERE file_hash IN ({",".join("?" * len(batch))})',
+                batch
+            )
+            existing.update(row[0] for row in cursor.fetchall())
+        return existing
+    
+    def add_pdf_document(self, filename, metadata, file_hash=None):
         """
         Add or update PDF document metadata.
         
         Args:
             filename (str): Name of the PDF file
             metadata (dict): Metadata dictionary
+            file_hash (str, optional): SHA-256 hex digest of the PDF file
             
         Returns:
             int or None: PDF document ID if successful, None otherwise
@@ -165,73 +498,35 @@ class Database:
         cursor = conn.cursor()
         
         try:
-            processed_at = datetime.now().isoformat()
-            
-            # Check if document already exists
-            cursor.execute('SELECT id FROM pdf_documents WHERE filename = ?', (filename,))
-            existing = cursor.fetchone()
+            processed_at = self._timestamp()
             
-            if existing:
-                # Update existing record
-                pdf_id = existing[0]
-                cursor.execute('''
-                    UPDATE pdf_documents SET
-                        title = ?, author = ?, subject = ?, creator = ?,
-                        producer = ?, creation_date = ?, modification_date = ?,
-                        num_pages = ?, total_words = ?, total_images = ?,
-                        total_attachments = ?, processed_at = ?
-                    WHERE id = ?
-                ''', (
-                    metadata.get('title'),
-                    metadata.get('author'),
-                    metadata.get('subject'),
-                    metadata.get('creator'),
-                    metadata.get('producer'),
-                    metadata.get('creation_date'),
-                    metadata.get('modification_date'),
-                    metadata.get('num_pages'),
-                    metadata.get('total_words'),
-                    metadata.get('total_images'),
-                    metadata.get('total_attachments'),
-                    processed_at,
-                    pdf_id
-                ))
-                logger.info(f"Updated existing PDF document: {filename}")
-            else:
-                # Insert new record
-                cursor.execute('''
-                    INSERT INTO pdf_documents (
-                        filename, title, author, subject, creator, producer,
-                        creation_date, modification_date, num_pages, total_words,
-                        total_images, total_attachments, processed_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    filename,
-                    metadata.get('title'),
-                    metadata.get('author'),
-                    metadata.get('subject'),
-                    metadata.get('creator'),
-                    metadata.get('producer'),
-                    metadata.get('creation_date'),
-                    metadata.get('modification_date'),
-                    metadata.get('num_pages'),
-                    metadata.get('total_words'),
-                    metadata.get('total_images'),
-                    metadata.get('total_attachments'),
-                    processed_at
-                ))
-                pdf_id = cursor.lastrowid
-                logger.info(f"Added new PDF document: {filename} (ID: {pdf_id})")
+            # Insert, or update the row of a file processed before, in one statement
+            cursor.execute(_UPSERT_PDF_DOCUMENT, (
+                filename,
+                metadata.get('title'),
+                metadata.get('author'),
+                metadata.get('subject'),
+                metadata.get('creator'),
+                metadata.get('producer'),
+                metadata.get('creation_date'),
+                metadata.get('modification_date'),
+                metadata.get('num_pages'),
+                metadata.get('total_words'),
+                metadata.get('total_images'),
+                metadata.get('total_attachments'),
+                processed_at,
+                file_hash
+            ))
+            pdf_id = cursor.fetchone()[0]
+            logger.info(f"Saved PDF document: {filename} (ID: {pdf_id})")
             
             conn.commit()
             return pdf_id
             
         except Exception as e:
             logger.error(f"Error adding PDF document {filename}: {e}")
-            conn.rollback()
+            self._write_failed(conn, e)
             return None
-        finally:
-            conn.close()
     
     def add_image(self, pdf_id, filename, page_number, image_index, file_extension):
         """
@@ -245,13 +540,13 @@ class Database:
             file_extension (str): File extension (jpg, png, etc.)
             
         Returns:
-            int or None: Image ID if successful, None otherwise
+            int or None: Number of images added (1) if successful, None otherwise
         """
         conn = self._get_connection()
         cursor = conn.cursor()
         
         try:
-            extracted_at = datetime.now().isoformat()
+            extracted_at = self._timestamp()
             
             cursor.execute('''
                 INSERT INTO images (pdf_id, filename, page_number, image_index, 
@@ -259,17 +554,66 @@ class Database:
                 VALUES (?, ?, ?, ?, ?, ?)
             ''', (pdf_id, filename, page_number, image_index, file_extension, extracted_at))
             
-            image_id = cursor.lastrowid
+            count = cursor.rowcount
             conn.commit()
-            logger.debug(f"Added image reference: {filename} (ID: {image_id})")
-            return image_id
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Added image reference: {filename} (PDF ID: {pdf_id})")
+            return count
             
         except Exception as e:
             logger.error(f"Error adding image reference {filename}: {e}")
-            conn.rollback()
+            self._write_failed(conn, e)
+            return None
+    
+    def add_images_many(self, pdf_id, images_info):
+        """
+        Add several image references to database in a single statement.
+        
+        Args:
+            pdf_id (int): PDF document ID
+            images_info (iterable): Image dictionaries as returned by
+                PDFProcessor.extract_images (filename, page, index, extension)
+            
+        Returns:
+            int or None: Number of images added if successful, None otherwise
+        """
+        return self.add_images_bulk(pdf_id, [
+            (info['filename'], info['page'], info['index'], info['extension'])
+            for info in images_info
+        ])
+    
+    def add_images_bulk(self, pdf_id, rows):
+        """
+        Add image references given as tuples in a single transaction.
+        
+        Args:
+            pdf_id (int): PDF document ID
+            rows (iterable): (filename, page_number, image_index, file_extension) tuples
+            
+        Returns:
+            int or None: Number of images added if successful, None otherwise
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            extracted_at = self._timestamp()
+            
+            cursor.executemany('''
+                INSERT INTO images (pdf_id, filename, page_number, image_index, 
+                                    file_extension, extracted_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', [(pdf_id, *row, extracted_at) for row in rows])
+            
+            count = cursor.rowcount
+            conn.commit()
+            logger.debug(f"Added {count} image reference(s) for PDF ID {pdf_id}")
+            return count
+            
+        except Exception as e:
+            logger.error(f"Error adding image references for PDF ID {pdf_id}: {e}")
+            self._write_failed(conn, e)
             return None
-        finally:
-            conn.close()
     
     def add_text(self, pdf_id, filename, word_count=None):
         """
@@ -287,7 +631,7 @@ class Database:
         cursor = conn.cursor()
         
         try:
-            extracted_at = datetime.now().isoformat()
+            extracted_at = self._timestamp()
             
             cursor.execute('''
                 INSERT INTO texts (pdf_id, filename, word_count, extracted_at)
@@ -301,35 +645,90 @@ class Database:
             
         except Exception as e:
             logger.error(f"Error adding text reference {filename}: {e}")
-            conn.rollback()
+            self._write_failed(conn, e)
             return None
-        finally:
-            conn.close()
     
-    def get_pdf_by_id(self, pdf_id):
+    def add_texts_bulk(self, pdf_id, rows):
         """
-        Get PDF document by ID.
+        Add text file references given as tuples in a single transaction.
         
         Args:
-            pdf_id (int): ID of the PDF document
+            pdf_id (int): PDF document ID
+            rows (iterable): (filename, word_count) tuples
             
         Returns:
-            dict or None: PDF document data if found, None otherwise
+            int or None: Number of texts added if successful, None otherwise
         """
         conn = self._get_connection()
         cursor = conn.cursor()
         
         try:
-            cursor.execute('SELECT * FROM pdf_documents WHERE id = ?', (pdf_id,))
-            row = cursor.fetchone()
+            extracted_at = self._timestamp()
+            
+            cursor.executemany('''
+                INSERT INTO texts (pdf_id, filename, word_count, extracted_at)
+                VALUES (?, ?, ?, ?)
+            ''', [(pdf_id, *row, extracted_at) for row in rows])
+            
+            count = cursor.rowcount
+            conn.commit()
+            logger.debug(f"Added {count} text reference(s) for PDF ID {pdf_id}")
+            return count
             
-            if row:
-                columns = [description[0] for description in cursor.description]
-                return dict(zip(columns, row))
+        except Exception as e:
+            logger.error(f"Error adding text references for PDF ID {pdf_id}: {e}")
+            self._write_failed(conn, e)
             return None
+    
+    def delete_pdf_children(self, pdf_id):
+        """
+        Delete the image and text references of a PDF document, keeping the document.
+        
+        Used before a document is saved again, so rows from its previous
+        extraction don't remain next to or in place of the new ones.
+        
+        Args:
+            pdf_id (int): PDF document ID
             
-        finally:
-            conn.close()
+        Returns:
+            int or None: Number of references deleted if successful, None otherwise
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute('DELETE FROM images WHERE pdf_id = ?', (pdf_id,))
+            count = cursor.rowcount
+            cursor.execute('DELETE FROM texts WHERE pdf_id = ?', (pdf_id,))
+            count += cursor.rowcount
+            conn.commit()
+            logger.debug(f"Deleted {count} image and text reference(s) for PDF ID {pdf_id}")
+            return count
+            
+        except Exception as e:
+            logger.error(f"Error deleting references for PDF ID {pdf_id}: {e}")
+            self._write_failed(conn, e)
+            return None
+    
+    def get_pdf_by_id(self, pdf_id):
+        """
+        Get PDF document by ID.
+        
+        Args:
+            pdf_id (int): ID of the PDF document
+            
+        Returns:
+            dict or None: PDF document data if found, None otherwise
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT * FROM pdf_documents WHERE id = ?', (pdf_id,))
+        row = cursor.fetchone()
+        
+        if row:
+            return dict(row)
+        return None
     
     def get_pdf_by_filename(self, filename):
         """
@@ -344,17 +743,78 @@ class Database:
         conn = self._get_connection()
         cursor = conn.cursor()
         
-        try:
-            cursor.execute('SELECT * FROM pdf_documents WHERE filename = ?', (filename,))
-            row = cursor.fetchone()
+        cursor.execute('SELECT * FROM pdf_documents WHERE filename = ?', (filename,))
+        row = cursor.fetchone()
+        
+        if row:
+            return dict(row)
+        return None
+    
+    def get_pdf_summaries_by_ids(self, pdf_ids):
+        """
+        Get the id, filename and title of several PDF documents.
+        
+        Args:
+            pdf_ids (iterable): PDF document IDs
             
-            if row:
-                columns = [description[0] for description in cursor.description]
-                return dict(zip(columns, row))
-            return None
+        Returns:
+            dict: Dictionaries with id, filename and title by PDF document ID,
+                  for the IDs that exist
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        pdf_ids = list(pdf_ids)
+        summaries = {}
+        # Stay below SQLite's limit on bound parameters per statement
+        for start in range(0, len(pdf_ids), SQLITE_MAX_PARAMS):
+            batch = pdf_ids[start:start + SQLITE_MAX_PARAMS]
+            cursor.execute(
+                f'SELECT id, filename, title FROM pdf_documents WHERE id IN ({",".join("?" * len(batch))})',
+                batch
+            )
+            summaries.update((row['id'], dict(row)) for row in cursor.fetchall())
+        return summaries
+    
+    def get_pdf_with_children(self, pdf_id=None, filename=None):
+        """
+        Get a PDF document with its images and text in a single query.
+        
+        Args:
+            pdf_id (int, optional): ID of the PDF document
+            filename (str, optional): Name of the PDF file, used if pdf_id is None
             
-        finally:
-            conn.close()
+        Returns:
+            dict or None: PDF document data with 'images' (list of image
+                dictionaries) and 'text' (text file data or None), or None if not found
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        if pdf_id is not None:
+            cursor.execute(_SELECT_PDF_WITH_CHILDREN_BY_ID, (pdf_id,))
+        else:
+            cursor.execute(_SELECT_PDF_WITH_CHILDREN_BY_FILENAME, (filename,))
+        rows = cursor.fetchall()
+        
+        if not rows:
+            return None
+        
+        # Rows are tuples of the document columns, then the text columns, then the image columns
+        num_pdf_columns = len(cursor.description) - len(_TEXT_COLUMNS) - len(_IMAGE_COLUMNS)
+        text_end = num_pdf_columns + len(_TEXT_COLUMNS)
+        pdf_columns = [column[0] for column in cursor.description[:num_pdf_columns]]
+        
+        first = tuple(rows[0])
+        pdf = dict(zip(pdf_columns, first[:num_pdf_columns]))
+        text = first[num_pdf_columns:text_end]
+        pdf['text'] = dict(zip(_TEXT_COLUMNS, text)) if text[0] is not None else None
+        pdf['images'] = [
+            dict(zip(_IMAGE_COLUMNS, image))
+            for image in (tuple(row)[text_end:] for row in rows)
+            if image[0] is not None
+        ]
+        return pdf
     
     def get_images_by_pdf_id(self, pdf_id):
         """
@@ -366,18 +826,24 @@ class Database:
         Returns:
             list: List of image dictionaries
         """
+        return list(self.iter_images_by_pdf_id(pdf_id))
+    
+    def iter_images_by_pdf_id(self, pdf_id):
+        """
+        Iterate over the images of a PDF document one row at a time.
+        
+        Args:
+            pdf_id (int): PDF document ID
+            
+        Yields:
+            dict: Image data
+        """
         conn = self._get_connection()
         cursor = conn.cursor()
         
-        try:
-            cursor.execute('SELECT * FROM images WHERE pdf_id = ?', (pdf_id,))
-            rows = cursor.fetchall()
-            
-            columns = [description[0] for description in cursor.description]
-            return [dict(zip(columns, row)) for row in rows]
-            
-        finally:
-            conn.close()
+        cursor.execute('SELECT * FROM images WHERE pdf_id = ?', (pdf_id,))
+        for row in cursor:
+            yield dict(row)
     
     def get_text_by_pdf_id(self, pdf_id):
         """
@@ -392,35 +858,85 @@ class Database:
         conn = self._get_connection()
         cursor = conn.cursor()
         
-        try:
-            cursor.execute('SELECT * FROM texts WHERE pdf_id = ?', (pdf_id,))
-            row = cursor.fetchone()
-            
-            if row:
-                columns = [description[0] for description in cursor.description]
-                return dict(zip(columns, row))
-            return None
+        cursor.execute('SELECT * FROM texts WHERE pdf_id = ?', (pdf_id,))
+        row = cursor.fetchone()
+        
+        if row:
+            return dict(row)
+        return None
+    
+    def get_texts_by_pdf_ids(self, pdf_ids):
+        """
+        Get the text files of several PDF documents.
+        
+        Args:
+            pdf_ids (iterable): PDF document IDs
             
-        finally:
-            conn.close()
+        Returns:
+            dict: Text file data by PDF document ID, for PDFs with a text file
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        pdf_ids = list(pdf_ids)
+        texts = {}
+        # Stay below SQLite's limit on bound parameters per statement
+        for start in range(0, len(pdf_ids), SQLITE_MAX_PARAMS):
+            batch = pdf_ids[start:start + SQLITE_MAX_PARAMS]
+            # Descending order so the first text of each PDF wins, as in get_pdf_with_children
+            cursor.execute(
+                f'SELECT * FROM texts WHERE pdf_id IN ({",".join("?" * len(batch))}) ORDER BY id DESC',
+                batch
+            )
+            texts.update((row['pdf_id'], dict(row)) for row in cursor.fetchall())
+        return texts
     
-    def get_all_pdfs(self):
+    def get_all_pdfs(self, limit=None, offset=0):
         """
-        Get all PDF documents.
+        Get all PDF documents, most recently processed first.
         
+        Args:
+            limit (int, optional): Maximum number of documents to return. If None, returns all.
+            offset (int): Number of documents to skip
+            
         Returns:
             list: List of PDF document dictionaries
         """
         conn = self._get_connection()
         cursor = conn.cursor()
         
-        try:
-            cursor.execute('SELECT * FROM pdf_documents ORDER BY processed_at DESC')
-            rows = cursor.fetchall()
-            
-            columns = [description[0] for description in cursor.description]
-            return [dict(zip(columns, row)) for row in rows]
+        # id breaks ties so pages don't overlap; (processed_at DESC, rowid) is the index order
+        query = 'SELECT * FROM pdf_documents ORDER BY processed_at DESC, id'
+        if limit is not None:
+            cursor.execute(query + ' LIMIT ? OFFSET ?', (limit, offset))
+        elif offset:
+            cursor.execute(query + ' LIMIT -1 OFFSET ?', (offset,))
+        else:
+            cursor.execute(query)
+        return [dict(row) for row in cursor.fetchall()]
+    
+    def iter_all_pdfs(self, batch_size=500):
+        """
+        Iterate over all PDF documents in batches, most recently processed first.
+        
+        Rows are read from a dedicated connection, closed once the iteration
+        ends, so a consumer resumed on different threads does not share a
+        cursor with other calls.
+        
+        Args:
+            batch_size (int): Number of documents per batch
             
+        Yields:
+            list: Up to batch_size PDF document dictionaries
+        """
+        conn = self._connect()
+        try:
+            cursor = conn.execute('SELECT * FROM pdf_documents ORDER BY processed_at DESC, id')
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield [dict(row) for row in rows]
         finally:
             conn.close()
     
@@ -434,11 +950,100 @@ class Database:
         conn = self._get_connection()
         cursor = conn.cursor()
         
-        try:
-            cursor.execute('SELECT COUNT(*) FROM pdf_documents')
-            return cursor.fetchone()[0]
-        finally:
-            conn.close()
+        cursor.execute('SELECT COUNT(*) FROM pdf_documents')
+        return cursor.fetchone()[0]
+    
+    def get_statistics(self):
+        """
+        Get aggregate statistics over all processed PDFs.
+        
+        Returns:
+            dict: total_pdfs, total_pages, total_words and total_images
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT COUNT(*),
+                   COALESCE(SUM(num_pages), 0),
+                   COALESCE(SUM(total_words), 0),
+                   COALESCE(SUM(total_images), 0)
+            FROM pdf_documents
+        ''')
+        total_pdfs, total_pages, total_words, total_images = cursor.fetchone()
+        return {
+            'total_pdfs': total_pdfs,
+            'total_pages': total_pages,
+            'total_words': total_words,
+            'total_images': total_images
+        }
+    
+    def get_embeddings_statistics(self):
+        """
+        Get aggregate embeddings statistics over all processed PDFs.
+        
+        Returns:
+            dict: pdfs_with_embeddings, pdfs_without_embeddings and
+                  total_embeddings_chunks (sum of embeddings_count of PDFs with embeddings)
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT COALESCE(SUM(has_embeddings = 1), 0),
+                   COALESCE(SUM(has_embeddings = 0 OR has_embeddings IS NULL), 0),
+                   COALESCE(SUM(CASE WHEN has_embeddings = 1 THEN embeddings_count END), 0)
+            FROM pdf_documents
+        ''')
+        with_embeddings, without_embeddings, total_chunks = cursor.fetchone()
+        return {
+            'pdfs_with_embeddings': with_embeddings,
+            'pdfs_without_embeddings': without_embeddings,
+            'total_embeddings_chunks': total_chunks
+        }
+    
+    def get_pdf_documents_version(self):
+        """
+        Get a counter that changes whenever a PDF document row changes.
+        
+        The counter lives in the database, so changes made by other
+        connections and processes are seen as well.
+        
+        Returns:
+            int: Current version of the pdf_documents table
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT version FROM pdf_documents_version WHERE id = 0')
+        return cursor.fetchone()[0]
+    
+    def get_extracted_files(self):
+        """
+        Get the extracted image and text filenames of every PDF.
+        
+        Returns:
+            list: Dictionaries with filename, images (list of image filenames)
+                  and text (text filename or None), for PDFs with extracted files
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT pdf_id, filename FROM images ORDER BY pdf_id, page_number, image_index')
+        images = {}
+        for pdf_id, filename in cursor.fetchall():
+            images.setdefault(pdf_id, []).append(filename)
+        
+        # Descending order so the first text of each PDF wins, as in get_text_by_pdf_id
+        cursor.execute('SELECT pdf_id, filename FROM texts ORDER BY id DESC')
+        texts = dict(cursor.fetchall())
+        
+        cursor.execute('SELECT id, filename FROM pdf_documents ORDER BY processed_at DESC')
+        return [
+            {'filename': filename, 'images': images.get(pdf_id, []), 'text': texts.get(pdf_id)}
+            for pdf_id, filename in cursor.fetchall()
+            if pdf_id in images or pdf_id in texts
+        ]
     
     def update_embeddings_status(self, pdf_id: int, embeddings_count: int) -> bool:
         """
@@ -455,15 +1060,13 @@ class Database:
         cursor = conn.cursor()
         
         try:
-            from datetime import datetime
-            
             cursor.execute('''
                 UPDATE pdf_documents 
                 SET has_embeddings = 1,
                     embeddings_count = ?,
                     embeddings_generated_at = ?
                 WHERE id = ?
-            ''', (embeddings_count, datetime.now().isoformat(), pdf_id))
+            ''', (embeddings_count, self._timestamp(), pdf_id))
             
             conn.commit()
             logger.info(f"Updated embeddings status for PDF ID {pdf_id}: {embeddings_count} embeddings")
@@ -471,10 +1074,40 @@ class Database:
             
         except Exception as e:
             logger.error(f"Error updating embeddings status for PDF ID {pdf_id}: {e}")
-            conn.rollback()
+            self._write_failed(conn, e)
+            return False
+    
+    def update_embeddings_status_many(self, counts) -> bool:
+        """
+        Update the embeddings status of several PDF documents in one transaction.
+        
+        Args:
+            counts: (pdf_id, embeddings_count) pairs
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            generated_at = self._timestamp()
+            cursor.executemany('''
+                UPDATE pdf_documents 
+                SET has_embeddings = 1,
+                    embeddings_count = ?,
+                    embeddings_generated_at = ?
+                WHERE id = ?
+            ''', [(embeddings_count, generated_at, pdf_id) for pdf_id, embeddings_count in counts])
+            
+            conn.commit()
+            logger.info(f"Updated embeddings status for {cursor.rowcount} PDF(s)")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error updating embeddings status: {e}")
+            self._write_failed(conn, e)
             return False
-        finally:
-            conn.close()
     
     def clear_embeddings_status(self, pdf_id: int) -> bool:
         """
@@ -504,10 +1137,8 @@ class Database:
             
         except Exception as e:
             logger.error(f"Error clearing embeddings status for PDF ID {pdf_id}: {e}")
-            conn.rollback()
+            self._write_failed(conn, e)
             return False
-        finally:
-            conn.close()
     
     def get_pdfs_without_embeddings(self):
         """
@@ -519,15 +1150,8 @@ class Database:
         conn = self._get_connection()
         cursor = conn.cursor()
         
-        try:
-            cursor.execute('SELECT * FROM pdf_documents WHERE has_embeddings = 0 OR has_embeddings IS NULL')
-            rows = cursor.fetchall()
-            
-            columns = [description[0] for description in cursor.description]
-            return [dict(zip(columns, row)) for row in rows]
-            
-        finally:
-            conn.close()
+        cursor.execute('SELECT * FROM pdf_documents WHERE has_embeddings = 0 OR has_embeddings IS NULL')
+        return [dict(row) for row in cursor.fetchall()]
     
     def get_pdfs_with_embeddings(self):
         """
@@ -539,15 +1163,8 @@ class Database:
         conn = self._get_connection()
         cursor = conn.cursor()
         
-        try:
-            cursor.execute('SELECT * FROM pdf_documents WHERE has_embeddings = 1')
-            rows = cursor.fetchall()
-            
-            columns = [description[0] for description in cursor.description]
-            return [dict(zip(columns, row)) for row in rows]
-            
-        finally:
-            conn.close()
+        cursor.execute('SELECT * FROM pdf_documents WHERE has_embeddings = 1')
+        return [dict(row) for row in cursor.fetchall()]
     
     def delete_pdf(self, filename):
         """
@@ -576,7 +1193,5 @@ class Database:
             
         except Exception as e:
             logger.error(f"Error deleting PDF document {filename}: {e}")
-            conn.rollback()
+            self._write_failed(conn, e)
             return False
-        finally:
-            conn.close()
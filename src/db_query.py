@@ -55,11 +55,11 @@ def show_pdf_details(db, filename):
     # Show associated images
     print("\nExtracted Images:")
     print_separator("-")
-    images = db.get_images_by_pdf_id(pdf['id'])
-    if images:
-        for img in images:
-            print(f"  - {img['filename']} (Page {img['page_number']}, Index {img['image_index']})")
-    else:
+    has_images = False
+    for img in db.iter_images_by_pdf_id(pdf['id']):
+        print(f"  - {img['filename']} (Page {img['page_number']}, Index {img['image_index']})")
+        has_images = True
+    if not has_images:
         print("  No images extracted")
     
     # Show associated text
@@ -76,32 +76,30 @@ def show_pdf_details(db, filename):
 
 def show_statistics(db):
     """Display database statistics."""
-    pdfs = db.get_all_pdfs()
+    stats = db.get_statistics()
     
-    if not pdfs:
+    if not stats['total_pdfs']:
         print("No data available.")
         return
     
-    total_pages = sum(pdf['num_pages'] or 0 for pdf in pdfs)
-    total_words = sum(pdf['total_words'] or 0 for pdf in pdfs)
-    total_images_count = sum(pdf['total_images'] or 0 for pdf in pdfs)
+    total_pdfs = stats['total_pdfs']
+    total_pages = stats['total_pages']
+    total_words = stats['total_words']
     
     print_separator()
     print("Database Statistics")
     print_separator()
-    print(f"Total PDFs processed: {len(pdfs)}")
+    print(f"Total PDFs processed: {total_pdfs}")
     print(f"Total pages: {total_pages}")
     print(f"Total words: {total_words:,}")
-    print(f"Total images: {total_images_count}")
-    print(f"Average pages per PDF: {total_pages / len(pdfs):.1f}")
-    print(f"Average words per PDF: {total_words / len(pdfs):,.0f}")
+    print(f"Total images: {stats['total_images']}")
+    print(f"Average pages per PDF: {total_pages / total_pdfs:.1f}")
+    print(f"Average words per PDF: {total_words / total_pdfs:,.0f}")
     print_separator()
 
 
 def list_files(db):
     """List all extracted files (images and texts)."""
-    pdfs = db.get_all_pdfs()
-    
     print_separator()
     print("Extracted Files")
     print_separator()
@@ -109,23 +107,22 @@ def list_files(db):
     total_images = 0
     total_texts = 0
     
-    for pdf in pdfs:
-        images = db.get_images_by_pdf_id(pdf['id'])
-        text = db.get_text_by_pdf_id(pdf['id'])
+    for pdf in db.get_extracted_files():
+        images = pdf['images']
+        text = pdf['text']
+        
+        print(f"\n{pdf['filename']}:")
+        
+        if images:
+            print(f"  Images ({len(images)}):")
+            for image_filename in images:
+                print(f"    - {image_filename}")
+            total_images += len(images)
         
-        if images or text:
-            print(f"\n{pdf['filename']}:")
-            
-            if images:
-                print(f"  Images ({len(images)}):")
-                for img in images:
-                    print(f"    - {img['filename']}")
-                total_images += len(images)
-            
-            if text:
-                print(f"  Text:")
-                print(f"    - {text['filename']}")
-                total_texts += 1
+        if text:
+            print(f"  Text:")
+            print(f"    - {text}")
+            total_texts += 1
     
     print_separator()
     print(f"Total: {total_images} images, {total_texts} text files")
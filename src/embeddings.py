@@ -2,16 +2,51 @@
 Embeddings module for PDF-Insight.
 Handles text chunking, embedding generation, and vector storage using ChromaDB.
 """
+import functools
 import logging
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple
 import chromadb
+import numpy as np
+import torch
+from chromadb.api import ClientAPI
 from chromadb.config import Settings
 from sentence_transformers import SentenceTransformer
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from text_chunker import RecursiveTextSplitter
 
 logger = logging.getLogger(__name__)
 
+# Chunks encoded per forward pass
+ENCODE_BATCH_SIZE = 64
+
+# Chunks accumulated across PDFs before they are encoded and stored together
+FLUSH_CHUNKS = 512
+
+
+@functools.lru_cache(maxsize=4)
+def _load_model(model_name: str, device: str) -> SentenceTransformer:
+    """
+    Load a sentence-transformers model once per process and device.
+    
+    Managers built for the same model share the encoder, which is only read
+    from after loading.
+    
+    Args:
+        model_name: Name of the sentence-transformers model
+        device: Device to load the model on
+        
+    Returns:
+        The loaded model, in half precision on CUDA
+    """
+    logger.info(f"Loading embedding model: {model_name} ({device})")
+    model = SentenceTransformer(model_name, device=device)
+    if device == "cuda":
+        model.half()
+        # Pay for CUDA kernel setup here rather than on the first PDF
+        model.encode(["warm up"], show_progress_bar=False)
+    return model
+
 
 class EmbeddingsManager:
     """Manage embeddings generation and storage using ChromaDB."""
@@ -19,7 +54,8 @@ class EmbeddingsManager:
     def __init__(self, persist_directory: str = "./chroma_db", 
                  model_name: str = "all-MiniLM-L6-v2",
                  chunk_size: int = 500,
-                 chunk_overlap: int = 50):
+                 chunk_overlap: int = 50,
+                 client: Optional[ClientAPI] = None):
         """
         Initialize the embeddings manager.
         
@@ -28,18 +64,22 @@ class EmbeddingsManager:
             model_name: Name of the sentence-transformers model to use
             chunk_size: Size of text chunks for processing
             chunk_overlap: Overlap between chunks
+            client: ChromaDB client to use instead of a persistent client in
+                persist_directory, e.g. an in-memory one
         """
         self.persist_directory = Path(persist_directory)
-        self.persist_directory.mkdir(parents=True, exist_ok=True)
         
         # Initialize ChromaDB client
-        self.client = chromadb.PersistentClient(
-            path=str(self.persist_directory),
-            settings=Settings(
-                anonymized_telemetry=False,
-                allow_reset=True
+        if client is None:
+            self.persist_directory.mkdir(parents=True, exist_ok=True)
+            client = chromadb.PersistentClient(
+                path=str(self.persist_directory),
+                settings=Settings(
+                    anonymized_telemetry=False,
+                    allow_reset=True
+                )
             )
-        )
+        self.client = client
         
         # Get or create collection
         self.collection = self.client.get_or_create_collection(
@@ -47,16 +87,15 @@ class EmbeddingsManager:
             metadata={"description": "PDF document embeddings"}
         )
         
-        # Initialize embedding model
-        logger.info(f"Loading embedding model: {model_name}")
-        self.model = SentenceTransformer(model_name)
+        # Initialize embedding model, in half precision when a GPU is available
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.model = _load_model(model_name, self.device)
         self.model_name = model_name
         
         # Initialize text splitter
-        self.text_splitter = RecursiveCharacterTextSplitter(
+        self.text_splitter = RecursiveTextSplitter(
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
-            length_function=len,
             separators=["\n\n", "\n", " ", ""]
         )
         
@@ -79,7 +118,7 @@ class EmbeddingsManager:
         logger.debug(f"Split text into {len(chunks)} chunks")
         return chunks
     
-    def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+    def generate_embeddings(self, texts: List[str]) -> np.ndarray:
         """
         Generate embeddings for a list of texts.
         
@@ -87,13 +126,19 @@ class EmbeddingsManager:
             texts: List of text strings
             
         Returns:
-            List of embedding vectors
+            float32 array with one embedding vector per row
         """
         if not texts:
-            return []
+            return np.empty((0, self.model.get_sentence_embedding_dimension()), dtype=np.float32)
         
-        embeddings = self.model.encode(texts, show_progress_bar=False)
-        return embeddings.tolist()
+        embeddings = self.model.encode(
+            texts,
+            batch_size=ENCODE_BATCH_SIZE,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+        # FP16 models on CUDA return float16; Chroma stores float32
+        return embeddings.astype(np.float32, copy=False)
     
     def add_pdf_embeddings(self, pdf_id: int, pdf_filename: str, text: str) -> int:
         """
@@ -114,31 +159,105 @@ class EmbeddingsManager:
             logger.warning(f"No chunks generated for PDF ID {pdf_id}")
             return 0
         
-        # Generate embeddings
-        embeddings = self.generate_embeddings(chunks)
-        
-        # Prepare IDs and metadata
-        ids = [f"pdf_{pdf_id}_chunk_{i}" for i in range(len(chunks))]
-        metadatas = [
-            {
-                "pdf_id": pdf_id,
-                "pdf_filename": pdf_filename,
-                "chunk_index": i,
-                "chunk_size": len(chunk)
-            }
-            for i, chunk in enumerate(chunks)
-        ]
+        return self._store_chunks([(pdf_id, pdf_filename, chunks)])[0][2]
+    
+    def add_pdfs_embeddings(self, pdfs: Iterable[Tuple[int, str, str]],
+                            flush_chunks: int = FLUSH_CHUNKS) -> Iterator[Tuple[int, str, int, Optional[str]]]:
+        """
+        Add embeddings for several PDFs, encoding chunks of consecutive PDFs together.
+        
+        Chunks are held back until at least flush_chunks are pending, so short
+        PDFs still give the model full batches. A batch that fails to encode or
+        store is reported for each of its PDFs and the next batch is still tried.
+        
+        Args:
+            pdfs: (pdf_id, pdf_filename, text) tuples, consumed lazily
+            flush_chunks: Number of pending chunks that triggers a write
+            
+        Yields:
+            (pdf_id, pdf_filename, count, error) for each PDF once its batch is
+            written, where error is None or the message of the failed batch
+        """
+        pending = []
+        pending_count = 0
+        
+        for pdf_id, pdf_filename, text in pdfs:
+            chunks = self.chunk_text(text)
+            if not chunks:
+                logger.warning(f"No chunks generated for PDF ID {pdf_id}")
+                yield pdf_id, pdf_filename, 0, None
+                continue
+            
+            pending.append((pdf_id, pdf_filename, chunks))
+            pending_count += len(chunks)
+            if pending_count >= flush_chunks:
+                yield from self._flush(pending)
+                pending = []
+                pending_count = 0
+        
+        if pending:
+            yield from self._flush(pending)
+    
+    def _flush(self, pending: List[Tuple[int, str, List[str]]]) -> Iterator[Tuple[int, str, int, Optional[str]]]:
+        """
+        Store one batch of pending PDFs, reporting a failure for each of its PDFs.
+        
+        Args:
+            pending: (pdf_id, pdf_filename, chunks) tuples
+            
+        Yields:
+            (pdf_id, pdf_filename, count, error) for each PDF of the batch
+        """
+        try:
+            stored = self._store_chunks(pending)
+        except Exception as e:
+            logger.error(f"Error storing embeddings for {len(pending)} PDF(s): {e}")
+            for pdf_id, pdf_filename, _ in pending:
+                yield pdf_id, pdf_filename, 0, str(e)
+            return
+        
+        for pdf_id, pdf_filename, count in stored:
+            yield pdf_id, pdf_filename, count, None
+    
+    def _store_chunks(self, pending: List[Tuple[int, str, List[str]]]) -> List[Tuple[int, str, int]]:
+        """
+        Encode the chunks of one or more PDFs and add them in one collection call.
+        
+        Args:
+            pending: (pdf_id, pdf_filename, chunks) tuples
+            
+        Returns:
+            (pdf_id, pdf_filename, count) for each PDF
+        """
+        ids = []
+        documents = []
+        metadatas = []
+        for pdf_id, pdf_filename, chunks in pending:
+            ids.extend(f"pdf_{pdf_id}_chunk_{i}" for i in range(len(chunks)))
+            documents.extend(chunks)
+            metadatas.extend(
+                {
+                    "pdf_id": pdf_id,
+                    "pdf_filename": pdf_filename,
+                    "chunk_index": i,
+                    "chunk_size": len(chunk)
+                }
+                for i, chunk in enumerate(chunks)
+            )
         
         # Add to collection
         self.collection.add(
             ids=ids,
-            embeddings=embeddings,
-            documents=chunks,
+            embeddings=self.generate_embeddings(documents),
+            documents=documents,
             metadatas=metadatas
         )
         
-        logger.info(f"Added {len(chunks)} embeddings for PDF ID {pdf_id}: {pdf_filename}")
-        return len(chunks)
+        stored = []
+        for pdf_id, pdf_filename, chunks in pending:
+            logger.info(f"Added {len(chunks)} embeddings for PDF ID {pdf_id}: {pdf_filename}")
+            stored.append((pdf_id, pdf_filename, len(chunks)))
+        return stored
     
     def delete_pdf_embeddings(self, pdf_id: int) -> int:
         """
@@ -150,19 +269,15 @@ class EmbeddingsManager:
         Returns:
             Number of embeddings deleted
         """
-        # Query all IDs for this PDF
-        results = self.collection.get(
-            where={"pdf_id": pdf_id}
-        )
+        # Delete by filter so the matching chunks are never loaded
+        before = self.collection.count()
+        self.collection.delete(where={"pdf_id": pdf_id})
+        count = before - self.collection.count()
         
-        if not results['ids']:
+        if not count:
             logger.info(f"No embeddings found for PDF ID {pdf_id}")
             return 0
         
-        # Delete embeddings
-        self.collection.delete(ids=results['ids'])
-        
-        count = len(results['ids'])
         logger.info(f"Deleted {count} embeddings for PDF ID {pdf_id}")
         return count
     
@@ -220,7 +335,8 @@ class EmbeddingsManager:
             Number of embeddings
         """
         results = self.collection.get(
-            where={"pdf_id": pdf_id}
+            where={"pdf_id": pdf_id},
+            include=[]
         )
         return len(results['ids']) if results['ids'] else 0
     
@@ -231,8 +347,8 @@ class EmbeddingsManager:
         Returns:
             List of PDF IDs
         """
-        # Get all items
-        results = self.collection.get()
+        # Only the metadata is needed, not the documents
+        results = self.collection.get(include=["metadatas"])
         
         if not results['metadatas']:
             return []
@@ -252,9 +368,7 @@ class EmbeddingsManager:
         Returns:
             Dictionary with collection statistics
         """
-        results = self.collection.get()
-        
-        total_embeddings = len(results['ids']) if results['ids'] else 0
+        total_embeddings = self.collection.count()
         pdf_ids = self.get_all_pdf_ids_with_embeddings()
         
         return {
@@ -1,12 +1,37 @@
 """
 File management module for handling file system operations.
 """
+import errno
+import hashlib
 import logging
+import os
 import shutil
+import stat
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from pool import ByteBufferPool
+
 logger = logging.getLogger(__name__)
 
+# Read buffers reused by get_file_hash across a batch
+_read_buffers = ByteBufferPool(buffer_capacity=1 << 20)
+
+# Files hashed at once by get_file_hashes; hashlib releases the GIL while digesting
+HASH_WORKERS = min(8, os.cpu_count() or 1)
+
+# PDF listings by folder, valid while the folder's mtime is unchanged
+_scan_cache = {}
+
+# Listings of folders modified more recently than this are not cached, since
+# a change within the same timestamp tick would leave the mtime unchanged
+_SCAN_CACHE_MIN_AGE_NS = 2_000_000_000
+
+# Flags of write_bytes: create or truncate, binary on Windows
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+
 
 class FileManager:
     """Handle file system operations for PDF processing."""
@@ -24,13 +49,46 @@ class FileManager:
         """
         folder_path = Path(folder_path)
         
-        if not folder_path.is_dir():
+        try:
+            folder_stat = os.stat(folder_path)
+        except OSError:
+            folder_stat = None
+        if folder_stat is None or not stat.S_ISDIR(folder_stat.st_mode):
             logger.error(f"The folder path {folder_path} does not exist or is not a directory.")
             return []
         
-        pdf_files = list(folder_path.glob("*.pdf")) + list(folder_path.glob("*.PDF"))
+        # Adding, removing or renaming an entry updates the folder's mtime
+        cached = _scan_cache.get(folder_path)
+        if cached is not None and cached[0] == folder_stat.st_mtime_ns:
+            return list(cached[1])
+        
+        # One directory read; file types come from the entries without a stat per file.
+        # Only the extension is lowercased, not the whole name, to match any case
+        with os.scandir(folder_path) as entries:
+            pdf_files = [
+                Path(entry.path) for entry in entries
+                if entry.name[-4:].lower() == '.pdf' and entry.is_file()
+            ]
         logger.info(f"Found {len(pdf_files)} PDF files in {folder_path}")
-        return pdf_files
+        
+        if time.time_ns() - folder_stat.st_mtime_ns > _SCAN_CACHE_MIN_AGE_NS:
+            _scan_cache[folder_path] = (folder_stat.st_mtime_ns, pdf_files)
+        else:
+            _scan_cache.pop(folder_path, None)
+        return list(pdf_files)
+    
+    @staticmethod
+    def clear_pdf_files_cache(folder_path=None):
+        """
+        Forget cached PDF listings after the program changed a folder.
+        
+        Args:
+            folder_path (str or Path, optional): Folder to forget. If None, forgets all folders.
+        """
+        if folder_path is None:
+            _scan_cache.clear()
+        else:
+            _scan_cache.pop(Path(folder_path), None)
     
     @staticmethod
     def move_file(source_path, dest_dir):
@@ -52,11 +110,13 @@ class FileManager:
             dest_path = dest_dir / source_path.name
             
             # Handle case where file already exists in destination
-            if dest_path.exists():
+            if os.path.lexists(dest_path):
                 logger.warning(f"File {dest_path.name} already exists in {dest_dir}. Skipping move.")
                 return dest_path
             
-            shutil.move(str(source_path), str(dest_path))
+            FileManager.rename_file(source_path, dest_path)
+            FileManager.clear_pdf_files_cache(source_path.parent)
+            FileManager.clear_pdf_files_cache(dest_dir)
             logger.info(f"Moved {source_path.name} to {dest_dir}")
             return dest_path
             
@@ -84,16 +144,33 @@ class FileManager:
         moved_count = 0
         
         try:
+            # One directory read per side replaces a stat per file
+            with os.scandir(source_dir) as entries:
+                source_files = {entry.name for entry in entries if entry.is_file()}
+            dest_names = set(os.listdir(dest_dir))
+            
             if file_list:
-                files_to_move = [source_dir / filename for filename in file_list]
+                names_to_move = [filename for filename in file_list if filename in source_files]
             else:
-                files_to_move = [f for f in source_dir.iterdir() if f.is_file()]
+                names_to_move = list(source_files)
             
-            for file_path in files_to_move:
-                if file_path.exists():
-                    result = FileManager.move_file(file_path, dest_dir)
-                    if result:
-                        moved_count += 1
+            # Plain string joins in the loop; building Path objects costs more than the rename
+            source_root = os.fspath(source_dir)
+            dest_root = os.fspath(dest_dir)
+            for filename in names_to_move:
+                if filename in dest_names:
+                    logger.warning(f"File {filename} already exists in {dest_dir}. Skipping move.")
+                    moved_count += 1
+                    continue
+                
+                source_path = os.path.join(source_root, filename)
+                try:
+                    FileManager.rename_file(source_path, os.path.join(dest_root, filename))
+                except OSError as e:
+                    logger.error(f"Error moving file {source_path}: {e}")
+                    continue
+                dest_names.add(filename)
+                moved_count += 1
             
             logger.info(f"Moved {moved_count} files from {source_dir} to {dest_dir}")
             return moved_count
@@ -101,6 +178,60 @@ class FileManager:
         except Exception as e:
             logger.error(f"Error during batch file move: {e}")
             return moved_count
+        
+        finally:
+            FileManager.clear_pdf_files_cache(source_dir)
+            FileManager.clear_pdf_files_cache(dest_dir)
+    
+    @staticmethod
+    def rename_file(source_path, dest_path):
+        """
+        Rename a file or directory on the same filesystem, copying only across devices.
+        
+        Args:
+            source_path (str or Path): Current path
+            dest_path (str or Path): New path
+        """
+        try:
+            os.rename(source_path, dest_path)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            # shutil.move copies directory trees as well as files
+            shutil.move(source_path, dest_path)
+    
+    @staticmethod
+    def write_bytes(file_path, data, dir_fd=None):
+        """
+        Write bytes to a file with unbuffered os.write calls, creating or truncating it.
+        
+        Skips the extra fstat/ioctl calls and the buffer layer of open().
+        
+        Args:
+            file_path (str or Path): Path of the file, relative to dir_fd if given
+            data (bytes-like): File content
+            dir_fd (int, optional): Descriptor of an open directory, skips resolving
+                the directory's path on every write
+        """
+        fd = os.open(file_path, _WRITE_FLAGS, 0o644, dir_fd=dir_fd)
+        try:
+            FileManager._write_all(fd, data)
+        finally:
+            os.close(fd)
+    
+    @staticmethod
+    def _write_all(fd, data):
+        """
+        Write bytes to an open file descriptor, retrying short writes.
+        
+        Args:
+            fd (int): Open file descriptor
+            data (bytes-like): Bytes to write
+        """
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
     
     @staticmethod
     def ensure_directory(directory):
@@ -136,14 +267,63 @@ class FileManager:
             logger.error(f"Error getting file size for {file_path}: {e}")
             return None
         
+    @staticmethod
+    def get_file_hash(file_path, chunk_size=1 << 20):
+        """
+        Compute the SHA-256 digest of a file's content.
+        
+        Args:
+            file_path (str or Path): Path to the file
+            chunk_size (int): Number of bytes read per iteration
+            
+        Returns:
+            str or None: Hex digest, or None if error
+        """
+        buf = _read_buffers.acquire(chunk_size)
+        try:
+            digest = hashlib.sha256()
+            view = memoryview(buf)[:chunk_size]
+            with open(file_path, 'rb') as f:
+                for size in iter(lambda: f.readinto(view), 0):
+                    digest.update(view[:size])
+            return digest.hexdigest()
+        except Exception as e:
+            logger.error(f"Error hashing file {file_path}: {e}")
+            return None
+        finally:
+            _read_buffers.release(buf)
+    
+    @staticmethod
+    def get_file_hashes(file_paths, max_workers=HASH_WORKERS):
+        """
+        Compute the SHA-256 digests of several files on a thread pool.
+        
+        Args:
+            file_paths (iterable): Paths to the files
+            max_workers (int): Maximum number of files hashed at once
+            
+        Returns:
+            list: Hex digest of each file (None on error), in input order
+        """
+        file_paths = list(file_paths)
+        if len(file_paths) < 2 or max_workers < 2:
+            return [FileManager.get_file_hash(file_path) for file_path in file_paths]
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(file_paths))) as executor:
+            return list(executor.map(FileManager.get_file_hash, file_paths))
+    
     @staticmethod
     def save_text_file(pdf_name, text_content, output_dir, hex_id):
         """
         Save extracted text content to a .txt file with hexadecimal identifier.
         
+        A gzip-compressed copy is written next to it (same name plus ".gz")
+        so the web API can serve compressed text without compressing per request.
+        
         Args:
             pdf_name (str): Name of the PDF file (without extension)
-            text_content (str): Extracted text content
+            text_content (str or list): Extracted text content, or the text of
+                each page, written separated by newlines
             output_dir (str or Path): Directory to save the text file
             hex_id (str): Hexadecimal identifier for uniqueness
             
@@ -151,18 +331,36 @@ class FileManager:
             tuple: (filename, Path) if successful, (None, None) otherwise
         """
         try:
-            output_dir = Path(output_dir)
-            output_dir.mkdir(parents=True, exist_ok=True)
+            os.makedirs(output_dir, exist_ok=True)
             
             # Create filename with hex ID
             text_filename = f"{pdf_name}_{hex_id}_text.txt"
-            text_file_path = output_dir / text_filename
+            text_file_path = os.path.join(output_dir, text_filename)
             
-            with open(text_file_path, 'w', encoding='utf-8') as text_file:
-                text_file.write(text_content)
+            # Pages are encoded and written one at a time, to the text file and
+            # through an incremental gzip stream, so the whole document is never
+            # held in memory as one string or buffer
+            pages = [text_content] if isinstance(text_content, str) else text_content
+            compressor = zlib.compressobj(1, zlib.DEFLATED, 31)
+            fd = os.open(text_file_path, _WRITE_FLAGS, 0o644)
+            try:
+                gz_fd = os.open(text_file_path + ".gz", _WRITE_FLAGS, 0o644)
+                try:
+                    for i, page in enumerate(pages):
+                        data = page.encode('utf-8')
+                        if i:
+                            FileManager._write_all(fd, b"\n")
+                            FileManager._write_all(gz_fd, compressor.compress(b"\n"))
+                        FileManager._write_all(fd, data)
+                        FileManager._write_all(gz_fd, compressor.compress(data))
+                    FileManager._write_all(gz_fd, compressor.flush())
+                finally:
+                    os.close(gz_fd)
+            finally:
+                os.close(fd)
             
             logger.info(f"Saved extracted text to {text_file_path}")
-            return text_filename, text_file_path
+            return text_filename, Path(text_file_path)
             
         except Exception as e:
             logger.error(f"Error saving text file for {pdf_name}: {e}")
@@ -1,12 +1,19 @@
 """
 Metadata storage module for managing PDF metadata persistence.
 Implements deduplication to prevent processing the same file multiple times.
+
+New entries are appended to a JSON-lines journal next to the storage file
+and folded back into it by compact(), so adding a file costs one line write.
 """
-import json
 import logging
+import os
+import stat
+import tempfile
 from pathlib import Path
 from datetime import datetime
 
+import orjson
+
 logger = logging.getLogger(__name__)
 
 
@@ -21,7 +28,9 @@ class MetadataStorage:
             storage_file (str or Path): Path to the JSON storage file
         """
         self.storage_file = Path(storage_file)
+        self.journal_file = self.storage_file.with_suffix('.jsonl')
         self._ensure_file_exists()
+        self._data = self._load_data()
     
     def _ensure_file_exists(self):
         """Create the storage file if it doesn't exist."""
@@ -31,6 +40,30 @@ class MetadataStorage:
             logger.info(f"Created new metadata storage file: {self.storage_file}")
     
     def _load_data(self):
+        """
+        Load metadata from the storage file and replay the journal on top.
+        
+        Returns:
+            dict: Metadata dictionary (filename -> metadata)
+        """
+        data = self._load_snapshot()
+        
+        if self.journal_file.exists():
+            try:
+                with open(self.journal_file, 'rb') as f:
+                    for line_num, line in enumerate(f, 1):
+                        try:
+                            record = orjson.loads(line)
+                            data[record['filename']] = record['metadata']
+                        except (orjson.JSONDecodeError, KeyError, TypeError) as e:
+                            # A crash mid-append can leave a truncated last line
+                            logger.warning(f"Skipping invalid journal line {line_num} in {self.journal_file}: {e}")
+            except Exception as e:
+                logger.error(f"Error loading metadata journal: {e}")
+        
+        return data
+    
+    def _load_snapshot(self):
         """
         Load metadata from the storage file.
         
@@ -38,38 +71,128 @@ class MetadataStorage:
             dict: Metadata dictionary (filename -> metadata)
         """
         try:
-            with open(self.storage_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                
-                # Handle migration from old array format to new dict format
-                if isinstance(data, list):
-                    logger.warning("Detected old array format. Migrating to dictionary format...")
-                    migrated_data = self._migrate_from_array(data)
-                    self._save_data(migrated_data)
-                    return migrated_data
-                
-                return data if isinstance(data, dict) else {}
-                
-        except json.JSONDecodeError as e:
+            data = orjson.loads(self.storage_file.read_bytes())
+            
+            # Handle migration from old array format to new dict format
+            if isinstance(data, list):
+                logger.warning("Detected old array format. Migrating to dictionary format...")
+                migrated_data = self._migrate_from_array(data)
+                self._save_data(migrated_data)
+                return migrated_data
+            
+            return data if isinstance(data, dict) else {}
+            
+        except orjson.JSONDecodeError as e:
             logger.error(f"Error decoding JSON from {self.storage_file}: {e}")
             return {}
         except Exception as e:
             logger.error(f"Error loading metadata: {e}")
             return {}
     
+    def _append_journal(self, filename, metadata):
+        """
+        Append a single metadata entry to the journal file.
+        
+        Args:
+            filename (str): Name of the PDF file
+            metadata (dict): Metadata dictionary
+        """
+        record = orjson.dumps({'filename': filename, 'metadata': metadata}, option=orjson.OPT_NON_STR_KEYS)
+        with open(self.journal_file, 'ab+') as f:
+            # A last line cut short by a crash would swallow this record, so it
+            # starts on a line of its own
+            if f.seek(0, os.SEEK_END):
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    record = b'\n' + record
+            f.write(record + b'\n')
+    
+    def compact(self):
+        """
+        Fold the journal into the storage file and remove the journal.
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        if not self._save_data(self._data):
+            return False
+        
+        try:
+            self.journal_file.unlink(missing_ok=True)
+            logger.debug(f"Compacted metadata journal into {self.storage_file}")
+            return True
+        except Exception as e:
+            logger.error(f"Error compacting metadata journal: {e}")
+            return False
+    
+    def flush(self):
+        """
+        Force the storage file, the journal and their directory to disk.
+        
+        Saves and journal appends never fsync, which keeps them cheap; call
+        this once at the end of a batch to make everything written so far
+        durable, including the renames done by atomic saves.
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            for path in (self.storage_file, self.journal_file):
+                if path.exists():
+                    fd = os.open(path, os.O_RDONLY)
+                    try:
+                        os.fsync(fd)
+                    finally:
+                        os.close(fd)
+            
+            # Directory entries created by os.replace are only durable once the directory is synced
+            if hasattr(os, 'O_DIRECTORY'):
+                fd = os.open(self.storage_file.parent, os.O_RDONLY | os.O_DIRECTORY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+            return True
+        except Exception as e:
+            logger.error(f"Error flushing metadata to disk: {e}")
+            return False
+    
     def _save_data(self, data):
         """
         Save metadata to the storage file.
         
+        The data is written to a temporary file in the same directory and
+        swapped in with os.replace, so a crash never leaves a truncated file.
+        Nothing is fsynced here; see flush().
+        
         Args:
             data (dict): Metadata dictionary to save
+            
+        Returns:
+            bool: True if successful, False otherwise
         """
+        tmp_path = None
         try:
-            with open(self.storage_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=4, ensure_ascii=False)
+            content = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+            with tempfile.NamedTemporaryFile('wb', dir=self.storage_file.parent,
+                                             prefix=f'.{self.storage_file.name}.', suffix='.tmp',
+                                             delete=False) as f:
+                tmp_path = f.name
+                f.write(content)
+            # Temporary files are created 0600; keep the mode of the file being replaced
+            try:
+                mode = stat.S_IMODE(os.stat(self.storage_file).st_mode)
+            except FileNotFoundError:
+                mode = 0o644
+            os.chmod(tmp_path, mode)
+            os.replace(tmp_path, self.storage_file)
             logger.debug(f"Saved metadata to {self.storage_file}")
+            return True
         except Exception as e:
             logger.error(f"Error saving metadata: {e}")
+            if tmp_path is not None:
+                Path(tmp_path).unlink(missing_ok=True)
+            return False
     
     def _migrate_from_array(self, array_data):
         """
@@ -105,8 +228,7 @@ class MetadataStorage:
         Returns:
             bool: True if file exists in metadata, False otherwise
         """
-        data = self._load_data()
-        return filename in data
+        return filename in self._data
     
     def add_metadata(self, filename, metadata):
         """
@@ -120,18 +242,16 @@ class MetadataStorage:
             bool: True if successful, False otherwise
         """
         try:
-            data = self._load_data()
-            
             # Add processing timestamp
             metadata['processed_at'] = datetime.now().isoformat()
             
-            if filename in data:
+            if filename in self._data:
                 logger.info(f"Updating existing metadata for {filename}")
             else:
                 logger.info(f"Adding new metadata for {filename}")
             
-            data[filename] = metadata
-            self._save_data(data)
+            self._append_journal(filename, metadata)
+            self._data[filename] = metadata
             return True
             
         except Exception as e:
@@ -148,8 +268,7 @@ class MetadataStorage:
         Returns:
             dict or None: Metadata dictionary if found, None otherwise
         """
-        data = self._load_data()
-        return data.get(filename)
+        return self._data.get(filename)
     
     def get_all_metadata(self):
         """
@@ -158,7 +277,7 @@ class MetadataStorage:
         Returns:
             dict: Dictionary of all metadata (filename -> metadata)
         """
-        return self._load_data()
+        return dict(self._data)
     
     def remove_metadata(self, filename):
         """
@@ -171,11 +290,9 @@ class MetadataStorage:
             bool: True if successful, False otherwise
         """
         try:
-            data = self._load_data()
-            
-            if filename in data:
-                del data[filename]
-                self._save_data(data)
+            if filename in self._data:
+                del self._data[filename]
+                self.compact()
                 logger.info(f"Removed metadata for {filename}")
                 return True
             else:
@@ -193,8 +310,7 @@ class MetadataStorage:
         Returns:
             list: List of processed filenames
         """
-        data = self._load_data()
-        return list(data.keys())
+        return list(self._data.keys())
     
     def get_count(self):
         """
@@ -203,5 +319,4 @@ class MetadataStorage:
         Returns:
             int: Number of processed files
         """
-        data = self._load_data()
-        return len(data)
+        return len(self._data)
@@ -0,0 +1,57 @@
+"""
+Buffer pool module for reusing byte buffers across a processing batch.
+"""
+import threading
+from collections import deque
+
+
+class ByteBufferPool:
+    """Thread-safe pool of reusable bytearray buffers."""
+    
+    def __init__(self, pool_size=10, buffer_capacity=8192):
+        """
+        Initialize the buffer pool.
+        
+        Args:
+            pool_size (int): Maximum number of idle buffers kept in the pool
+            buffer_capacity (int): Default size of newly allocated buffers
+        """
+        self.pool_size = pool_size
+        self.buffer_capacity = buffer_capacity
+        self._buffers = deque()
+        self._lock = threading.Lock()
+    
+    def acquire(self, min_capacity=0):
+        """
+        Take a buffer from the pool, allocating a new one if none fits.
+        
+        Args:
+            min_capacity (int): Minimum size of the returned buffer
+        
+        Returns:
+            bytearray: Buffer of at least min_capacity bytes
+        """
+        with self._lock:
+            for _ in range(len(self._buffers)):
+                buf = self._buffers.popleft()
+                if len(buf) >= min_capacity:
+                    return buf
+                self._buffers.append(buf)
+        
+        return bytearray(max(min_capacity, self.buffer_capacity))
+    
+    def release(self, buf):
+        """
+        Return a buffer to the pool. Buffers beyond pool_size are dropped.
+        
+        Args:
+            buf (bytearray): Buffer previously obtained from acquire()
+        """
+        with self._lock:
+            if len(self._buffers) < self.pool_size:
+                self._buffers.append(buf)
+    
+    def __len__(self):
+        """Number of idle buffers in the pool."""
+        with self._lock:
+            return len(self._buffers)
@@ -0,0 +1,121 @@
+"""
+Text chunking module for splitting extracted text before embedding.
+"""
+import logging
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class RecursiveTextSplitter:
+    """
+    Split text on a fixed list of separators, falling back to finer ones.
+    
+    Produces the same chunks as LangChain's RecursiveCharacterTextSplitter
+    with its defaults (separators kept at the start of the following piece,
+    chunks stripped), but splits on literal separators with str.split and
+    merges pieces through a deque instead of re-slicing lists.
+    """
+    
+    def __init__(self, chunk_size=500, chunk_overlap=50, separators=("\n\n", "\n", " ", "")):
+        """
+        Initialize the splitter.
+        
+        Args:
+            chunk_size (int): Maximum number of characters per chunk
+            chunk_overlap (int): Characters carried over between consecutive chunks
+            separators (sequence): Separators to try, from coarsest to finest;
+                an empty string splits into single characters
+        """
+        if chunk_overlap > chunk_size:
+            raise ValueError(
+                f"Chunk overlap ({chunk_overlap}) is larger than chunk size ({chunk_size})"
+            )
+        self._chunk_size = chunk_size
+        self._chunk_overlap = chunk_overlap
+        self._separators = list(separators)
+    
+    def split_text(self, text):
+        """
+        Split text into chunks of at most chunk_size characters where possible.
+        
+        Args:
+            text (str): Text to split
+        
+        Returns:
+            list: Non-empty text chunks
+        """
+        return self._split(text, self._separators)
+    
+    def _split(self, text, separators):
+        """Split text on the first separator it contains and recurse into long pieces."""
+        separator = separators[-1]
+        finer = []
+        for i, candidate in enumerate(separators):
+            if candidate == "":
+                separator = candidate
+                break
+            if candidate in text:
+                separator = candidate
+                finer = separators[i + 1:]
+                break
+        
+        chunks = []
+        short = []
+        for piece in self._split_keeping_separator(text, separator):
+            if len(piece) < self._chunk_size:
+                short.append(piece)
+                continue
+            
+            if short:
+                chunks.extend(self._merge(short))
+                short = []
+            if finer:
+                chunks.extend(self._split(piece, finer))
+            else:
+                chunks.append(piece)
+        
+        if short:
+            chunks.extend(self._merge(short))
+        return chunks
+    
+    @staticmethod
+    def _split_keeping_separator(text, separator):
+        """Split text on a literal separator, prefixing it to every piece but the first."""
+        if not separator:
+            return list(text)
+        
+        first, *rest = text.split(separator)
+        pieces = [first] if first else []
+        pieces.extend(separator + piece for piece in rest)
+        return pieces
+    
+    def _merge(self, pieces):
+        """Pack consecutive pieces into chunks, keeping up to chunk_overlap characters between them."""
+        chunk_size = self._chunk_size
+        chunk_overlap = self._chunk_overlap
+        
+        chunks = []
+        current = deque()
+        total = 0
+        for piece in pieces:
+            length = len(piece)
+            if total + length > chunk_size:
+                if total > chunk_size:
+                    logger.warning(
+                        f"Created a chunk of size {total}, which is longer than the specified {chunk_size}"
+                    )
+                if current:
+                    chunk = "".join(current).strip()
+                    if chunk:
+                        chunks.append(chunk)
+                    # Drop pieces from the front until the overlap fits with the next piece
+                    while total > chunk_overlap or (total + length > chunk_size and total > 0):
+                        total -= len(current.popleft())
+            current.append(piece)
+            total += length
+        
+        chunk = "".join(current).strip()
+        if chunk:
+            chunks.append(chunk)
+        return chunks
@@ -1,5 +1,8 @@
 from pypdf import PdfReader
 
+from file_manager import FileManager
+from pdf_processor import count_words
+
 
 def get_basic_metadata(reader):
     """Extract metadata from a PdfReader object."""
@@ -33,10 +36,22 @@ def get_total_words(reader):
     for page in reader.pages:
         text = page.extract_text()
         if text:
-            total_words += len(text.split())
+            total_words += count_words(text)
     return {"total_words": total_words}
 
 
+def get_text_and_word_count(reader):
+    """Extract the text of every page and count its words in a single pass."""
+    pages_text = []
+    total_words = 0
+    for page in reader.pages:
+        text = page.extract_text()
+        if text:
+            pages_text.append(text)
+            total_words += count_words(text)
+    return pages_text, total_words
+
+
 def get_image_count(reader):
     """Count the total number of images in the PDF."""
     total_images = 0
@@ -52,38 +67,68 @@ def get_attachment_count(reader):
     return {"total_attachments": 0}
 
 
-def append_metadata_to_json(filename, metadata, file_path="complete_metadata.json"):
-    """Write metadata dictionary to a JSON file. Maintain a list of entries."""
-    import json
+def append_metadata_to_json(filename, metadata, file_path="complete_metadata.jsonl"):
+    """Append a metadata entry to a JSON-lines file, one {filename: metadata} object per line."""
+    import orjson
     import os
 
     try:
-        # Read existing data if file exists
-        if os.path.exists(file_path):
-            with open(file_path, 'r') as f:
-                try:
-                    data = json.load(f)
-                    # Ensure data is a list
-                    if not isinstance(data, list):
-                        data = [data]
-                except json.JSONDecodeError:
-                    # File is empty or invalid, start fresh
-                    data = []
-        else:
-            data = []
-
-        # Append new metadata
-        data.append({filename: metadata})
-
-        # Write back to file
-        with open(file_path, 'w') as f:
-            json.dump(data, f, indent=4)
-
-        print(f"Metadata written to {file_path}. Total entries: {len(data)}")
+        _convert_json_array_to_lines(file_path)
+
+        # Appending one line keeps each call O(1) instead of rewriting the whole file
+        record = orjson.dumps({filename: metadata})
+        with open(file_path, 'ab+') as f:
+            # Start on a new line if the last one was cut short, so it doesn't swallow this entry
+            if f.seek(0, os.SEEK_END):
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    record = b"\n" + record
+            f.write(record + b"\n")
+
+        print(f"Metadata appended to {file_path}")
     except Exception as e:
         print(f"Error writing metadata to file: {e}")
 
 
+def _convert_json_array_to_lines(file_path):
+    """Rewrite a file holding a JSON array of entries as JSON lines, if needed."""
+    import orjson
+    import os
+
+    if not os.path.exists(file_path):
+        return
+
+    with open(file_path, 'rb') as f:
+        if f.read(64).lstrip()[:1] != b'[':
+            return
+        f.seek(0)
+        try:
+            data = orjson.loads(f.read())
+        except orjson.JSONDecodeError:
+            return
+
+    with open(file_path, 'wb') as f:
+        for entry in data:
+            f.write(orjson.dumps(entry) + b"\n")
+
+
+def load_jsonl(file_path):
+    """Load all entries of a JSON-lines metadata file, skipping invalid lines."""
+    import orjson
+
+    entries = []
+    with open(file_path, 'rb') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                entries.append(orjson.loads(line))
+            except orjson.JSONDecodeError:
+                # A crash mid-append can leave a truncated line
+                continue
+    return entries
+
+
 def extract_images_from_pdf(reader, filename, output_folder="data/images"):
     """Extract images from a PDF and save them to the specified output folder."""
     import os
@@ -92,14 +137,14 @@ def extract_images_from_pdf(reader, filename, output_folder="data/images"):
         if not os.path.exists(output_folder):
             os.makedirs(output_folder)
 
+        base_name = os.path.splitext(filename)[0]
         for page_num, page in enumerate(reader.pages):
             for img_index, img in enumerate(page.images):
-                image_data = img.data
-                image_filename = f"{os.path.splitext(filename)[0]}_page{page_num+1}_img{img_index+1}.{img.name}"
+                image_filename = f"{base_name}_page{page_num+1}_img{img_index+1}.{img.name}"
                 image_path = os.path.join(output_folder, image_filename)
 
-                with open(image_path, 'wb') as img_file:
-                    img_file.write(image_data)
+                # open/write/close on the raw descriptor, without a buffered file object
+                FileManager.write_bytes(image_path, img.data)
 
                 print(f"Extracted image to {image_path}")
     except Exception as e:
@@ -109,18 +154,19 @@ def extract_images_from_pdf(reader, filename, output_folder="data/images"):
 def move_files_to_processed_folder(source_folder="data/pending", dest_folder="data/processed"):
     """Move processed files to a 'processed' folder."""
     import os
-    import shutil
 
+    file_name = None
     try:
         if not os.path.exists(dest_folder):
             os.makedirs(dest_folder)
 
-        for file_name in os.listdir(source_folder):
-            source_path = os.path.join(source_folder, file_name)
-            dest_path = os.path.join(dest_folder, file_name)
+        with os.scandir(source_folder) as entries:
+            for entry in entries:
+                file_name = entry.name
+                dest_path = os.path.join(dest_folder, file_name)
 
-            shutil.move(source_path, dest_path)
-            print(f"Moved {file_name} to {dest_folder}")
+                FileManager.rename_file(entry.path, dest_path)
+                print(f"Moved {file_name} to {dest_folder}")
     except Exception as e:
         print(f"Error moving file {file_name}: {e}")
 
@@ -135,30 +181,59 @@ def get_pdf_reader(file_path):
         return None
 
 
-def get_metadata(reader):
+def get_metadata(reader, text_cache=None):
+    """Collect all metadata; reuse text_cache (page texts) to avoid re-extracting text."""
+    metadata, _ = get_metadata_and_text(reader, text_cache)
+    return metadata
+
+
+def get_metadata_and_text(reader, text_cache=None):
+    """
+    Collect all metadata and the page texts in a single pass over the pages.
+
+    Returns (metadata, pages_text); pages_text is text_cache when given, or the
+    non-empty page texts extracted along the way, ready for "\n".join().
+    """
+    num_pages = 0
+    total_images = 0
+    pages_text = [] if text_cache is None else text_cache
+    for page in reader.pages:
+        num_pages += 1
+        total_images += len(page.images)
+        if text_cache is None:
+            text = page.extract_text()
+            if text:
+                pages_text.append(text)
+
     metadata = get_basic_metadata(reader)
-    num_pages = get_num_pages(reader)
-    total_words = get_total_words(reader)
-    image_count = get_image_count(reader)
-    attachment_count = get_attachment_count(reader)
+    metadata["num_pages"] = num_pages
+    metadata["total_words"] = sum(count_words(text) for text in pages_text)
+    metadata["total_images"] = total_images
+    metadata.update(get_attachment_count(reader))
 
-    return {**metadata, **num_pages, **total_words, **image_count, **attachment_count}
+    return metadata, pages_text
 
 
 def get_all_readers(folder_path):
-    """Get PdfReader objects for all PDF files in a folder."""
+    """
+    Yield (filename, PdfReader) for each PDF file in a folder, one at a time.
+
+    Each reader is closed once the caller moves on to the next file, so only
+    one PDF is held open at a time; do not keep readers past their iteration.
+    """
     import os
-    readers = []
 
     if not os.path.isdir(folder_path):
         print(
             f"The folder path {folder_path} does not exist or is not a directory.")
-        return readers
+        return
 
     for filename in os.listdir(folder_path):
         if filename.lower().endswith('.pdf'):
             file_path = os.path.join(folder_path, filename)
             reader = get_pdf_reader(file_path)
             if reader:
-                readers.append((filename, reader))
-    return readers
+                try:
+                    yield filename, reader
+                finally:
+                    reader.close()
@@ -2,51 +2,186 @@
 FastAPI web interface for PDF-Insight.
 Provides web UI and API endpoints for all existing functionalities.
 """
+import io
 import logging
+import os
+import stat
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from itertools import islice
 from pathlib import Path
 from typing import List, Optional, Dict, Any
 import shutil
 
-from fastapi import FastAPI, UploadFile, File, Request, HTTPException, Form
-from fastapi.responses import HTMLResponse, JSONResponse, FileResponse
+from fastapi import FastAPI, UploadFile, File, Request, HTTPException, Form, Query
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import HTMLResponse, JSONResponse, FileResponse, Response, ORJSONResponse, StreamingResponse
+import orjson
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
 import config
+from app import iter_results, save_result, select_pending
 from database import Database
-from pdf_processor import PDFProcessor
 from file_manager import FileManager
-from embeddings import EmbeddingsManager
+
+
+# Served files that are already compressed; gzipping them again only costs CPU
+_UNCOMPRESSED_PATH_PREFIXES = ("/api/image/", "/api/download-pdf/")
+
+
+class _SelectiveGZipMiddleware(GZipMiddleware):
+    """GZip responses, except images and PDFs served from disk."""
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith(_UNCOMPRESSED_PATH_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+def _warm_up_embeddings():
+    """Load the embedding model and encode once, so the first request finds it ready."""
+    try:
+        get_embeddings_manager().generate_embeddings(["warm-up"])
+        logger.info("Embeddings manager ready")
+    except Exception as e:
+        logger.warning(f"Embeddings warm-up failed, loading on first use instead: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """Start the embeddings warm-up without delaying the server startup."""
+    if config.WARM_UP_EMBEDDINGS:
+        threading.Thread(target=_warm_up_embeddings, name="embeddings-warm-up", daemon=True).start()
+    yield
 
 
 # Initialize FastAPI app
 app = FastAPI(
     title="PDF-Insight",
     description="Batch PDF processing application for extracting metadata, images, and text",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
+app.add_middleware(_SelectiveGZipMiddleware, minimum_size=1024, compresslevel=5)
 
 # Setup templates and static files
 templates = Jinja2Templates(directory="templates")
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
-# Initialize database and embeddings manager
+# Initialize database, file manager and embeddings manager
+# Handlers that query SQLite or touch the disk are plain functions: FastAPI runs
+# them in its thread pool, and each pool thread keeps its own open connection
 db = Database(config.DATABASE_FILE)
+file_manager = FileManager()
 embeddings_manager = None  # Lazy initialization
+_embeddings_manager_lock = threading.Lock()
 
 def get_embeddings_manager():
     """Get or initialize the embeddings manager."""
     global embeddings_manager
     if embeddings_manager is None:
-        embeddings_manager = EmbeddingsManager()
+        # Requests arriving during the startup warm-up wait for it instead of loading a second model
+        with _embeddings_manager_lock:
+            if embeddings_manager is None:
+                # Imported here: sentence-transformers and chromadb take seconds to load
+                from embeddings import EmbeddingsManager
+                embeddings_manager = EmbeddingsManager()
     return embeddings_manager
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
+# Serialized API responses by endpoint, as (etag, body)
+_response_cache = {}
+
+
+def _cached_json_response(request, key, compute):
+    """
+    Serve a JSON payload that only depends on the pdf_documents table.
+    
+    The payload is rebuilt only when the pdf_documents version changes, and
+    clients sending the current ETag in If-None-Match get a 304.
+    
+    Args:
+        request (Request): Incoming request
+        key (str or None): Cache key of the endpoint. If None, the body is
+            rebuilt on every request and only the 304 check applies.
+        compute (callable): Builds the payload from the database
+        
+    Returns:
+        Response: 304 response or JSON response with an ETag header
+    """
+    etag = f'"v{db.get_pdf_documents_version()}"'
+    headers = {"ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    
+    if key is None:
+        return Response(content=orjson.dumps(compute()), media_type="application/json", headers=headers)
+    
+    cached = _response_cache.get(key)
+    if cached is None or cached[0] != etag:
+        cached = (etag, orjson.dumps(compute()))
+        _response_cache[key] = cached
+    return Response(content=cached[1], media_type="application/json", headers=headers)
+
+
+# Seconds the embeddings collection summary is reused; building it reads the
+# metadata of every stored chunk, and the stats pages are polled
+COLLECTION_STATS_TTL = 5
+
+# Cached collection summary as (expires_at, stats), or None
+_collection_stats = None
+_collection_stats_lock = threading.Lock()
+
+
+def _get_collection_stats():
+    """
+    Get the embeddings collection statistics, reused for COLLECTION_STATS_TTL seconds.
+    
+    Concurrent requests wait for a single computation instead of each
+    scanning the collection.
+    
+    Returns:
+        dict: Statistics as returned by EmbeddingsManager.get_collection_stats
+    """
+    global _collection_stats
+    with _collection_stats_lock:
+        cached = _collection_stats
+        if cached is None or cached[0] <= time.monotonic():
+            stats = get_embeddings_manager().get_collection_stats()
+            cached = (time.monotonic() + COLLECTION_STATS_TTL, stats)
+            _collection_stats = cached
+        return cached[1]
+
+
+def _invalidate_collection_stats():
+    """Drop the cached collection statistics after embeddings change."""
+    global _collection_stats
+    _collection_stats = None
+
+
+def _compute_stats():
+    """Build the /api/stats payload from the aggregates computed in SQL."""
+    stats = db.get_statistics()
+    total_pdfs = stats['total_pdfs']
+    stats['avg_pages'] = stats['total_pages'] / total_pdfs if total_pdfs else 0
+    stats['avg_words'] = stats['total_words'] / total_pdfs if total_pdfs else 0
+    return stats
+
 
 # ==================== HTML Views ====================
 
+# Documents listed per page on /pdfs
+PDFS_PAGE_SIZE = 50
+
+
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
     """Home page."""
@@ -60,25 +195,30 @@ async def upload_page(request: Request):
 
 
 @app.get("/pdfs", response_class=HTMLResponse)
-async def pdfs_page(request: Request):
-    """Page showing all processed PDFs."""
-    pdfs = db.get_all_pdfs()
+def pdfs_page(request: Request, page: int = Query(1, ge=1)):
+    """Page showing processed PDFs, PDFS_PAGE_SIZE at a time."""
+    total = db.get_pdf_count()
+    total_pages = max(1, -(-total // PDFS_PAGE_SIZE))
+    page = min(page, total_pages)
+    pdfs = db.get_all_pdfs(limit=PDFS_PAGE_SIZE, offset=(page - 1) * PDFS_PAGE_SIZE)
     return templates.TemplateResponse("pdfs.html", {
         "request": request,
         "pdfs": pdfs,
-        "total": len(pdfs)
+        "total": total,
+        "page": page,
+        "total_pages": total_pages
     })
 
 
 @app.get("/pdf/{pdf_id}", response_class=HTMLResponse)
-async def pdf_detail_page(request: Request, pdf_id: int):
+def pdf_detail_page(request: Request, pdf_id: int):
     """Page showing details of a specific PDF."""
-    pdf = db.get_pdf_by_id(pdf_id)
+    pdf = db.get_pdf_with_children(pdf_id)
     if not pdf:
         raise HTTPException(status_code=404, detail="PDF not found")
     
-    images = db.get_images_by_pdf_id(pdf_id)
-    text = db.get_text_by_pdf_id(pdf_id)
+    images = pdf.pop('images')
+    text = pdf.pop('text')
     
     return templates.TemplateResponse("pdf_detail.html", {
         "request": request,
@@ -89,25 +229,14 @@ async def pdf_detail_page(request: Request, pdf_id: int):
 
 
 @app.get("/stats", response_class=HTMLResponse)
-async def stats_page(request: Request):
+def stats_page(request: Request):
     """Page showing database statistics."""
-    pdfs = db.get_all_pdfs()
-    
-    if pdfs:
-        total_pages = sum(pdf['num_pages'] or 0 for pdf in pdfs)
-        total_words = sum(pdf['total_words'] or 0 for pdf in pdfs)
-        total_images = sum(pdf['total_images'] or 0 for pdf in pdfs)
-        avg_pages = total_pages / len(pdfs)
-        avg_words = total_words / len(pdfs)
-    else:
-        total_pages = total_words = total_images = avg_pages = avg_words = 0
+    db_stats = _compute_stats()
     
     # Get embeddings statistics
     try:
-        em = get_embeddings_manager()
-        embeddings_stats = em.get_collection_stats()
-        pdfs_with_embeddings = db.get_pdfs_with_embeddings()
-        total_embeddings_chunks = sum(pdf.get('embeddings_count', 0) or 0 for pdf in pdfs_with_embeddings)
+        embeddings_stats = _get_collection_stats()
+        total_embeddings_chunks = db.get_embeddings_statistics()['total_embeddings_chunks']
     except Exception as e:
         logger.warning(f"Error getting embeddings stats: {e}")
         embeddings_stats = {
@@ -118,12 +247,7 @@ async def stats_page(request: Request):
         total_embeddings_chunks = 0
     
     stats = {
-        "total_pdfs": len(pdfs),
-        "total_pages": total_pages,
-        "total_words": total_words,
-        "total_images": total_images,
-        "avg_pages": avg_pages,
-        "avg_words": avg_words,
+        **db_stats,
         "total_embeddings": embeddings_stats.get("total_embeddings", 0),
         "pdfs_with_embeddings": embeddings_stats.get("total_pdfs_with_embeddings", 0),
         "total_embeddings_chunks": total_embeddings_chunks,
@@ -137,10 +261,9 @@ async def stats_page(request: Request):
 
 
 @app.get("/process", response_class=HTMLResponse)
-async def process_page(request: Request):
+def process_page(request: Request):
     """Page for processing PDFs."""
     # Get pending PDFs
-    file_manager = FileManager()
     pending_files = file_manager.get_pdf_files(config.PENDING_DIR)
     pending_list = [f.name for f in pending_files]
     
@@ -154,72 +277,65 @@ async def process_page(request: Request):
 # ==================== API Endpoints ====================
 
 @app.get("/api/pdfs")
-async def get_pdfs() -> List[Dict[str, Any]]:
-    """Get all processed PDFs."""
-    return db.get_all_pdfs()
+def get_pdfs(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1),
+    offset: int = Query(0, ge=0)
+) -> List[Dict[str, Any]]:
+    """Get processed PDFs, all of them unless limit is given."""
+    if limit is None and not offset:
+        return _cached_json_response(request, "pdfs", db.get_all_pdfs)
+    # Pages are not kept in the cache, which would grow with every distinct window
+    return _cached_json_response(request, None, lambda: db.get_all_pdfs(limit=limit, offset=offset))
+
+
+@app.get("/api/pdfs.ndjson")
+def stream_pdfs():
+    """Stream all processed PDFs as newline-delimited JSON, one document per line."""
+    def lines():
+        # One chunk per database batch rather than one send per document
+        for batch in db.iter_all_pdfs():
+            yield b"".join(orjson.dumps(pdf, option=orjson.OPT_APPEND_NEWLINE) for pdf in batch)
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
 
 
 @app.get("/api/pdf/{pdf_id}")
-async def get_pdf(pdf_id: int) -> Dict[str, Any]:
-    """Get details of a specific PDF."""
-    pdf = db.get_pdf_by_id(pdf_id)
+def get_pdf(pdf_id: int) -> Dict[str, Any]:
+    """
+    Get details of a specific PDF.
+    
+    Images are identified by pdf_id, page_number and image_index; they have
+    no id field.
+    """
+    # Document, images and text come back from a single query
+    pdf = db.get_pdf_with_children(pdf_id)
     if not pdf:
         raise HTTPException(status_code=404, detail="PDF not found")
     
-    # Add related data
-    pdf['images'] = db.get_images_by_pdf_id(pdf_id)
-    pdf['text'] = db.get_text_by_pdf_id(pdf_id)
-    
     return pdf
 
 
 @app.get("/api/pdf/by-filename/{filename}")
-async def get_pdf_by_filename(filename: str) -> Dict[str, Any]:
+def get_pdf_by_filename(filename: str) -> Dict[str, Any]:
     """Get details of a specific PDF by filename."""
-    pdf = db.get_pdf_by_filename(filename)
+    # Document, images and text come back from a single query
+    pdf = db.get_pdf_with_children(filename=filename)
     if not pdf:
         raise HTTPException(status_code=404, detail="PDF not found")
     
-    # Add related data
-    pdf['images'] = db.get_images_by_pdf_id(pdf['id'])
-    pdf['text'] = db.get_text_by_pdf_id(pdf['id'])
-    
     return pdf
 
 
 @app.get("/api/stats")
-async def get_stats() -> Dict[str, Any]:
+def get_stats(request: Request) -> Dict[str, Any]:
     """Get database statistics."""
-    pdfs = db.get_all_pdfs()
-    
-    if not pdfs:
-        return {
-            "total_pdfs": 0,
-            "total_pages": 0,
-            "total_words": 0,
-            "total_images": 0,
-            "avg_pages": 0,
-            "avg_words": 0
-        }
-    
-    total_pages = sum(pdf['num_pages'] or 0 for pdf in pdfs)
-    total_words = sum(pdf['total_words'] or 0 for pdf in pdfs)
-    total_images = sum(pdf['total_images'] or 0 for pdf in pdfs)
-    
-    return {
-        "total_pdfs": len(pdfs),
-        "total_pages": total_pages,
-        "total_words": total_words,
-        "total_images": total_images,
-        "avg_pages": total_pages / len(pdfs),
-        "avg_words": total_words / len(pdfs)
-    }
+    return _cached_json_response(request, "stats", _compute_stats)
 
 
 @app.get("/api/pending")
-async def get_pending_files() -> Dict[str, Any]:
+def get_pending_files() -> Dict[str, Any]:
     """Get list of pending PDF files."""
-    file_manager = FileManager()
     pending_files = file_manager.get_pdf_files(config.PENDING_DIR)
     
     return {
@@ -228,8 +344,52 @@ async def get_pending_files() -> Dict[str, Any]:
     }
 
 
+# Copy uploads in 1 MiB steps instead of copyfileobj's default buffer
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+
+def _save_upload(src, dest_path):
+    """
+    Copy an uploaded file to dest_path without exposing a partial file.
+    
+    The data is written to a sibling ".part" file, which get_pdf_files does
+    not list, and renamed into place once complete. Uploads spooled to disk
+    are copied in the kernel with os.sendfile; in-memory uploads, and
+    platforms where sendfile cannot target a regular file, use a buffered copy.
+    
+    Args:
+        src: Binary file object of the upload, positioned at its start
+        dest_path (Path): Final path of the file
+    """
+    part_path = dest_path.with_name(dest_path.name + ".part")
+    try:
+        with open(part_path, "wb") as buffer:
+            try:
+                # fileno() would roll an in-memory spooled file over to disk
+                if not getattr(src, "_rolled", True):
+                    raise io.UnsupportedOperation("upload is held in memory")
+                src_fd = src.fileno()
+                dst_fd = buffer.fileno()
+                offset = 0
+                while True:
+                    sent = os.sendfile(dst_fd, src_fd, offset, UPLOAD_CHUNK_SIZE)
+                    if not sent:
+                        break
+                    offset += sent
+            except (AttributeError, OSError):
+                # Restart from scratch in case sendfile copied part of the file
+                src.seek(0)
+                buffer.seek(0)
+                buffer.truncate()
+                shutil.copyfileobj(src, buffer, UPLOAD_CHUNK_SIZE)
+        os.replace(part_path, dest_path)
+    except BaseException:
+        part_path.unlink(missing_ok=True)
+        raise
+
+
 @app.post("/api/upload")
-async def upload_pdfs(files: List[UploadFile] = File(...)) -> Dict[str, Any]:
+def upload_pdfs(files: List[UploadFile] = File(...)) -> Dict[str, Any]:
     """Upload PDF files to pending directory."""
     if not files:
         raise HTTPException(status_code=400, detail="No files provided")
@@ -237,6 +397,12 @@ async def upload_pdfs(files: List[UploadFile] = File(...)) -> Dict[str, Any]:
     uploaded = []
     errors = []
     
+    # List the pending folder once instead of a stat per uploaded file
+    try:
+        existing = set(os.listdir(config.PENDING_DIR))
+    except FileNotFoundError:
+        existing = set()
+    
     for file in files:
         if not file.filename.lower().endswith('.pdf'):
             errors.append(f"{file.filename}: Not a PDF file")
@@ -246,13 +412,13 @@ async def upload_pdfs(files: List[UploadFile] = File(...)) -> Dict[str, Any]:
             file_path = config.PENDING_DIR / file.filename
             
             # Check if file already exists
-            if file_path.exists():
+            if file.filename in existing:
                 errors.append(f"{file.filename}: File already exists")
                 continue
             
             # Save file
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
+            _save_upload(file.file, file_path)
+            existing.add(file.filename)
             
             uploaded.append(file.filename)
             logger.info(f"Uploaded file: {file.filename}")
@@ -261,6 +427,9 @@ async def upload_pdfs(files: List[UploadFile] = File(...)) -> Dict[str, Any]:
             logger.error(f"Error uploading {file.filename}: {e}")
             errors.append(f"{file.filename}: {str(e)}")
     
+    if uploaded:
+        FileManager.clear_pdf_files_cache(config.PENDING_DIR)
+    
     return {
         "success": True,
         "uploaded": len(uploaded),
@@ -269,13 +438,25 @@ async def upload_pdfs(files: List[UploadFile] = File(...)) -> Dict[str, Any]:
     }
 
 
+# Held while a processing run is in progress; a second run would extract and
+# save the same pending files again, so it is refused instead of queued
+_process_lock = threading.Lock()
+
+
 @app.post("/api/process")
-async def process_pdfs() -> Dict[str, Any]:
+def process_pdfs() -> Dict[str, Any]:
     """Process all pending PDFs."""
+    if not _process_lock.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="Processing is already in progress")
+    try:
+        return _process_pending()
+    finally:
+        _process_lock.release()
+
+
+def _process_pending():
+    """Process all pending PDFs, with the processing lock held."""
     try:
-        pdf_processor = PDFProcessor()
-        file_manager = FileManager()
-        
         # Get all PDF files from pending directory
         pdf_files = file_manager.get_pdf_files(config.PENDING_DIR)
         
@@ -289,83 +470,24 @@ async def process_pdfs() -> Dict[str, Any]:
             }
         
         processed_count = 0
-        skipped_count = 0
         error_count = 0
         errors = []
         
-        for pdf_path in pdf_files:
+        # Filter out already processed files and assign hex IDs
+        pending, file_hashes, skipped_count = select_pending(db, file_manager, pdf_files)
+        
+        # Extraction may run in worker processes; SQLite writes stay in this process
+        for pdf_path, result, error in iter_results(pending):
             filename = pdf_path.name
-            
-            try:
-                # Check if already processed
-                if config.SKIP_PROCESSED_FILES and db.pdf_exists(filename):
-                    logger.info(f"Skipping {filename} (already processed)")
-                    skipped_count += 1
-                    continue
-                
-                # Generate unique hex ID
-                hex_id = Database.generate_hex_id(config.HEX_ID_LENGTH)
-                
-                # Open PDF
-                reader = pdf_processor.open_pdf(pdf_path)
-                if not reader:
-                    error_count += 1
-                    errors.append(f"Failed to open: {filename}")
-                    continue
-                
-                # Extract metadata
-                metadata = pdf_processor.get_complete_metadata(reader)
-                if not metadata:
-                    error_count += 1
-                    errors.append(f"Failed to extract metadata: {filename}")
-                    continue
-                
-                # Save metadata to database
-                pdf_id = db.add_pdf_document(filename, metadata)
-                if not pdf_id:
-                    error_count += 1
-                    errors.append(f"Failed to save metadata: {filename}")
-                    continue
-                
-                # Extract images if configured
-                if config.EXTRACT_IMAGES:
-                    images_info = pdf_processor.extract_images(
-                        reader, 
-                        filename, 
-                        config.IMAGES_DIR,
-                        hex_id,
-                        config.IMAGE_NAME_TEMPLATE
-                    )
-                    
-                    for img_info in images_info:
-                        db.add_image(
-                            pdf_id,
-                            img_info['filename'],
-                            img_info['page'],
-                            img_info['index'],
-                            img_info['extension']
-                        )
-                
-                # Extract text if configured
-                if config.EXTRACT_TEXT:
-                    text_content, word_count = pdf_processor.extract_text(reader)
-                    text_filename, text_file_path = file_manager.save_text_file(
-                        pdf_path.stem, 
-                        text_content, 
-                        config.TEXT_DIR,
-                        hex_id
-                    )
-                    
-                    if text_filename and text_file_path:
-                        db.add_text(pdf_id, text_filename, word_count)
-                
+            if error is not None:
+                logger.error(f"Error processing {filename}: {error}", exc_info=error)
+                error_count += 1
+                errors.append(f"{filename}: {str(error)}")
+            elif save_result(db, result, file_hashes.get(pdf_path)):
                 processed_count += 1
-                
-            except Exception as e:
-                logger.error(f"Error processing {filename}: {e}", exc_info=True)
+            else:
                 error_count += 1
-                errors.append(f"{filename}: {str(e)}")
-                continue
+                errors.append(result['error'] or f"Failed to save metadata: {filename}")
         
         # Move processed files if configured
         moved_count = 0
@@ -391,37 +513,118 @@ async def process_pdfs() -> Dict[str, Any]:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Extracted images and texts are named with unique hex IDs, so browsers may
+# reuse them without asking; PDFs are revalidated against their ETag
+EXTRACTED_FILE_CACHE_CONTROL = "public, max-age=3600"
+PDF_CACHE_CONTROL = "no-cache"
+
+
+def _file_path(directory, filename):
+    """
+    Join a requested file name onto a data directory as a string path.
+    
+    os.path.join avoids building Path objects per request. Names with path
+    separators or dot entries are refused, so a request cannot leave the directory.
+    
+    Args:
+        directory (str or Path): Data directory
+        filename (str): Requested file name
+        
+    Returns:
+        str or None: Path of the file, or None if filename is not a plain file name
+    """
+    if filename in ("", ".", "..") or "/" in filename or "\\" in filename:
+        return None
+    return os.path.join(directory, filename)
+
+
+def _stat_file(path):
+    """Return the os.stat_result of path if it is a regular file, None otherwise."""
+    if path is None:
+        return None
+    try:
+        file_stat = os.stat(path)
+    except OSError:
+        return None
+    return file_stat if stat.S_ISREG(file_stat.st_mode) else None
+
+
+def _file_response(request, path, file_stat, cache_control, headers=None, **kwargs):
+    """
+    Serve a file with an ETag, answering a matching If-None-Match with 304.
+    
+    The stat result is handed to FileResponse so the file is not stat'ed again.
+    
+    Args:
+        request (Request): Incoming request
+        path (str): Path of the file
+        file_stat (os.stat_result): Stat result of the file
+        cache_control (str): Cache-Control header value
+        headers (dict, optional): Additional response headers
+        **kwargs: Passed on to FileResponse (media_type, filename)
+        
+    Returns:
+        Response: 304 response or FileResponse
+    """
+    etag = f'"{file_stat.st_mtime_ns:x}-{file_stat.st_size:x}"'
+    headers = {**(headers or {}), "ETag": etag, "Cache-Control": cache_control}
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (
+            if_none_match.strip() == "*" or etag in (tag.strip() for tag in if_none_match.split(","))):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, headers=headers, stat_result=file_stat, **kwargs)
+
+
 @app.get("/api/image/{filename}")
-async def get_image(filename: str):
+async def get_image(request: Request, filename: str):
     """Serve an extracted image file."""
-    image_path = config.IMAGES_DIR / filename
-    if not image_path.exists():
+    image_path = _file_path(config.IMAGES_DIR, filename)
+    file_stat = _stat_file(image_path)
+    if file_stat is None:
         raise HTTPException(status_code=404, detail="Image not found")
-    return FileResponse(image_path)
+    return _file_response(request, image_path, file_stat, EXTRACTED_FILE_CACHE_CONTROL)
 
 
 @app.get("/api/text/{filename}")
-async def get_text(filename: str):
-    """Serve an extracted text file."""
-    text_path = config.TEXT_DIR / filename
-    if not text_path.exists():
+async def get_text(request: Request, filename: str):
+    """Serve an extracted text file, gzip-encoded when the client accepts it."""
+    text_path = _file_path(config.TEXT_DIR, filename)
+    file_stat = _stat_file(text_path)
+    if file_stat is None:
         raise HTTPException(status_code=404, detail="Text file not found")
-    return FileResponse(text_path)
+    
+    # FileResponse sends the file in chunks, so only the encoding needs choosing
+    headers = {"Vary": "Accept-Encoding"}
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        gz_path = text_path + ".gz"
+        gz_stat = _stat_file(gz_path)
+        if gz_stat is not None:
+            headers["Content-Encoding"] = "gzip"
+            return _file_response(request, gz_path, gz_stat, EXTRACTED_FILE_CACHE_CONTROL, headers,
+                                  media_type="text/plain; charset=utf-8")
+    return _file_response(request, text_path, file_stat, EXTRACTED_FILE_CACHE_CONTROL, headers,
+                          media_type="text/plain; charset=utf-8")
 
 
 @app.get("/api/download-pdf/{filename}")
-async def download_pdf(filename: str):
+async def download_pdf(request: Request, filename: str):
     """Download a processed PDF file."""
     # Try processed directory first
-    pdf_path = config.PROCESSED_DIR / filename
-    if not pdf_path.exists():
+    pdf_path = _file_path(config.PROCESSED_DIR, filename)
+    file_stat = _stat_file(pdf_path)
+    if file_stat is None:
         # Try pending directory as fallback
-        pdf_path = config.PENDING_DIR / filename
-        if not pdf_path.exists():
+        pdf_path = _file_path(config.PENDING_DIR, filename)
+        file_stat = _stat_file(pdf_path)
+        if file_stat is None:
             raise HTTPException(status_code=404, detail="PDF file not found")
     
-    return FileResponse(
-        path=str(pdf_path),
+    return _file_response(
+        request,
+        pdf_path,
+        file_stat,
+        PDF_CACHE_CONTROL,
         media_type="application/pdf",
         filename=filename
     )
@@ -430,13 +633,12 @@ async def download_pdf(filename: str):
 # ==================== Embeddings Views ====================
 
 @app.get("/embeddings", response_class=HTMLResponse)
-async def embeddings_page(request: Request):
+def embeddings_page(request: Request):
     """Page for managing embeddings."""
     pdfs_with = db.get_pdfs_with_embeddings()
     pdfs_without = db.get_pdfs_without_embeddings()
     
-    em = get_embeddings_manager()
-    stats = em.get_collection_stats()
+    stats = _get_collection_stats()
     
     return templates.TemplateResponse("embeddings.html", {
         "request": request,
@@ -447,7 +649,7 @@ async def embeddings_page(request: Request):
 
 
 @app.get("/search", response_class=HTMLResponse)
-async def search_page(request: Request):
+def search_page(request: Request):
     """Page for searching embeddings."""
     pdfs = db.get_pdfs_with_embeddings()
     return templates.TemplateResponse("search.html", {
@@ -458,31 +660,34 @@ async def search_page(request: Request):
 
 # ==================== Embeddings API Endpoints ====================
 
+# Text files read ahead of the embedding model by generate_all_embeddings
+TEXT_READ_AHEAD = 4
+
+
 @app.post("/api/embeddings/generate/{pdf_id}")
-async def generate_embeddings(pdf_id: int) -> Dict[str, Any]:
+def generate_embeddings(pdf_id: int) -> Dict[str, Any]:
     """Generate embeddings for a specific PDF."""
     try:
-        # Get PDF info
+        # Only the document and its text are needed, not its image rows
         pdf = db.get_pdf_by_id(pdf_id)
         if not pdf:
             raise HTTPException(status_code=404, detail="PDF not found")
         
-        # Get text file
         text_info = db.get_text_by_pdf_id(pdf_id)
         if not text_info:
             raise HTTPException(status_code=400, detail="No text extracted for this PDF")
         
         # Read text file
-        text_path = config.TEXT_DIR / text_info['filename']
-        if not text_path.exists():
+        try:
+            with open(os.path.join(config.TEXT_DIR, text_info['filename']), 'r', encoding='utf-8') as f:
+                text_content = f.read()
+        except FileNotFoundError:
             raise HTTPException(status_code=404, detail="Text file not found")
         
-        with open(text_path, 'r', encoding='utf-8') as f:
-            text_content = f.read()
-        
         # Generate embeddings
         em = get_embeddings_manager()
         embeddings_count = em.add_pdf_embeddings(pdf_id, pdf['filename'], text_content)
+        _invalidate_collection_stats()
         
         # Update database
         db.update_embeddings_status(pdf_id, embeddings_count)
@@ -501,9 +706,24 @@ async def generate_embeddings(pdf_id: int) -> Dict[str, Any]:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Held while embeddings are generated for all PDFs; a second run would encode
+# the same PDFs again, so it is refused instead of queued
+_generate_all_lock = threading.Lock()
+
+
 @app.post("/api/embeddings/generate-all")
-async def generate_all_embeddings() -> Dict[str, Any]:
+def generate_all_embeddings() -> Dict[str, Any]:
     """Generate embeddings for all PDFs that don't have them."""
+    if not _generate_all_lock.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="Embedding generation is already in progress")
+    try:
+        return _generate_missing_embeddings()
+    finally:
+        _generate_all_lock.release()
+
+
+def _generate_missing_embeddings():
+    """Generate embeddings for all PDFs that don't have them, with the generation lock held."""
     try:
         pdfs_without = db.get_pdfs_without_embeddings()
         
@@ -519,39 +739,69 @@ async def generate_all_embeddings() -> Dict[str, Any]:
         processed = 0
         errors = []
         
-        for pdf in pdfs_without:
+        # Text files of all PDFs in one query rather than one per PDF
+        texts = db.get_texts_by_pdf_ids(pdf['id'] for pdf in pdfs_without)
+        # (pdf_id, embeddings_count) of stored PDFs whose status is not written yet
+        stored = []
+        
+        def flush_statuses():
+            if stored:
+                db.update_embeddings_status_many(list(stored))
+                stored.clear()
+        
+        def load_text(pdf):
+            """Read the text file of a PDF, returning (pdf, text, error)."""
+            text_info = texts.get(pdf['id'])
+            if not text_info:
+                return pdf, None, "No text extracted"
+            
             try:
-                # Get text file
-                text_info = db.get_text_by_pdf_id(pdf['id'])
-                if not text_info:
-                    errors.append(f"{pdf['filename']}: No text extracted")
-                    continue
-                
-                # Read text file
-                text_path = config.TEXT_DIR / text_info['filename']
-                if not text_path.exists():
-                    errors.append(f"{pdf['filename']}: Text file not found")
+                with open(os.path.join(config.TEXT_DIR, text_info['filename']), 'r', encoding='utf-8') as f:
+                    return pdf, f.read(), None
+            except FileNotFoundError:
+                return pdf, None, "Text file not found"
+            except Exception as e:
+                logger.error(f"Error reading text of {pdf['filename']}: {e}")
+                return pdf, None, str(e)
+        
+        def read_texts():
+            # Text files are read a few PDFs ahead on threads while the model encodes
+            remaining = iter(pdfs_without)
+            with ThreadPoolExecutor(max_workers=TEXT_READ_AHEAD) as executor:
+                loads = deque(executor.submit(load_text, pdf) for pdf in islice(remaining, TEXT_READ_AHEAD))
+                while loads:
+                    pdf, text_content, error = loads.popleft().result()
+                    next_pdf = next(remaining, None)
+                    if next_pdf is not None:
+                        loads.append(executor.submit(load_text, next_pdf))
+                    
+                    if error:
+                        errors.append(f"{pdf['filename']}: {error}")
+                        continue
+                    # Asked for the next PDF, so any batch stored meanwhile is complete
+                    flush_statuses()
+                    yield pdf['id'], pdf['filename'], text_content
+        
+        # Chunks of several PDFs are encoded together; statuses are written once per stored batch
+        try:
+            for pdf_id, filename, embeddings_count, error in em.add_pdfs_embeddings(read_texts()):
+                if error:
+                    # Only this batch failed, the next one is still generated
+                    errors.append(f"{filename}: {error}")
                     continue
-                
-                with open(text_path, 'r', encoding='utf-8') as f:
-                    text_content = f.read()
-                
-                # Generate embeddings
-                embeddings_count = em.add_pdf_embeddings(pdf['id'], pdf['filename'], text_content)
-                
-                # Update database
-                db.update_embeddings_status(pdf['id'], embeddings_count)
-                
+                stored.append((pdf_id, embeddings_count))
                 processed += 1
-                logger.info(f"Generated {embeddings_count} embeddings for {pdf['filename']}")
-                
-            except Exception as e:
-                logger.error(f"Error processing {pdf['filename']}: {e}")
-                errors.append(f"{pdf['filename']}: {str(e)}")
+                logger.info(f"Generated {embeddings_count} embeddings for {filename}")
+        except Exception as e:
+            logger.error(f"Error generating embeddings batch: {e}")
+            errors.append(f"Embedding batch failed: {str(e)}")
+        finally:
+            flush_statuses()
+            _invalidate_collection_stats()
         
         return {
-            "success": True,
-            "message": f"Generated embeddings for {processed} PDFs",
+            "success": not errors,
+            "message": f"Generated embeddings for {processed} of {len(pdfs_without)} PDFs",
             "total": len(pdfs_without),
             "processed": processed,
             "errors": len(errors),
@@ -564,11 +814,12 @@ async def generate_all_embeddings() -> Dict[str, Any]:
 
 
 @app.delete("/api/embeddings/{pdf_id}")
-async def delete_embeddings(pdf_id: int) -> Dict[str, Any]:
+def delete_embeddings(pdf_id: int) -> Dict[str, Any]:
     """Delete embeddings for a specific PDF."""
     try:
         em = get_embeddings_manager()
         count = em.delete_pdf_embeddings(pdf_id)
+        _invalidate_collection_stats()
         
         # Update database
         db.clear_embeddings_status(pdf_id)
@@ -585,20 +836,20 @@ async def delete_embeddings(pdf_id: int) -> Dict[str, Any]:
 
 
 @app.get("/api/embeddings/stats")
-async def get_embeddings_stats() -> Dict[str, Any]:
+def get_embeddings_stats() -> Dict[str, Any]:
     """Get embeddings statistics."""
     try:
-        em = get_embeddings_manager()
-        stats = em.get_collection_stats()
+        stats = _get_collection_stats()
         
-        pdfs_with = db.get_pdfs_with_embeddings()
-        pdfs_without = db.get_pdfs_without_embeddings()
+        db_stats = db.get_embeddings_statistics()
+        pdfs_with = db_stats['pdfs_with_embeddings']
+        pdfs_without = db_stats['pdfs_without_embeddings']
         
         return {
             "collection_stats": stats,
-            "pdfs_with_embeddings": len(pdfs_with),
-            "pdfs_without_embeddings": len(pdfs_without),
-            "total_pdfs": len(pdfs_with) + len(pdfs_without)
+            "pdfs_with_embeddings": pdfs_with,
+            "pdfs_without_embeddings": pdfs_without,
+            "total_pdfs": pdfs_with + pdfs_without
         }
         
     except Exception as e:
@@ -607,7 +858,7 @@ async def get_embeddings_stats() -> Dict[str, Any]:
 
 
 @app.post("/api/search")
-async def search_embeddings(request: Dict[str, Any]) -> Dict[str, Any]:
+def search_embeddings(request: Dict[str, Any]) -> Dict[str, Any]:
     """Search embeddings using semantic search."""
     try:
         query = request.get("query")
@@ -620,16 +871,14 @@ async def search_embeddings(request: Dict[str, Any]) -> Dict[str, Any]:
         em = get_embeddings_manager()
         results = em.search_embeddings(query, n_results, pdf_id)
         
-        # Enrich results with PDF info
+        # Enrich results with PDF info, fetched for all hits in one query
+        pdfs = db.get_pdf_summaries_by_ids(
+            {result['metadata']['pdf_id'] for result in results['results']}
+        )
         for result in results['results']:
-            pdf_id = result['metadata']['pdf_id']
-            pdf = db.get_pdf_by_id(pdf_id)
+            pdf = pdfs.get(result['metadata']['pdf_id'])
             if pdf:
-                result['pdf_info'] = {
-                    "id": pdf['id'],
-                    "filename": pdf['filename'],
-                    "title": pdf.get('title')
-                }
+                result['pdf_info'] = pdf
         
         return results
         
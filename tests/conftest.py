@@ -4,8 +4,6 @@ pytest configuration and shared fixtures.
 import sys
 import pytest
 from pathlib import Path
-import tempfile
-import shutil
 
 # Add src to Python path
 src_path = Path(__file__).parent.parent / "src"
@@ -13,13 +11,9 @@ sys.path.insert(0, str(src_path))
 
 
 @pytest.fixture
-def temp_dir():
+def temp_dir(tmp_path):
     """Create a temporary directory for tests."""
-    temp_path = Path(tempfile.mkdtemp())
-    yield temp_path
-    # Cleanup
-    if temp_path.exists():
-        shutil.rmtree(temp_path)
+    return tmp_path
 
 
 @pytest.fixture
@@ -45,6 +39,16 @@ def temp_db_path(temp_dir):
     return temp_dir / "test.db"
 
 
+@pytest.fixture
+def memory_db():
+    """Create an in-memory database, for tests that don't need the file."""
+    from database import Database
+    
+    db = Database(":memory:")
+    yield db
+    db.close()
+
+
 @pytest.fixture
 def sample_pdf_metadata():
     """Sample PDF metadata for testing."""
@@ -1,8 +1,10 @@
 """
 Tests for Database class.
 """
+import sqlite3
 import sys
 from pathlib import Path
+import pytest
 from datetime import datetime
 
 # Add src to Python path
@@ -36,9 +38,9 @@ def test_database_creates_tables(temp_db_path):
     conn.close()
 
 
-def test_add_pdf_metadata(temp_db_path, sample_pdf_metadata):
+def test_add_pdf_metadata(memory_db, sample_pdf_metadata):
     """Test adding PDF metadata to database."""
-    db = Database(temp_db_path)
+    db = memory_db
     
     pdf_id = db.add_pdf_document(sample_pdf_metadata['filename'], sample_pdf_metadata)
     
@@ -47,9 +49,25 @@ def test_add_pdf_metadata(temp_db_path, sample_pdf_metadata):
     assert pdf_id > 0
 
 
-def test_get_pdf_by_filename(temp_db_path, sample_pdf_metadata):
+def test_add_pdf_metadata_updates_existing(memory_db, sample_pdf_metadata):
+    """Test that adding a known filename updates its row and keeps its ID."""
+    db = memory_db
+    pdf_id = db.add_pdf_document(sample_pdf_metadata['filename'], sample_pdf_metadata)
+    
+    updated_id = db.add_pdf_document(
+        sample_pdf_metadata['filename'], {**sample_pdf_metadata, 'title': 'New Title'}, 'c' * 64
+    )
+    
+    assert updated_id == pdf_id
+    assert db.get_pdf_count() == 1
+    pdf = db.get_pdf_by_id(pdf_id)
+    assert pdf['title'] == 'New Title'
+    assert pdf['file_hash'] == 'c' * 64
+
+
+def test_get_pdf_by_filename(memory_db, sample_pdf_metadata):
     """Test retrieving PDF by filename."""
-    db = Database(temp_db_path)
+    db = memory_db
     db.add_pdf_document(sample_pdf_metadata['filename'], sample_pdf_metadata)
     
     pdf = db.get_pdf_by_filename('test.pdf')
@@ -60,9 +78,9 @@ def test_get_pdf_by_filename(temp_db_path, sample_pdf_metadata):
     assert pdf['author'] == 'Test Author'
 
 
-def test_pdf_exists(temp_db_path, sample_pdf_metadata):
+def test_pdf_exists(memory_db, sample_pdf_metadata):
     """Test checking if PDF exists in database."""
-    db = Database(temp_db_path)
+    db = memory_db
     
     # Should not exist initially
     assert not db.pdf_exists('test.pdf')
@@ -74,9 +92,53 @@ def test_pdf_exists(temp_db_path, sample_pdf_metadata):
     assert db.pdf_exists('test.pdf')
 
 
-def test_add_image(temp_db_path, sample_pdf_metadata, sample_image_data):
+def test_pdf_exists_many(memory_db, sample_pdf_metadata, monkeypatch):
+    """Test checking several filenames with batched queries."""
+    import database
+    
+    db = memory_db
+    db.add_pdf_document(sample_pdf_metadata['filename'], sample_pdf_metadata)
+    db.add_pdf_document('other.pdf', sample_pdf_metadata)
+    monkeypatch.setattr(database, "SQLITE_MAX_PARAMS", 2)
+    
+    existing = db.pdf_exists_many(['missing.pdf', 'test.pdf', 'new.pdf', 'other.pdf', 'x.pdf'])
+    
+    assert existing == {'test.pdf', 'other.pdf'}
+    assert db.pdf_exists_many([]) == set()
+
+
+def test_pdf_exists_by_hash(memory_db, sample_pdf_metadata):
+    """Test checking if a PDF with the same content exists in database."""
+    db = memory_db
+    file_hash = 'a' * 64
+    
+    # Should not exist initially
+    assert not db.pdf_exists_by_hash(file_hash)
+    
+    # Add PDF with its content hash
+    db.add_pdf_document(sample_pdf_metadata['filename'], sample_pdf_metadata, file_hash)
+    
+    # Should exist now, regardless of filename
+    assert db.pdf_exists_by_hash(file_hash)
+    assert not db.pdf_exists_by_hash('b' * 64)
+    assert db.get_pdf_by_filename('test.pdf')['file_hash'] == file_hash
+
+
+def test_pdf_exists_by_hash_many(memory_db, sample_pdf_metadata):
+    """Test checking several content hashes at once."""
+    db = memory_db
+    db.add_pdf_document('a.pdf', sample_pdf_metadata, 'a' * 64)
+    db.add_pdf_document('c.pdf', sample_pdf_metadata, 'c' * 64)
+    
+    existing = db.pdf_exists_by_hash_many(['a' * 64, 'b' * 64, 'c' * 64])
+    
+    assert existing == {'a' * 64, 'c' * 64}
+    assert db.pdf_exists_by_hash_many([]) == set()
+
+
+def test_add_image(memory_db, sample_pdf_metadata, sample_image_data):
     """Test adding image reference to database."""
-    db = Database(temp_db_path)
+    db = memory_db
     pdf_id = db.add_pdf_document(sample_pdf_metadata['filename'], sample_pdf_metadata)
     
     image_id = db.add_image(
@@ -91,9 +153,93 @@ def test_add_image(temp_db_path, sample_pdf_metadata, sample_image_data):
     assert isinstance(image_id, int)
 
 
-def test_add_text(temp_db_path, sample_pdf_metadata):
+def test_add_images_many(memory_db, sample_pdf_metadata):
+    """Test adding several image references at once."""
+    db = memory_db
+    pdf_id = db.add_pdf_document(sample_pdf_metadata['filename'], sample_pdf_metadata)
+    
+    count = db.add_images_many(pdf_id, [
+        {'filename': 'test_img_001.jpg', 'page': 1, 'index': 1, 'extension': 'jpg'},
+        {'filename': 'test_img_002.png', 'page': 2, 'index': 2, 'extension': 'png'},
+    ])
+    
+    assert count == 2
+    images = db.get_images_by_pdf_id(pdf_id)
+    assert [img['filename'] for img in images] == ['test_img_001.jpg', 'test_img_002.png']
+
+
+def test_add_images_and_texts_bulk(memory_db, sample_pdf_metadata):
+    """Test adding image and text references given as tuples."""
+    db = memory_db
+    pdf_id = db.add_pdf_document(sample_pdf_metadata['filename'], sample_pdf_metadata)
+    
+    assert db.add_images_bulk(pdf_id, [('a.jpg', 1, 1, 'jpg'), ('b.png', 1, 2, 'png')]) == 2
+    assert db.add_texts_bulk(pdf_id, [('test_text.txt', 1000)]) == 1
+    
+    images = db.get_images_by_pdf_id(pdf_id)
+    assert [(img['filename'], img['image_index']) for img in images] == [('a.jpg', 1), ('b.png', 2)]
+    assert db.get_text_by_pdf_id(pdf_id)['word_count'] == 1000
+    
+    # Rows for a missing PDF are rejected as a whole
+    assert db.add_images_bulk(9999, [('c.jpg', 1, 1, 'jpg')]) is None
+
+
+def test_transaction_commit_and_rollback(memory_db, sample_pdf_metadata):
+    """Test that writes inside a transaction are committed or rolled back together."""
+    db = memory_db
+    
+    with db.transaction():
+        pdf_id = db.add_pdf_document(sample_pdf_metadata['filename'], sample_pdf_metadata)
+        db.add_text(pdf_id, 'test_text.txt', 1000)
+    
+    assert db.pdf_exists('test.pdf')
+    assert db.get_text_by_pdf_id(pdf_id) is not None
+    
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            db.add_pdf_document('rolled_back.pdf', sample_pdf_metadata)
+            raise RuntimeError("abort")
+    
+    assert not db.pdf_exists('rolled_back.pdf')
+
+
+def test_transaction_rolls_back_failed_write(memory_db, sample_pdf_metadata):
+    """Test that a write failing inside a transaction raises and rolls back the block."""
+    import sqlite3
+    
+    db = memory_db
+    rows = [('a_1.png', 1, 1, 'png'), ('a_2.png', 1, 1, 'png')]
+    
+    with pytest.raises(sqlite3.IntegrityError):
+        with db.transaction():
+            pdf_id = db.add_pdf_document('a.pdf', sample_pdf_metadata)
+            db.add_images_bulk(pdf_id, rows)
+    
+    assert not db.pdf_exists('a.pdf')
+    
+    # Outside a transaction the error is still logged and reported as None
+    pdf_id = db.add_pdf_document('a.pdf', sample_pdf_metadata)
+    assert db.add_images_bulk(pdf_id, rows) is None
+    assert db.get_images_by_pdf_id(pdf_id) == []
+
+
+def test_transaction_shares_timestamp(memory_db, sample_pdf_metadata):
+    """Test that rows written in one transaction get the same timestamp."""
+    db = memory_db
+    
+    with db.transaction():
+        pdf_id = db.add_pdf_document(sample_pdf_metadata['filename'], sample_pdf_metadata)
+        db.add_images_bulk(pdf_id, [('a.jpg', 1, 1, 'jpg')])
+        db.add_text(pdf_id, 'test_text.txt', 1000)
+    
+    processed_at = db.get_pdf_by_id(pdf_id)['processed_at']
+    assert db.get_images_by_pdf_id(pdf_id)[0]['extracted_at'] == processed_at
+    assert db.get_text_by_pdf_id(pdf_id)['extracted_at'] == processed_at
+
+
+def test_add_text(memory_db, sample_pdf_metadata):
     """Test adding text reference to database."""
-    db = Database(temp_db_path)
+    db = memory_db
     pdf_id = db.add_pdf_document(sample_pdf_metadata['filename'], sample_pdf_metadata)
     
     text_id = db.add_text(pdf_id, 'test_text.txt', 1000)
@@ -102,9 +248,9 @@ def test_add_text(temp_db_path, sample_pdf_metadata):
     assert isinstance(text_id, int)
 
 
-def test_get_all_pdfs(temp_db_path, sample_pdf_metadata):
+def test_get_all_pdfs(memory_db, sample_pdf_metadata):
     """Test retrieving all PDFs from database."""
-    db = Database(temp_db_path)
+    db = memory_db
     
     # Add multiple PDFs
     db.add_pdf_document(sample_pdf_metadata['filename'], sample_pdf_metadata)
@@ -119,9 +265,35 @@ def test_get_all_pdfs(temp_db_path, sample_pdf_metadata):
     assert all('filename' in pdf for pdf in pdfs)
 
 
-def test_get_pdf_statistics(temp_db_path, sample_pdf_metadata):
+def test_iter_all_pdfs(memory_db, sample_pdf_metadata):
+    """Test iterating over all PDFs in batches."""
+    db = memory_db
+    for i in range(5):
+        db.add_pdf_document(f'test{i}.pdf', sample_pdf_metadata)
+    
+    batches = list(db.iter_all_pdfs(batch_size=2))
+    
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert [pdf for batch in batches for pdf in batch] == db.get_all_pdfs()
+
+
+def test_get_all_pdfs_paginated(memory_db, sample_pdf_metadata):
+    """Test retrieving PDFs one page at a time."""
+    db = memory_db
+    for i in range(5):
+        db.add_pdf_document(f'test{i}.pdf', sample_pdf_metadata)
+    
+    all_pdfs = db.get_all_pdfs()
+    pages = [db.get_all_pdfs(limit=2, offset=offset) for offset in (0, 2, 4)]
+    
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert [pdf['id'] for page in pages for pdf in page] == [pdf['id'] for pdf in all_pdfs]
+    assert db.get_all_pdfs(offset=3) == all_pdfs[3:]
+
+
+def test_get_pdf_statistics(memory_db, sample_pdf_metadata):
     """Test getting database statistics."""
-    db = Database(temp_db_path)
+    db = memory_db
     db.add_pdf_document(sample_pdf_metadata['filename'], sample_pdf_metadata)
     
     count = db.get_pdf_count()
@@ -130,20 +302,180 @@ def test_get_pdf_statistics(temp_db_path, sample_pdf_metadata):
     assert count == 1
 
 
-def test_get_images_for_pdf(temp_db_path, sample_pdf_metadata, sample_image_data):
-    """Test retrieving images for a specific PDF."""
+def test_get_statistics(memory_db, sample_pdf_metadata):
+    """Test aggregate statistics computed by the database."""
+    db = memory_db
+    
+    assert db.get_statistics() == {
+        'total_pdfs': 0, 'total_pages': 0, 'total_words': 0, 'total_images': 0
+    }
+    
+    db.add_pdf_document(sample_pdf_metadata['filename'], sample_pdf_metadata)
+    db.add_pdf_document('test2.pdf', {**sample_pdf_metadata, 'num_pages': None})
+    
+    stats = db.get_statistics()
+    
+    assert stats['total_pdfs'] == 2
+    assert stats['total_pages'] == sample_pdf_metadata['num_pages']
+    assert stats['total_words'] == 2 * sample_pdf_metadata['total_words']
+
+
+def test_get_embeddings_statistics(memory_db, sample_pdf_metadata):
+    """Test embeddings counts computed by the database."""
+    db = memory_db
+    first_id = db.add_pdf_document(sample_pdf_metadata['filename'], sample_pdf_metadata)
+    second_id = db.add_pdf_document('test2.pdf', sample_pdf_metadata)
+    db.add_pdf_document('test3.pdf', sample_pdf_metadata)
+    db.update_embeddings_status(first_id, 12)
+    db.update_embeddings_status(second_id, 8)
+    
+    assert db.get_embeddings_statistics() == {
+        'pdfs_with_embeddings': 2, 'pdfs_without_embeddings': 1, 'total_embeddings_chunks': 20
+    }
+    
+    db.clear_embeddings_status(second_id)
+    
+    assert db.get_embeddings_statistics() == {
+        'pdfs_with_embeddings': 1, 'pdfs_without_embeddings': 2, 'total_embeddings_chunks': 12
+    }
+
+
+def test_update_embeddings_status_many(memory_db, sample_pdf_metadata):
+    """Test recording embeddings of several PDFs at once."""
+    db = memory_db
+    first_id = db.add_pdf_document(sample_pdf_metadata['filename'], sample_pdf_metadata)
+    second_id = db.add_pdf_document('test2.pdf', sample_pdf_metadata)
+    
+    assert db.update_embeddings_status_many([(first_id, 5), (second_id, 7)])
+    
+    assert [pdf['embeddings_count'] for pdf in (db.get_pdf_by_id(first_id), db.get_pdf_by_id(second_id))] == [5, 7]
+    assert db.get_pdfs_without_embeddings() == []
+
+
+def test_get_pdf_documents_version(temp_db_path, sample_pdf_metadata):
+    """Test that the version changes on document writes from any connection."""
     db = Database(temp_db_path)
+    other = Database(temp_db_path)
+    
+    version = db.get_pdf_documents_version()
+    assert db.get_pdf_documents_version() == version
+    
+    pdf_id = db.add_pdf_document(sample_pdf_metadata['filename'], sample_pdf_metadata)
+    inserted = db.get_pdf_documents_version()
+    assert inserted != version
+    
+    # Image rows do not affect the documents listing
+    db.add_image(pdf_id, 'img.png', 1, 1, 'png')
+    assert db.get_pdf_documents_version() == inserted
+    
+    other.update_embeddings_status(pdf_id, 5)
+    updated = db.get_pdf_documents_version()
+    assert updated != inserted
+    
+    other.delete_pdf(sample_pdf_metadata['filename'])
+    assert db.get_pdf_documents_version() != updated
+
+
+def test_get_pdf_with_children(memory_db, sample_pdf_metadata):
+    """Test that the joined lookup matches the separate lookups."""
+    db = memory_db
+    pdf_id = db.add_pdf_document(sample_pdf_metadata['filename'], sample_pdf_metadata)
+    bare_id = db.add_pdf_document('bare.pdf', sample_pdf_metadata)
+    db.add_image(pdf_id, 'img_b.png', 2, 1, 'png')
+    db.add_image(pdf_id, 'img_a.png', 1, 1, 'png')
+    db.add_text(pdf_id, 'text.txt', 42)
+    
+    pdf = db.get_pdf_with_children(pdf_id)
+    
+    assert {k: v for k, v in pdf.items() if k not in ('images', 'text')} == db.get_pdf_by_id(pdf_id)
+    assert pdf['images'] == db.get_images_by_pdf_id(pdf_id)
+    assert [image['filename'] for image in pdf['images']] == ['img_a.png', 'img_b.png']
+    assert pdf['text'] == db.get_text_by_pdf_id(pdf_id)
+    
+    bare = db.get_pdf_with_children(filename='bare.pdf')
+    assert bare['id'] == bare_id
+    assert bare['images'] == []
+    assert bare['text'] is None
+    
+    assert db.get_pdf_with_children(9999) is None
+
+
+def test_get_texts_by_pdf_ids(memory_db, sample_pdf_metadata):
+    """Test fetching the text files of several PDFs at once."""
+    db = memory_db
+    pdf_id = db.add_pdf_document(sample_pdf_metadata['filename'], sample_pdf_metadata)
+    empty_id = db.add_pdf_document('empty.pdf', sample_pdf_metadata)
+    db.add_text(pdf_id, 'test_text.txt', 42)
+    
+    texts = db.get_texts_by_pdf_ids([pdf_id, empty_id, 9999])
+    
+    assert list(texts) == [pdf_id]
+    assert texts[pdf_id] == db.get_text_by_pdf_id(pdf_id)
+    assert db.get_texts_by_pdf_ids([]) == {}
+
+
+def test_get_pdf_summaries_by_ids(memory_db, sample_pdf_metadata):
+    """Test fetching id, filename and title of several PDFs at once."""
+    db = memory_db
+    pdf_id = db.add_pdf_document(sample_pdf_metadata['filename'], sample_pdf_metadata)
+    other_id = db.add_pdf_document('other.pdf', {**sample_pdf_metadata, 'title': None})
+    
+    summaries = db.get_pdf_summaries_by_ids([pdf_id, other_id, 9999])
+    
+    assert summaries == {
+        pdf_id: {'id': pdf_id, 'filename': 'test.pdf', 'title': sample_pdf_metadata['title']},
+        other_id: {'id': other_id, 'filename': 'other.pdf', 'title': None}
+    }
+    assert db.get_pdf_summaries_by_ids([]) == {}
+
+
+def test_get_extracted_files(memory_db, sample_pdf_metadata):
+    """Test listing extracted files of all PDFs at once."""
+    db = memory_db
+    pdf_id = db.add_pdf_document(sample_pdf_metadata['filename'], sample_pdf_metadata)
+    db.add_pdf_document('empty.pdf', sample_pdf_metadata)
+    db.add_image(pdf_id, 'test_img_001.jpg', 1, 0, 'jpg')
+    db.add_image(pdf_id, 'test_img_002.jpg', 1, 1, 'jpg')
+    db.add_text(pdf_id, 'test_text.txt', 1000)
+    
+    files = db.get_extracted_files()
+    
+    assert files == [{
+        'filename': 'test.pdf',
+        'images': ['test_img_001.jpg', 'test_img_002.jpg'],
+        'text': 'test_text.txt'
+    }]
+
+
+def test_delete_pdf_cascades(memory_db, sample_pdf_metadata):
+    """Test that deleting a PDF also deletes its images and text."""
+    db = memory_db
+    pdf_id = db.add_pdf_document(sample_pdf_metadata['filename'], sample_pdf_metadata)
+    db.add_image(pdf_id, 'test_img_001.jpg', 1, 0, 'jpg')
+    db.add_text(pdf_id, 'test_text.txt', 1000)
+    
+    assert db.delete_pdf('test.pdf')
+    
+    assert db.get_images_by_pdf_id(pdf_id) == []
+    assert db.get_text_by_pdf_id(pdf_id) is None
+
+
+def test_get_images_for_pdf(memory_db, sample_pdf_metadata, sample_image_data):
+    """Test retrieving images for a specific PDF."""
+    db = memory_db
     pdf_id = db.add_pdf_document(sample_pdf_metadata['filename'], sample_pdf_metadata)
     
     # Add images
-    for i in range(3):
-        db.add_image(
-            pdf_id,
+    rows = [
+        (
             f'test_img_{i:03d}.jpg',
             sample_image_data['page_number'],
-            sample_image_data['image_index'],
+            sample_image_data['image_index'] + i,
             sample_image_data['file_extension']
         )
+        for i in range(3)
+    ]
+    assert db.add_images_bulk(pdf_id, rows) == 3
     
     images = db.get_images_by_pdf_id(pdf_id)
     
@@ -151,10 +483,111 @@ def test_get_images_for_pdf(temp_db_path, sample_pdf_metadata, sample_image_data
     assert all('filename' in img for img in images)
 
 
-def test_duplicate_pdf_handling(temp_db_path, sample_pdf_metadata):
-    """Test that duplicate filenames are handled correctly."""
+def test_images_table_rebuilt_without_rowid(temp_db_path, sample_pdf_metadata, caplog):
+    """Test that an images table with a surrogate id is migrated with its rows."""
+    db = Database(temp_db_path)
+    pdf_id = db.add_pdf_document(sample_pdf_metadata['filename'], sample_pdf_metadata)
+    conn = db._get_connection()
+    conn.execute("DROP TABLE images")
+    conn.execute("""
+        CREATE TABLE images (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            pdf_id INTEGER NOT NULL,
+            filename TEXT NOT NULL,
+            page_number INTEGER NOT NULL,
+            image_index INTEGER NOT NULL,
+            file_extension TEXT,
+            extracted_at TEXT NOT NULL
+        )
+    """)
+    conn.executemany(
+        "INSERT INTO images (pdf_id, filename, page_number, image_index, file_extension, extracted_at) "
+        "VALUES (?, ?, 1, 1, 'jpg', '2024-01-01T00:00:00')",
+        [(pdf_id, 'old_img_1.jpg'), (pdf_id, 'repeated_img_1.jpg'), (pdf_id + 1, 'orphan_img_1.jpg')]
+    )
+    conn.commit()
+    db.close()
+    
     db = Database(temp_db_path)
     
+    images = db.get_images_by_pdf_id(pdf_id)
+    assert [img['filename'] for img in images] == ['old_img_1.jpg']
+    assert 'id' not in images[0]
+    assert db.get_images_by_pdf_id(pdf_id + 1) == []
+    assert "Dropped 1 image row(s)" in caplog.text
+
+
+def test_images_table_rebuild_rolled_back(temp_db_path, sample_pdf_metadata, monkeypatch):
+    """Test that a rebuild failing midway leaves the old images table in place."""
+    import sqlite3
+    
+    db = Database(temp_db_path)
+    pdf_id = db.add_pdf_document(sample_pdf_metadata['filename'], sample_pdf_metadata)
+    conn = db._get_connection()
+    conn.execute("DROP TABLE images")
+    conn.execute("""
+        CREATE TABLE images (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            pdf_id INTEGER NOT NULL,
+            filename TEXT NOT NULL,
+            page_number INTEGER NOT NULL,
+            image_index INTEGER NOT NULL,
+            file_extension TEXT,
+            extracted_at TEXT NOT NULL
+        )
+    """)
+    conn.execute(
+        "INSERT INTO images (pdf_id, filename, page_number, image_index, file_extension, extracted_at) "
+        "VALUES (?, 'old_img_1.jpg', 1, 1, 'jpg', '2024-01-01T00:00:00')",
+        (pdf_id,)
+    )
+    conn.commit()
+    db.close()
+    
+    # Fail the last step of the rebuild
+    connect = Database._connect
+    
+    def connect_denying_drop(self):
+        conn = connect(self)
+        conn.set_authorizer(
+            lambda action, arg1, *_: sqlite3.SQLITE_DENY
+            if action == sqlite3.SQLITE_DROP_TABLE and arg1 == 'images_old' else sqlite3.SQLITE_OK
+        )
+        return conn
+    
+    monkeypatch.setattr(Database, "_connect", connect_denying_drop)
+    with pytest.raises(sqlite3.DatabaseError):
+        Database(temp_db_path)
+    monkeypatch.undo()
+    
+    conn = sqlite3.connect(temp_db_path)
+    try:
+        assert 'id' in [column[1] for column in conn.execute("PRAGMA table_info(images)")]
+        assert conn.execute("SELECT filename FROM images").fetchall() == [('old_img_1.jpg',)]
+        assert conn.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE name = 'images_old'"
+        ).fetchone()[0] == 0
+    finally:
+        conn.close()
+
+
+def test_iter_images_by_pdf_id(memory_db, sample_pdf_metadata):
+    """Test iterating over the images of a PDF lazily."""
+    db = memory_db
+    pdf_id = db.add_pdf_document(sample_pdf_metadata['filename'], sample_pdf_metadata)
+    db.add_images_bulk(pdf_id, [('a.jpg', 1, 1, 'jpg'), ('b.png', 2, 2, 'png')])
+    
+    images = db.iter_images_by_pdf_id(pdf_id)
+    
+    assert next(images)['filename'] == 'a.jpg'
+    assert [img['filename'] for img in images] == ['b.png']
+    assert list(db.iter_images_by_pdf_id(pdf_id + 1)) == []
+
+
+def test_duplicate_pdf_handling(memory_db, sample_pdf_metadata):
+    """Test that duplicate filenames are handled correctly."""
+    db = memory_db
+    
     # Add PDF first time
     pdf_id1 = db.add_pdf_document(sample_pdf_metadata['filename'], sample_pdf_metadata)
     
@@ -169,6 +602,27 @@ def test_duplicate_pdf_handling(temp_db_path, sample_pdf_metadata):
         pass
 
 
+def test_connection_reused_per_thread(temp_db_path):
+    """Test that a thread keeps one connection until the database is closed."""
+    import threading
+    
+    db = Database(temp_db_path)
+    conn = db._get_connection()
+    
+    assert db._get_connection() is conn
+    
+    other = []
+    thread = threading.Thread(target=lambda: other.append(db._get_connection()))
+    thread.start()
+    thread.join()
+    assert other[0] is not conn
+    
+    db.close()
+    
+    assert db._get_connection() is not conn
+    assert db.get_pdf_count() == 0
+
+
 def test_database_connection_cleanup(temp_db_path):
     """Test that database connections are properly managed."""
     db = Database(temp_db_path)
@@ -182,3 +636,34 @@ def test_database_connection_cleanup(temp_db_path):
     
     # Should not raise any errors
     assert True
+
+
+def test_memory_database_shared_across_threads(memory_db, sample_pdf_metadata):
+    """Test that connections from other threads see the same in-memory database."""
+    import threading
+    
+    memory_db.add_pdf_document('test.pdf', sample_pdf_metadata)
+    counts = []
+    thread = threading.Thread(target=lambda: counts.append(memory_db.get_pdf_count()))
+    thread.start()
+    thread.join()
+    
+    assert counts == [1]
+    assert not Path(":memory:").exists()
+    other_db = Database(":memory:")
+    try:
+        assert other_db.get_pdf_count() == 0
+    finally:
+        other_db.close()
+
+
+def test_close_discards_memory_database():
+    """Test that closing an in-memory database also closes its keep-alive connection."""
+    db = Database(":memory:")
+    keepalive = db._keepalive
+    
+    db.close()
+    
+    assert db._keepalive is None
+    with pytest.raises(sqlite3.ProgrammingError):
+        keepalive.execute("SELECT 1")
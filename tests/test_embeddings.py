@@ -2,30 +2,45 @@
 Tests for embeddings module.
 """
 import pytest
+import numpy as np
 from pathlib import Path
-import tempfile
-import shutil
+import zlib
 from unittest.mock import Mock, patch, MagicMock
 import sys
 
 
-@pytest.fixture
-def temp_chroma_dir():
-    """Create temporary directory for ChromaDB."""
-    temp_dir = Path(tempfile.mkdtemp())
-    yield temp_dir
-    if temp_dir.exists():
-        shutil.rmtree(temp_dir)
+class _StubModel:
+    """Stand-in for SentenceTransformer returning a fixed vector per text."""
+    
+    dimension = 384
+    
+    def encode(self, texts, **kwargs):
+        return np.stack([
+            np.random.default_rng(zlib.crc32(text.encode())).standard_normal(self.dimension)
+            for text in texts
+        ]).astype(np.float32)
+    
+    def get_sentence_embedding_dimension(self):
+        return self.dimension
+    
+    def half(self):
+        return self
 
 
 @pytest.fixture
-def embeddings_manager(temp_chroma_dir):
-    """Create an EmbeddingsManager instance for testing."""
+def fake_embedder(monkeypatch):
+    """Replace the sentence-transformers model for tests that don't check semantics."""
+    monkeypatch.setattr("embeddings._load_model", lambda *args, **kwargs: _StubModel())
+
+
+@pytest.fixture(scope="session")
+def shared_embeddings_manager(tmp_path_factory):
+    """Create one EmbeddingsManager for the session, so the model loads once."""
     from embeddings import EmbeddingsManager
     
     # Use a lightweight model for testing
     manager = EmbeddingsManager(
-        persist_directory=str(temp_chroma_dir),
+        persist_directory=str(tmp_path_factory.mktemp("chroma_db")),
         model_name="all-MiniLM-L6-v2",
         chunk_size=100,
         chunk_overlap=10
@@ -33,6 +48,43 @@ def embeddings_manager(temp_chroma_dir):
     return manager
 
 
+@pytest.fixture
+def semantic_embeddings_manager(shared_embeddings_manager):
+    """Provide the shared EmbeddingsManager, with the real model, and an empty collection."""
+    collection = shared_embeddings_manager.collection
+    ids = collection.get(include=[])["ids"]
+    if ids:
+        collection.delete(ids=ids)
+    return shared_embeddings_manager
+
+
+@pytest.fixture
+def chroma_client():
+    """Create an empty in-memory ChromaDB client."""
+    import chromadb
+    from chromadb.config import Settings
+    
+    client = chromadb.EphemeralClient(settings=Settings(anonymized_telemetry=False, allow_reset=True))
+    # In-memory clients of one process share their data, so start from nothing
+    client.reset()
+    return client
+
+
+@pytest.fixture
+def embeddings_manager(tmp_path, fake_embedder, chroma_client):
+    """Create an EmbeddingsManager instance using the stub model and an in-memory client."""
+    from embeddings import EmbeddingsManager
+    
+    manager = EmbeddingsManager(
+        persist_directory=str(tmp_path),
+        model_name="all-MiniLM-L6-v2",
+        chunk_size=100,
+        chunk_overlap=10,
+        client=chroma_client
+    )
+    return manager
+
+
 @pytest.fixture
 def sample_text():
     """Sample text for testing."""
@@ -51,41 +103,63 @@ def sample_text():
 class TestEmbeddingsManagerInit:
     """Tests for EmbeddingsManager initialization."""
     
-    def test_initialization(self, embeddings_manager, temp_chroma_dir):
+    def test_initialization(self, embeddings_manager):
         """Test that EmbeddingsManager initializes correctly."""
         assert embeddings_manager is not None
         assert embeddings_manager.model_name == "all-MiniLM-L6-v2"
-        assert embeddings_manager.persist_directory == temp_chroma_dir
+        assert embeddings_manager.persist_directory.is_dir()
         assert embeddings_manager.collection is not None
         assert embeddings_manager.model is not None
     
-    def test_creates_persist_directory(self):
+    def test_creates_persist_directory(self, tmp_path, fake_embedder):
         """Test that persist directory is created if it doesn't exist."""
         from embeddings import EmbeddingsManager
         
-        temp_dir = Path(tempfile.mkdtemp())
-        chroma_dir = temp_dir / "new_chroma_db"
+        chroma_dir = tmp_path / "new_chroma_db"
         
-        try:
-            assert not chroma_dir.exists()
-            manager = EmbeddingsManager(persist_directory=str(chroma_dir))
-            assert chroma_dir.exists()
-        finally:
-            if temp_dir.exists():
-                shutil.rmtree(temp_dir)
+        assert not chroma_dir.exists()
+        manager = EmbeddingsManager(persist_directory=str(chroma_dir))
+        assert chroma_dir.exists()
+    
+    def test_uses_given_client(self, tmp_path, fake_embedder, chroma_client):
+        """Test that a supplied client is used instead of a persistent one."""
+        from embeddings import EmbeddingsManager
+        
+        chroma_dir = tmp_path / "unused_chroma_db"
+        manager = EmbeddingsManager(persist_directory=str(chroma_dir), client=chroma_client)
+        
+        assert manager.client is chroma_client
+        assert manager.collection.name == "pdf_embeddings"
+        assert not chroma_dir.exists()
     
-    def test_custom_chunk_settings(self, temp_chroma_dir):
+    def test_custom_chunk_settings(self, tmp_path, fake_embedder):
         """Test initialization with custom chunk settings."""
         from embeddings import EmbeddingsManager
         
         manager = EmbeddingsManager(
-            persist_directory=str(temp_chroma_dir),
+            persist_directory=str(tmp_path),
             chunk_size=200,
             chunk_overlap=20
         )
         
         assert manager.text_splitter._chunk_size == 200
         assert manager.text_splitter._chunk_overlap == 20
+    
+    def test_model_shared_between_instances(self, tmp_path, monkeypatch):
+        """Test that managers for the same model reuse the loaded encoder."""
+        import embeddings
+        
+        loads = []
+        monkeypatch.setattr(embeddings, "SentenceTransformer", lambda *args, **kwargs: loads.append(args) or Mock())
+        embeddings._load_model.cache_clear()
+        try:
+            manager1 = embeddings.EmbeddingsManager(persist_directory=str(tmp_path / "first"))
+            manager2 = embeddings.EmbeddingsManager(persist_directory=str(tmp_path / "second"))
+            
+            assert manager1.model is manager2.model
+            assert len(loads) == 1
+        finally:
+            embeddings._load_model.cache_clear()
 
 
 class TestTextChunking:
@@ -135,17 +209,16 @@ class TestEmbeddingGeneration:
         texts = ["This is a test sentence.", "Another test sentence."]
         embeddings = embeddings_manager.generate_embeddings(texts)
         
-        assert isinstance(embeddings, list)
-        assert len(embeddings) == 2
-        assert all(isinstance(emb, list) for emb in embeddings)
-        assert all(len(emb) > 0 for emb in embeddings)
+        assert isinstance(embeddings, np.ndarray)
+        assert embeddings.shape[0] == 2
+        assert embeddings.shape[1] > 0
         # Check that embeddings are numeric
-        assert all(isinstance(val, float) for emb in embeddings for val in emb)
+        assert embeddings.dtype == np.float32
     
     def test_generate_embeddings_empty_list(self, embeddings_manager):
         """Test generating embeddings for empty list."""
         embeddings = embeddings_manager.generate_embeddings([])
-        assert embeddings == []
+        assert len(embeddings) == 0
     
     def test_generate_embeddings_single_text(self, embeddings_manager):
         """Test generating embedding for single text."""
@@ -221,6 +294,39 @@ class TestPDFEmbeddings:
         assert 1 in pdf_ids
         assert 2 in pdf_ids
     
+    def test_add_pdfs_embeddings_batched(self, embeddings_manager, sample_text):
+        """Test that PDFs added together are stored like PDFs added one by one."""
+        pdfs = [(1, "test1.pdf", sample_text), (2, "test2.pdf", ""), (3, "test3.pdf", sample_text)]
+        
+        stored = list(embeddings_manager.add_pdfs_embeddings(iter(pdfs), flush_chunks=1))
+        
+        expected = len(embeddings_manager.chunk_text(sample_text))
+        assert sorted(stored) == [
+            (1, "test1.pdf", expected, None), (2, "test2.pdf", 0, None), (3, "test3.pdf", expected, None)
+        ]
+        assert embeddings_manager.get_pdf_embedding_count(3) == expected
+        assert embeddings_manager.collection.count() == 2 * expected
+    
+    def test_add_pdfs_embeddings_failed_batch(self, embeddings_manager, sample_text):
+        """Test that a failed batch is reported per PDF and the next batch is still stored."""
+        pdfs = [(1, "test1.pdf", sample_text), (2, "test2.pdf", sample_text)]
+        add = embeddings_manager.collection.add
+        calls = []
+        
+        def fail_first(**kwargs):
+            calls.append(kwargs)
+            if len(calls) == 1:
+                raise RuntimeError("disk full")
+            return add(**kwargs)
+        
+        with patch.object(embeddings_manager.collection, "add", side_effect=fail_first):
+            stored = list(embeddings_manager.add_pdfs_embeddings(iter(pdfs), flush_chunks=1))
+        
+        expected = len(embeddings_manager.chunk_text(sample_text))
+        assert stored == [(1, "test1.pdf", 0, "disk full"), (2, "test2.pdf", expected, None)]
+        assert embeddings_manager.get_pdf_embedding_count(1) == 0
+        assert embeddings_manager.get_pdf_embedding_count(2) == expected
+    
     def test_delete_pdf_embeddings(self, embeddings_manager, sample_text):
         """Test deleting embeddings for a PDF."""
         # First add embeddings
@@ -265,7 +371,7 @@ class TestPDFEmbeddings:
 class TestSemanticSearch:
     """Tests for semantic search functionality."""
     
-    def test_search_embeddings_basic(self, embeddings_manager):
+    def test_search_embeddings_basic(self, semantic_embeddings_manager):
         """Test basic semantic search."""
         # Add some test data
         texts = [
@@ -273,15 +379,12 @@ class TestSemanticSearch:
             "Python is a popular programming language.",
             "Deep learning uses neural networks."
         ]
-        for i, text in enumerate(texts):
-            embeddings_manager.add_pdf_embeddings(
-                pdf_id=i+1,
-                pdf_filename=f"test{i+1}.pdf",
-                text=text
-            )
+        list(semantic_embeddings_manager.add_pdfs_embeddings(
+            (i + 1, f"test{i + 1}.pdf", text) for i, text in enumerate(texts)
+        ))
         
         # Search
-        results = embeddings_manager.search_embeddings(
+        results = semantic_embeddings_manager.search_embeddings(
             query="artificial intelligence",
             n_results=2
         )
@@ -290,14 +393,14 @@ class TestSemanticSearch:
         assert len(results['results']) <= 2
         assert 'query' in results
     
-    def test_search_embeddings_with_pdf_filter(self, embeddings_manager, sample_text):
+    def test_search_embeddings_with_pdf_filter(self, semantic_embeddings_manager, sample_text):
         """Test searching with PDF ID filter."""
         # Add embeddings for multiple PDFs
-        embeddings_manager.add_pdf_embeddings(1, "test1.pdf", sample_text)
-        embeddings_manager.add_pdf_embeddings(2, "test2.pdf", sample_text)
+        semantic_embeddings_manager.add_pdf_embeddings(1, "test1.pdf", sample_text)
+        semantic_embeddings_manager.add_pdf_embeddings(2, "test2.pdf", sample_text)
         
         # Search with filter
-        results = embeddings_manager.search_embeddings(
+        results = semantic_embeddings_manager.search_embeddings(
             query="testing",
             n_results=5,
             pdf_id=1
@@ -306,20 +409,20 @@ class TestSemanticSearch:
         # All results should be from PDF 1
         assert all(r['metadata']['pdf_id'] == 1 for r in results['results'])
     
-    def test_search_embeddings_empty_collection(self, embeddings_manager):
+    def test_search_embeddings_empty_collection(self, semantic_embeddings_manager):
         """Test searching in empty collection."""
-        results = embeddings_manager.search_embeddings(
+        results = semantic_embeddings_manager.search_embeddings(
             query="test query",
             n_results=5
         )
         
         assert results['results'] == []
     
-    def test_search_embeddings_result_structure(self, embeddings_manager, sample_text):
+    def test_search_embeddings_result_structure(self, semantic_embeddings_manager, sample_text):
         """Test that search results have correct structure."""
-        embeddings_manager.add_pdf_embeddings(1, "test.pdf", sample_text)
+        semantic_embeddings_manager.add_pdf_embeddings(1, "test.pdf", sample_text)
         
-        results = embeddings_manager.search_embeddings(
+        results = semantic_embeddings_manager.search_embeddings(
             query="testing",
             n_results=3
         )
@@ -335,12 +438,12 @@ class TestSemanticSearch:
             assert 'pdf_filename' in result['metadata']
             assert 'chunk_index' in result['metadata']
     
-    def test_search_respects_n_results(self, embeddings_manager, sample_text):
+    def test_search_respects_n_results(self, semantic_embeddings_manager, sample_text):
         """Test that search returns requested number of results."""
-        embeddings_manager.add_pdf_embeddings(1, "test.pdf", sample_text * 3)
+        semantic_embeddings_manager.add_pdf_embeddings(1, "test.pdf", sample_text * 3)
         
         for n in [1, 3, 5]:
-            results = embeddings_manager.search_embeddings(
+            results = semantic_embeddings_manager.search_embeddings(
                 query="testing",
                 n_results=n
             )
@@ -371,9 +474,9 @@ class TestCollectionStats:
     
     def test_get_collection_stats_multiple_pdfs(self, embeddings_manager, sample_text):
         """Test stats with multiple PDFs."""
-        embeddings_manager.add_pdf_embeddings(1, "test1.pdf", sample_text)
-        embeddings_manager.add_pdf_embeddings(2, "test2.pdf", sample_text)
-        embeddings_manager.add_pdf_embeddings(3, "test3.pdf", sample_text)
+        list(embeddings_manager.add_pdfs_embeddings(
+            (pdf_id, f"test{pdf_id}.pdf", sample_text) for pdf_id in (1, 2, 3)
+        ))
         
         stats = embeddings_manager.get_collection_stats()
         
@@ -384,32 +487,32 @@ class TestCollectionStats:
 class TestPersistence:
     """Tests for data persistence."""
     
-    def test_persistence_across_instances(self, temp_chroma_dir, sample_text):
+    def test_persistence_across_instances(self, tmp_path, sample_text, fake_embedder):
         """Test that data persists across manager instances."""
         from embeddings import EmbeddingsManager
         
         # Create first instance and add data
-        manager1 = EmbeddingsManager(persist_directory=str(temp_chroma_dir))
+        manager1 = EmbeddingsManager(persist_directory=str(tmp_path))
         count = manager1.add_pdf_embeddings(1, "test.pdf", sample_text)
         
         # Create second instance
-        manager2 = EmbeddingsManager(persist_directory=str(temp_chroma_dir))
+        manager2 = EmbeddingsManager(persist_directory=str(tmp_path))
         
         # Verify data persists
         stats = manager2.get_collection_stats()
         assert stats['total_embeddings'] == count
     
-    def test_delete_persists(self, temp_chroma_dir, sample_text):
+    def test_delete_persists(self, tmp_path, sample_text, fake_embedder):
         """Test that deletions persist."""
         from embeddings import EmbeddingsManager
         
         # Create first instance, add and delete data
-        manager1 = EmbeddingsManager(persist_directory=str(temp_chroma_dir))
+        manager1 = EmbeddingsManager(persist_directory=str(tmp_path))
         manager1.add_pdf_embeddings(1, "test.pdf", sample_text)
         manager1.delete_pdf_embeddings(1)
         
         # Create second instance
-        manager2 = EmbeddingsManager(persist_directory=str(temp_chroma_dir))
+        manager2 = EmbeddingsManager(persist_directory=str(tmp_path))
         
         # Verify deletion persists
         stats = manager2.get_collection_stats()
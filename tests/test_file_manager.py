@@ -54,6 +54,44 @@ def test_get_pdf_files_ignores_other_files(temp_dir):
     assert files[0].suffix == '.pdf'
 
 
+def test_get_pdf_files_case_insensitive_and_files_only(temp_dir):
+    """Test that any extension case matches and directories are skipped."""
+    pdf_dir = temp_dir / "pdfs"
+    pdf_dir.mkdir()
+    
+    (pdf_dir / "mixed.Pdf").write_text("dummy")
+    (pdf_dir / "folder.pdf").mkdir()
+    
+    files = FileManager.get_pdf_files(pdf_dir)
+    
+    assert [f.name for f in files] == ["mixed.Pdf"]
+
+
+def test_get_pdf_files_cached_until_folder_changes(temp_dir):
+    """Test that listings are reused while the folder mtime is unchanged."""
+    import os
+    
+    pdf_dir = temp_dir / "pdfs"
+    pdf_dir.mkdir()
+    (pdf_dir / "a.pdf").write_text("dummy")
+    # Age the folder so its listing may be cached
+    os.utime(pdf_dir, (1_000_000_000, 1_000_000_000))
+    
+    assert [f.name for f in FileManager.get_pdf_files(pdf_dir)] == ["a.pdf"]
+    
+    # Rename behind the cache's back, then restore the old mtime
+    (pdf_dir / "a.pdf").rename(pdf_dir / "b.pdf")
+    os.utime(pdf_dir, (1_000_000_000, 1_000_000_000))
+    assert [f.name for f in FileManager.get_pdf_files(pdf_dir)] == ["a.pdf"]
+    
+    FileManager.clear_pdf_files_cache(pdf_dir)
+    assert [f.name for f in FileManager.get_pdf_files(pdf_dir)] == ["b.pdf"]
+    
+    # A real change moves the mtime forward and is picked up
+    (pdf_dir / "c.pdf").write_text("dummy")
+    assert sorted(f.name for f in FileManager.get_pdf_files(pdf_dir)) == ["b.pdf", "c.pdf"]
+
+
 def test_get_pdf_files_nonexistent_directory(temp_dir):
     """Test getting PDF files from non-existent directory."""
     pdf_dir = temp_dir / "nonexistent"
@@ -121,6 +159,69 @@ def test_move_file_existing_destination(temp_dir):
     assert source_file.exists()
 
 
+def test_move_file_across_devices(temp_dir, monkeypatch):
+    """Test that a cross-device rename falls back to copying the file."""
+    import errno
+    import os
+    
+    source_dir = temp_dir / "source"
+    dest_dir = temp_dir / "dest"
+    source_dir.mkdir()
+    source_file = source_dir / "test.pdf"
+    source_file.write_text("test content")
+    
+    def cross_device_rename(src, dst):
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+    
+    monkeypatch.setattr(os, "rename", cross_device_rename)
+    result = FileManager.move_file(source_file, dest_dir)
+    
+    assert result == dest_dir / "test.pdf"
+    assert result.read_text() == "test content"
+    assert not source_file.exists()
+
+
+def test_rename_directory_across_devices(temp_dir, monkeypatch):
+    """Test that a cross-device rename moves directories with their content."""
+    import errno
+    import os
+    
+    source_dir = temp_dir / "source"
+    (source_dir / "nested").mkdir(parents=True)
+    (source_dir / "nested" / "test.pdf").write_text("test content")
+    
+    def cross_device_rename(src, dst):
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+    
+    monkeypatch.setattr(os, "rename", cross_device_rename)
+    FileManager.rename_file(source_dir, temp_dir / "dest")
+    
+    assert (temp_dir / "dest" / "nested" / "test.pdf").read_text() == "test content"
+    assert not source_dir.exists()
+
+
+def test_move_files_batch(temp_dir):
+    """Test batch moves, including missing and already present files."""
+    source_dir = temp_dir / "source"
+    dest_dir = temp_dir / "dest"
+    source_dir.mkdir()
+    dest_dir.mkdir()
+    (source_dir / "a.pdf").write_text("a")
+    (source_dir / "b.pdf").write_text("b")
+    (source_dir / "c.pdf").write_text("source c")
+    (dest_dir / "c.pdf").write_text("dest c")
+    
+    moved = FileManager.move_files_batch(source_dir, dest_dir, ["a.pdf", "c.pdf", "missing.pdf"])
+    
+    assert moved == 2
+    assert (dest_dir / "a.pdf").read_text() == "a"
+    assert (dest_dir / "c.pdf").read_text() == "dest c"
+    assert sorted(f.name for f in source_dir.iterdir()) == ["b.pdf", "c.pdf"]
+    
+    assert FileManager.move_files_batch(source_dir, dest_dir) == 2
+    assert (dest_dir / "b.pdf").read_text() == "b"
+
+
 def test_save_text_file_success(temp_dir):
     """Test saving text file using the actual method."""
     text_dir = temp_dir / "text"
@@ -136,3 +237,72 @@ def test_save_text_file_success(temp_dir):
     assert result.exists()
     assert text_content in result.read_text()
     assert hex_id in filename
+
+
+def test_save_text_file_from_pages(temp_dir):
+    """Test saving text given as a list of page texts."""
+    text_dir = temp_dir / "text"
+    
+    filename, result = FileManager.save_text_file("test", ["page one", "page two"], text_dir, "abcd1234")
+    
+    assert filename == "test_abcd1234_text.txt"
+    assert result.read_text() == "page one\npage two"
+    
+    import gzip
+    assert gzip.decompress((text_dir / (filename + ".gz")).read_bytes()) == b"page one\npage two"
+
+
+def test_get_file_hash(temp_dir):
+    """Test that identical content produces identical hashes."""
+    file1 = temp_dir / "a.pdf"
+    file2 = temp_dir / "b.pdf"
+    file3 = temp_dir / "c.pdf"
+    file1.write_bytes(b"same content")
+    file2.write_bytes(b"same content")
+    file3.write_bytes(b"other content")
+    
+    hash1 = FileManager.get_file_hash(file1, chunk_size=4)
+    
+    assert hash1 is not None
+    assert len(hash1) == 64
+    assert hash1 == FileManager.get_file_hash(file2)
+    assert hash1 != FileManager.get_file_hash(file3)
+
+
+def test_get_file_hash_nonexistent_file(temp_dir):
+    """Test hashing a non-existent file."""
+    assert FileManager.get_file_hash(temp_dir / "missing.pdf") is None
+
+
+def test_get_file_hashes(temp_dir):
+    """Test hashing several files concurrently, keeping input order."""
+    paths = []
+    for i in range(5):
+        path = temp_dir / f"{i}.pdf"
+        path.write_bytes(b"content %d" % i)
+        paths.append(path)
+    paths.append(temp_dir / "missing.pdf")
+    
+    hashes = FileManager.get_file_hashes(paths, max_workers=3)
+    
+    assert hashes == [FileManager.get_file_hash(path) for path in paths]
+    assert hashes[-1] is None
+    assert FileManager.get_file_hashes([]) == []
+
+
+def test_write_bytes(temp_dir):
+    """Test writing a file by path and relative to a directory descriptor."""
+    import os
+    
+    path = temp_dir / "a.bin"
+    path.write_bytes(b"longer old content")
+    FileManager.write_bytes(path, b"new")
+    assert path.read_bytes() == b"new"
+    
+    if os.open in os.supports_dir_fd:
+        dir_fd = os.open(temp_dir, os.O_RDONLY)
+        try:
+            FileManager.write_bytes("b.bin", memoryview(b"relative"), dir_fd=dir_fd)
+        finally:
+            os.close(dir_fd)
+        assert (temp_dir / "b.bin").read_bytes() == b"relative"
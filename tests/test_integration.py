@@ -9,16 +9,15 @@ import pytest
 src_path = Path(__file__).parent.parent / "src"
 sys.path.insert(0, str(src_path))
 
-from database import Database
 from file_manager import FileManager
 
 
 class TestDatabaseIntegration:
     """Integration tests for database operations."""
     
-    def test_complete_pdf_workflow(self, temp_db_path, sample_pdf_metadata):
+    def test_complete_pdf_workflow(self, memory_db, sample_pdf_metadata):
         """Test complete workflow: add PDF, add images, add text, retrieve all."""
-        db = Database(temp_db_path)
+        db = memory_db
         
         # 1. Add PDF
         pdf_id = db.add_pdf_document(sample_pdf_metadata['filename'], sample_pdf_metadata)
@@ -51,9 +50,9 @@ class TestDatabaseIntegration:
         assert text is not None
         assert text['filename'] == 'test_text.txt'
     
-    def test_multiple_pdfs_workflow(self, temp_db_path, sample_pdf_metadata):
+    def test_multiple_pdfs_workflow(self, memory_db, sample_pdf_metadata):
         """Test processing multiple PDFs."""
-        db = Database(temp_db_path)
+        db = memory_db
         
         # Add multiple PDFs
         pdf_ids = []
@@ -107,11 +106,11 @@ class TestFileManagerIntegration:
 class TestEndToEndWorkflow:
     """End-to-end integration tests."""
     
-    def test_full_processing_simulation(self, temp_db_path, temp_data_dirs, 
+    def test_full_processing_simulation(self, memory_db, temp_data_dirs, 
                                        sample_pdf_metadata, create_sample_pdf):
         """Simulate the complete PDF processing workflow."""
         # Initialize components
-        db = Database(temp_db_path)
+        db = memory_db
         
         # 1. Setup: Create PDF in pending directory
         pdf_file = create_sample_pdf("document.pdf")
@@ -157,9 +156,9 @@ class TestEndToEndWorkflow:
         processed = FileManager.get_pdf_files(temp_data_dirs['processed'])
         assert len(processed) == 1
     
-    def test_duplicate_detection(self, temp_db_path, sample_pdf_metadata):
+    def test_duplicate_detection(self, memory_db, sample_pdf_metadata):
         """Test that duplicate PDFs are properly detected."""
-        db = Database(temp_db_path)
+        db = memory_db
         
         # Add PDF first time
         pdf_id1 = db.add_pdf_document(sample_pdf_metadata['filename'], sample_pdf_metadata)
@@ -171,3 +170,67 @@ class TestEndToEndWorkflow:
         existing_pdf = db.get_pdf_by_filename('test.pdf')
         assert existing_pdf is not None
         assert existing_pdf['id'] == pdf_id1
+    
+    def test_reprocessed_file_replaces_references(self, memory_db, sample_pdf_metadata):
+        """Test that saving a filename again replaces its images and text."""
+        from app import save_result
+        
+        def result(prefix):
+            return {
+                'filename': 'a.pdf',
+                'metadata': sample_pdf_metadata,
+                'images_info': [
+                    {'filename': f'{prefix}_1.png', 'page': 1, 'index': 1, 'extension': 'png'}
+                ],
+                'text_filename': f'{prefix}.txt',
+                'word_count': 10,
+                'error': None
+            }
+        
+        assert save_result(memory_db, result('old'), 'hash1')
+        assert save_result(memory_db, result('new'), 'hash2')
+        
+        pdf = memory_db.get_pdf_with_children(filename='a.pdf')
+        assert pdf['file_hash'] == 'hash2'
+        assert [img['filename'] for img in pdf['images']] == ['new_1.png']
+        assert pdf['text']['filename'] == 'new.txt'
+        assert memory_db._get_connection().execute('SELECT COUNT(*) FROM texts').fetchone()[0] == 1
+    
+    def test_failed_save_leaves_nothing(self, memory_db, sample_pdf_metadata):
+        """Test that a PDF whose images fail to save is reported and not stored."""
+        from app import save_result
+        
+        # Two images with the same page and index break the images primary key
+        image = {'filename': 'a_1.png', 'page': 1, 'index': 1, 'extension': 'png'}
+        result = {
+            'filename': 'a.pdf',
+            'metadata': sample_pdf_metadata,
+            'images_info': [image, dict(image, filename='a_2.png')],
+            'text_filename': 'a.txt',
+            'word_count': 10,
+            'error': None
+        }
+        
+        assert save_result(memory_db, result, 'hash1') is False
+        assert not memory_db.pdf_exists('a.pdf')
+        assert memory_db._get_connection().execute('SELECT COUNT(*) FROM texts').fetchone()[0] == 0
+    
+    def test_select_pending_skips_processed_files(self, memory_db, temp_data_dirs, sample_pdf_metadata):
+        """Test that files are skipped by name and by content before processing."""
+        from app import select_pending
+        
+        pending_dir = temp_data_dirs['pending']
+        for name, content in [("done.pdf", b"one"), ("renamed.pdf", b"two"),
+                              ("new.pdf", b"three"), ("new_copy.pdf", b"three")]:
+            (pending_dir / name).write_bytes(content)
+        memory_db.add_pdf_document("done.pdf", sample_pdf_metadata)
+        memory_db.add_pdf_document("original.pdf", sample_pdf_metadata,
+                                   FileManager.get_file_hash(pending_dir / "renamed.pdf"))
+        
+        pdf_files = sorted(FileManager.get_pdf_files(pending_dir))
+        pending, file_hashes, skipped_count = select_pending(memory_db, FileManager(), pdf_files)
+        
+        assert [pdf_path.name for pdf_path, _ in pending] == ["new.pdf"]
+        assert len(pending[0][1]) == 8
+        assert file_hashes == {pending_dir / "new.pdf": FileManager.get_file_hash(pending_dir / "new.pdf")}
+        assert skipped_count == 3
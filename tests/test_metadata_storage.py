@@ -481,3 +481,108 @@ class TestDeduplication:
         metadata_storage.add_metadata(filename, sample_metadata)
         
         assert metadata_storage.file_exists(filename)
+
+
+class TestJournal:
+    """Tests for the append-only metadata journal."""
+    
+    def test_add_metadata_appends_journal_line(self, metadata_storage, storage_file, sample_metadata):
+        """Test that adding metadata appends to the journal instead of rewriting the file."""
+        metadata_storage.add_metadata("file1.pdf", sample_metadata.copy())
+        metadata_storage.add_metadata("file2.pdf", sample_metadata.copy())
+        
+        with open(storage_file, 'r') as f:
+            assert json.load(f) == {}
+        
+        lines = metadata_storage.journal_file.read_text().splitlines()
+        assert [json.loads(line)['filename'] for line in lines] == ["file1.pdf", "file2.pdf"]
+    
+    def test_journal_skips_truncated_line(self, storage_file, sample_metadata):
+        """Test that a partially written journal line is ignored on load."""
+        from metadata_storage import MetadataStorage
+        
+        storage1 = MetadataStorage(storage_file)
+        storage1.add_metadata("test.pdf", sample_metadata)
+        with open(storage1.journal_file, 'a') as f:
+            f.write('{"filename": "broken.pdf", "meta')
+        
+        storage2 = MetadataStorage(storage_file)
+        
+        assert storage2.file_exists("test.pdf")
+        assert not storage2.file_exists("broken.pdf")
+    
+    def test_append_after_truncated_line(self, storage_file, sample_metadata):
+        """Test that an entry appended after a truncated line is still loaded."""
+        from metadata_storage import MetadataStorage
+        
+        storage1 = MetadataStorage(storage_file)
+        storage1.add_metadata("test.pdf", sample_metadata.copy())
+        with open(storage1.journal_file, 'a') as f:
+            f.write('{"filename": "broken.pdf", "meta')
+        storage1.add_metadata("after.pdf", sample_metadata.copy())
+        
+        storage2 = MetadataStorage(storage_file)
+        
+        assert storage2.file_exists("test.pdf")
+        assert storage2.file_exists("after.pdf")
+        assert not storage2.file_exists("broken.pdf")
+    
+    def test_compact_folds_journal_into_storage_file(self, metadata_storage, storage_file, sample_metadata):
+        """Test that compact writes all entries to the storage file and removes the journal."""
+        metadata_storage.add_metadata("test.pdf", sample_metadata)
+        
+        assert metadata_storage.compact() is True
+        
+        assert not metadata_storage.journal_file.exists()
+        with open(storage_file, 'r') as f:
+            assert "test.pdf" in json.load(f)
+    
+    def test_compact_keeps_storage_file_mode(self, metadata_storage, storage_file, sample_metadata):
+        """Test that replacing the storage file keeps its permissions."""
+        import os
+        import stat
+        
+        os.chmod(storage_file, 0o640)
+        metadata_storage.add_metadata("test.pdf", sample_metadata)
+        
+        assert metadata_storage.compact() is True
+        
+        assert stat.S_IMODE(os.stat(storage_file).st_mode) == 0o640
+    
+    def test_compact_failure_keeps_storage_file(self, metadata_storage, storage_file, sample_metadata, monkeypatch):
+        """Test that a failed save leaves the previous storage file and no temporary file."""
+        metadata_storage.add_metadata("test.pdf", sample_metadata)
+        metadata_storage.compact()
+        metadata_storage.add_metadata("other.pdf", sample_metadata.copy())
+        
+        def failing_write(*args, **kwargs):
+            raise OSError("disk full")
+        monkeypatch.setattr(tempfile._TemporaryFileWrapper, "write", failing_write, raising=False)
+        
+        assert metadata_storage.compact() is False
+        
+        monkeypatch.undo()
+        with open(storage_file, 'r') as f:
+            assert list(json.load(f)) == ["test.pdf"]
+        assert metadata_storage.journal_file.exists()
+        assert [p.name for p in storage_file.parent.iterdir() if p.suffix == '.tmp'] == []
+    
+    def test_flush_syncs_files(self, metadata_storage, storage_file, sample_metadata, monkeypatch):
+        """Test that flush fsyncs the storage file, the journal and the directory."""
+        import os
+        
+        metadata_storage.add_metadata("test.pdf", sample_metadata)
+        synced = []
+        real_fsync = os.fsync
+        
+        def recording_fsync(fd):
+            synced.append(os.fstat(fd).st_ino)
+            real_fsync(fd)
+        monkeypatch.setattr(os, "fsync", recording_fsync)
+        
+        assert metadata_storage.flush() is True
+        assert synced == [
+            storage_file.stat().st_ino,
+            metadata_storage.journal_file.stat().st_ino,
+            storage_file.parent.stat().st_ino
+        ]
@@ -27,6 +27,44 @@ def test_open_pdf_nonexistent_file(temp_dir):
     assert reader is None
 
 
+def test_open_pdf_memory_mapped(temp_dir, monkeypatch):
+    """Test opening a PDF through a memory map."""
+    from pypdf import PdfWriter
+    import pdf_processor
+    
+    pdf_path = temp_dir / "blank.pdf"
+    writer = PdfWriter()
+    writer.add_blank_page(width=100, height=100)
+    with open(pdf_path, 'wb') as f:
+        writer.write(f)
+    
+    # Force the memory-mapped path regardless of file size
+    monkeypatch.setattr(pdf_processor, "MMAP_MIN_SIZE", 0)
+    
+    reader = PDFProcessor.open_pdf(pdf_path)
+    
+    assert reader is not None
+    assert len(reader.pages) == 1
+
+
+def test_open_pdf_from_bytes(temp_dir):
+    """Test opening a PDF from contents already read into memory."""
+    import io
+    from pypdf import PdfWriter
+    
+    writer = PdfWriter()
+    writer.add_blank_page(width=100, height=100)
+    writer.add_blank_page(width=100, height=100)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    
+    # The path is only used for logging when the bytes are given
+    reader = PDFProcessor.open_pdf(temp_dir / "missing.pdf", buffer.getvalue())
+    
+    assert reader is not None
+    assert len(reader.pages) == 2
+
+
 def test_get_total_words_mock(mocker):
     """Test word counting through get_total_words method."""
     # Create mock reader
@@ -39,6 +77,51 @@ def test_get_total_words_mock(mocker):
     assert count == 3
 
 
+def test_get_total_words_mixed_whitespace(mocker):
+    """Test that runs of spaces, tabs and newlines separate words once."""
+    mock_reader = mocker.Mock()
+    mock_page = mocker.Mock()
+    mock_page.extract_text.return_value = "  one\ttwo\n\nthree   four \n"
+    mock_reader.pages = [mock_page]
+    
+    count = PDFProcessor.get_total_words(mock_reader)
+    assert count == 4
+
+
+def test_get_total_words_skips_image_only_pages(mocker):
+    """Test that pages without text objects are not passed to extract_text."""
+    mock_reader = mocker.Mock()
+    text_page = mocker.Mock()
+    text_page.get_contents.return_value.get_data.return_value = b"BT (hi) Tj ET"
+    text_page.extract_text.return_value = "hello world"
+    image_page = mocker.Mock()
+    image_page.get_contents.return_value.get_data.return_value = b"q 1 0 0 1 0 0 cm /Im0 Do Q"
+    image_page.get.return_value = None
+    mock_reader.pages = [text_page, image_page]
+    
+    count = PDFProcessor.get_total_words(mock_reader)
+    
+    assert count == 2
+    image_page.extract_text.assert_not_called()
+
+
+def test_count_words_matches_split():
+    """Test that the vectorized word count agrees with str.split()."""
+    from pdf_processor import count_words
+    
+    samples = [
+        "",
+        "one",
+        "  one\ttwo\n\nthree   four \n",
+        "word " * 1000,
+        " \x1cword\x0bnext\x00joined\r\n" * 300,
+        "\n" * 5000,
+        "caf\u00e9\u00a0cr\u00e8me " * 500,
+    ]
+    for text in samples:
+        assert count_words(text) == len(text.split())
+
+
 def test_get_num_pages_mock(mocker):
     """Test getting number of pages."""
     mock_reader = mocker.Mock()
@@ -65,3 +148,94 @@ def test_generate_hex_id():
     # Should be valid hex
     assert all(c in '0123456789abcdef' for c in id1)
     assert all(c in '0123456789abcdef' for c in id2)
+
+
+def test_hex_id_stream():
+    """Test generating a batch of hexadecimal IDs from Database class."""
+    from database import Database
+    
+    ids = Database.hex_id_stream(100, 8)
+    
+    assert len(ids) == 100
+    assert all(len(hex_id) == 8 for hex_id in ids)
+    assert len(set(ids)) == 100
+    assert all(c in '0123456789abcdef' for hex_id in ids for c in hex_id)
+
+
+def test_extract_images_mock(temp_dir, mocker):
+    """Test extracting images writes every image to the output directory."""
+    mock_reader = mocker.Mock()
+    mock_page = mocker.Mock()
+    img1 = mocker.Mock()
+    img1.name = "image1.jpg"
+    img1.data = b"jpeg data"
+    img2 = mocker.Mock()
+    img2.name = "image2"
+    img2.data = b"raw data"
+    mock_page.images = [img1, img2]
+    mock_reader.pages = [mock_page]
+    
+    output_dir = temp_dir / "images"
+    images = PDFProcessor.extract_images(mock_reader, "doc.pdf", output_dir, "abcd1234")
+    
+    assert [img['filename'] for img in images] == [
+        "doc_abcd1234_img_1.jpg",
+        "doc_abcd1234_img_2.png"
+    ]
+    assert (output_dir / "doc_abcd1234_img_1.jpg").read_bytes() == b"jpeg data"
+    assert (output_dir / "doc_abcd1234_img_2.png").read_bytes() == b"raw data"
+
+
+def test_bind_name_template():
+    """Test that pre-filled name templates match str.format output."""
+    from pdf_processor import _bind_name_template
+    
+    template = "{pdf_name}_{hex_id}_p{page:03d}_img_{index}.{ext}"
+    fixed = {'pdf_name': 'report {draft}', 'hex_id': 'abcd1234'}
+    
+    format_name = _bind_name_template(template, **fixed)
+    
+    assert format_name(page=2, index=5, ext='jpg') == template.format(page=2, index=5, ext='jpg', **fixed)
+    assert format_name(page=2, index=5, ext='jpg') == "report {draft}_abcd1234_p002_img_5.jpg"
+
+
+def test_extract_images_skips_failed_writes(temp_dir, mocker):
+    """Test that an image failing to write does not drop the other images."""
+    mock_reader = mocker.Mock()
+    mock_page = mocker.Mock()
+    images = []
+    for i in range(12):
+        img = mocker.Mock()
+        img.name = f"image{i}.jpg"
+        img.data = None if i == 3 else b"data %d" % i
+        images.append(img)
+    mock_page.images = images
+    mock_reader.pages = [mock_page]
+    
+    output_dir = temp_dir / "images"
+    extracted = PDFProcessor.extract_images(mock_reader, "doc.pdf", output_dir, "abcd1234")
+    
+    assert [img['index'] for img in extracted] == [i + 1 for i in range(12) if i != 3]
+    assert (output_dir / "doc_abcd1234_img_12.jpg").read_bytes() == b"data 11"
+
+
+def test_extract_text_to_stream(mocker):
+    """Test that streaming text gives the same content as the joined string."""
+    import io
+    
+    mock_reader = mocker.Mock()
+    pages = []
+    for text in ("first page", "", "third page"):
+        page = mocker.Mock()
+        page.extract_text.return_value = text
+        pages.append(page)
+    mock_reader.pages = pages
+    
+    text_content, word_count = PDFProcessor.extract_text(mock_reader)
+    out = io.StringIO()
+    streamed, streamed_count = PDFProcessor.extract_text(mock_reader, out=out)
+    
+    assert text_content == "first page\nthird page"
+    assert streamed is None
+    assert out.getvalue() == text_content
+    assert streamed_count == word_count == 4
@@ -0,0 +1,67 @@
+"""
+Tests for ByteBufferPool class.
+"""
+import sys
+from pathlib import Path
+
+# Add src to Python path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from pool import ByteBufferPool
+
+
+def test_acquire_allocates_default_capacity():
+    """Test that an empty pool allocates a buffer of default capacity."""
+    pool = ByteBufferPool(buffer_capacity=64)
+    
+    buf = pool.acquire()
+    
+    assert isinstance(buf, bytearray)
+    assert len(buf) == 64
+
+
+def test_acquire_respects_min_capacity():
+    """Test that acquired buffers are at least min_capacity bytes."""
+    pool = ByteBufferPool(buffer_capacity=64)
+    
+    buf = pool.acquire(128)
+    
+    assert len(buf) == 128
+
+
+def test_release_reuses_buffer():
+    """Test that released buffers are handed out again."""
+    pool = ByteBufferPool(buffer_capacity=64)
+    
+    buf = pool.acquire()
+    pool.release(buf)
+    
+    assert len(pool) == 1
+    assert pool.acquire() is buf
+    assert len(pool) == 0
+
+
+def test_release_skips_too_small_buffer():
+    """Test that a pooled buffer smaller than requested is not returned."""
+    pool = ByteBufferPool(buffer_capacity=64)
+    
+    small = pool.acquire()
+    pool.release(small)
+    
+    large = pool.acquire(256)
+    
+    assert large is not small
+    assert len(large) == 256
+    assert len(pool) == 1
+
+
+def test_release_bounded_by_pool_size():
+    """Test that the pool keeps at most pool_size idle buffers."""
+    pool = ByteBufferPool(pool_size=2, buffer_capacity=8)
+    
+    buffers = [pool.acquire() for _ in range(3)]
+    for buf in buffers:
+        pool.release(buf)
+    
+    assert len(pool) == 2
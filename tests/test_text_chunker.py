@@ -0,0 +1,59 @@
+"""
+Tests for RecursiveTextSplitter class.
+"""
+import sys
+from pathlib import Path
+import pytest
+
+# Add src to Python path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from text_chunker import RecursiveTextSplitter
+
+
+def test_split_short_text():
+    """Test that text shorter than the chunk size is returned as one chunk."""
+    splitter = RecursiveTextSplitter(chunk_size=100, chunk_overlap=10)
+    
+    assert splitter.split_text("This is a short text.") == ["This is a short text."]
+
+
+def test_split_empty_and_whitespace():
+    """Test that empty and whitespace-only text produce no chunks."""
+    splitter = RecursiveTextSplitter(chunk_size=100, chunk_overlap=10)
+    
+    assert splitter.split_text("") == []
+    assert splitter.split_text("   \n\n  \t  ") == []
+
+
+def test_split_prefers_paragraphs():
+    """Test that paragraphs are kept whole when they fit."""
+    splitter = RecursiveTextSplitter(chunk_size=30, chunk_overlap=0)
+    
+    chunks = splitter.split_text("First paragraph here.\n\nSecond paragraph here.")
+    
+    assert chunks == ["First paragraph here.", "Second paragraph here."]
+
+
+def test_split_with_overlap():
+    """Test that consecutive chunks share words up to the overlap."""
+    splitter = RecursiveTextSplitter(chunk_size=20, chunk_overlap=10)
+    
+    chunks = splitter.split_text("one two three four five six seven eight")
+    
+    assert chunks == ["one two three four", "four five six seven", "six seven eight"]
+    assert all(len(chunk) <= 20 for chunk in chunks)
+
+
+def test_split_long_word_into_characters():
+    """Test that a word longer than the chunk size is cut into pieces."""
+    splitter = RecursiveTextSplitter(chunk_size=4, chunk_overlap=0)
+    
+    assert splitter.split_text("abcdefghij") == ["abcd", "efgh", "ij"]
+
+
+def test_overlap_larger_than_chunk_size():
+    """Test that an overlap larger than the chunk size is rejected."""
+    with pytest.raises(ValueError):
+        RecursiveTextSplitter(chunk_size=10, chunk_overlap=20)
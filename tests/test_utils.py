@@ -289,27 +289,22 @@ class TestAppendMetadataToJson:
     """Tests for append_metadata_to_json function."""
     
     def test_append_metadata_to_json_new_file(self, temp_output_dir):
-        """Test creating new metadata JSON file."""
-        from utils import append_metadata_to_json
+        """Test creating new metadata JSON-lines file."""
+        from utils import append_metadata_to_json, load_jsonl
         
-        file_path = temp_output_dir / "test_metadata.json"
+        file_path = temp_output_dir / "test_metadata.jsonl"
         metadata = {"title": "Test", "author": "Author"}
         
         append_metadata_to_json("test.pdf", metadata, str(file_path))
         
         assert file_path.exists()
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-        
-        assert isinstance(data, list)
-        assert len(data) == 1
-        assert "test.pdf" in data[0]
+        assert load_jsonl(file_path) == [{"test.pdf": metadata}]
     
     def test_append_metadata_to_json_existing_file(self, temp_output_dir):
         """Test appending to existing metadata file."""
         from utils import append_metadata_to_json
         
-        file_path = temp_output_dir / "test_metadata.json"
+        file_path = temp_output_dir / "test_metadata.jsonl"
         
         # Add first entry
         metadata1 = {"title": "Test1"}
@@ -319,52 +314,56 @@ class TestAppendMetadataToJson:
         metadata2 = {"title": "Test2"}
         append_metadata_to_json("test2.pdf", metadata2, str(file_path))
         
-        with open(file_path, 'r') as f:
-            data = json.load(f)
+        lines = file_path.read_text().splitlines()
         
-        assert len(data) == 2
-        assert "test1.pdf" in data[0]
-        assert "test2.pdf" in data[1]
+        assert len(lines) == 2
+        assert "test1.pdf" in json.loads(lines[0])
+        assert "test2.pdf" in json.loads(lines[1])
     
-    def test_append_metadata_to_json_corrupt_file(self, temp_output_dir):
-        """Test handling corrupt JSON file."""
-        from utils import append_metadata_to_json
+    def test_append_metadata_to_json_corrupt_line(self, temp_output_dir):
+        """Test that a truncated line does not hide the other entries."""
+        from utils import append_metadata_to_json, load_jsonl
         
-        file_path = temp_output_dir / "test_metadata.json"
+        file_path = temp_output_dir / "test_metadata.jsonl"
         
-        # Create corrupt JSON file
-        with open(file_path, 'w') as f:
-            f.write("not valid json{{{")
+        append_metadata_to_json("test1.pdf", {"title": "Test1"}, str(file_path))
+        with open(file_path, 'a') as f:
+            f.write('{"broken.pdf": {"ti\n')
+        append_metadata_to_json("test2.pdf", {"title": "Test2"}, str(file_path))
         
-        # Should create new file starting fresh
-        metadata = {"title": "Test"}
-        append_metadata_to_json("test.pdf", metadata, str(file_path))
+        data = load_jsonl(file_path)
+        
+        assert [list(entry) for entry in data] == [["test1.pdf"], ["test2.pdf"]]
+    
+    def test_append_metadata_to_json_after_unterminated_line(self, temp_output_dir):
+        """Test that an entry appended after a line without newline is kept."""
+        from utils import append_metadata_to_json, load_jsonl
+        
+        file_path = temp_output_dir / "test_metadata.jsonl"
+        
+        append_metadata_to_json("test1.pdf", {"title": "Test1"}, str(file_path))
+        with open(file_path, 'a') as f:
+            f.write('{"broken.pdf": {"ti')
+        append_metadata_to_json("test2.pdf", {"title": "Test2"}, str(file_path))
         
-        with open(file_path, 'r') as f:
-            data = json.load(f)
+        data = load_jsonl(file_path)
         
-        assert isinstance(data, list)
-        assert len(data) == 1
+        assert [list(entry) for entry in data] == [["test1.pdf"], ["test2.pdf"]]
     
-    def test_append_metadata_to_json_non_list_data(self, temp_output_dir):
-        """Test handling file with non-list JSON data."""
-        from utils import append_metadata_to_json
+    def test_append_metadata_to_json_converts_array_file(self, temp_output_dir):
+        """Test that a file in the old JSON array format is converted to lines."""
+        from utils import append_metadata_to_json, load_jsonl
         
         file_path = temp_output_dir / "test_metadata.json"
-        
-        # Create file with dict instead of list
         with open(file_path, 'w') as f:
-            json.dump({"some": "data"}, f)
-        
-        # Should convert to list and append
-        metadata = {"title": "Test"}
-        append_metadata_to_json("test.pdf", metadata, str(file_path))
+            json.dump([{"old.pdf": {"title": "Old"}}], f, indent=2)
         
-        with open(file_path, 'r') as f:
-            data = json.load(f)
+        append_metadata_to_json("test.pdf", {"title": "Test"}, str(file_path))
         
-        assert isinstance(data, list)
-        assert len(data) == 2  # Original dict + new entry
+        assert load_jsonl(file_path) == [
+            {"old.pdf": {"title": "Old"}},
+            {"test.pdf": {"title": "Test"}}
+        ]
 
 
 class TestExtractImagesFromPdf:
@@ -443,6 +442,7 @@ class TestExtractImagesFromPdf:
         assert (temp_output_dir / "test_page1_img1.jpg").exists()
         assert (temp_output_dir / "test_page1_img2.png").exists()
         assert (temp_output_dir / "test_page2_img1.jpg").exists()
+        assert (temp_output_dir / "test_page1_img2.png").read_bytes() == b"image2"
     
     def test_extract_images_no_images(self, temp_output_dir):
         """Test with PDF that has no images."""
@@ -508,3 +508,108 @@ class TestIntegration:
         
         for key in expected_keys:
             assert key in complete_metadata
+
+
+class TestGetTextAndWordCount:
+    """Tests for get_text_and_word_count function."""
+    
+    def test_matches_get_total_words(self, mock_pdf_reader):
+        """Test that the fused pass returns page texts and the same word count."""
+        from utils import get_text_and_word_count, get_total_words
+        
+        pages_text, word_count = get_text_and_word_count(mock_pdf_reader)
+        
+        assert len(pages_text) == 2
+        assert {"total_words": word_count} == get_total_words(mock_pdf_reader)
+    
+    def test_get_metadata_uses_text_cache(self, mock_pdf_reader):
+        """Test that get_metadata counts words from the cached text."""
+        from utils import get_metadata
+        
+        metadata = get_metadata(mock_pdf_reader, text_cache=["one two", "three"])
+        
+        assert metadata["total_words"] == 3
+        for page in mock_pdf_reader.pages:
+            page.extract_text.assert_not_called()
+
+
+class TestMoveFilesToProcessedFolder:
+    """Tests for move_files_to_processed_folder function."""
+    
+    def test_moves_all_files(self, temp_dir):
+        """Test that every file is renamed into a newly created folder."""
+        from utils import move_files_to_processed_folder
+        
+        source = temp_dir / "pending"
+        dest = temp_dir / "processed"
+        source.mkdir()
+        (source / "a.pdf").write_text("a")
+        (source / "b.pdf").write_text("b")
+        
+        move_files_to_processed_folder(str(source), str(dest))
+        
+        assert list(source.iterdir()) == []
+        assert sorted(f.name for f in dest.iterdir()) == ["a.pdf", "b.pdf"]
+        assert (dest / "a.pdf").read_text() == "a"
+
+
+class TestGetAllReaders:
+    """Tests for get_all_readers function."""
+    
+    def test_yields_readers_lazily(self, temp_output_dir):
+        """Test that readers are opened one at a time and closed after use."""
+        from pypdf import PdfWriter
+        from utils import get_all_readers
+        
+        for name in ("a.pdf", "b.pdf"):
+            writer = PdfWriter()
+            writer.add_blank_page(width=100, height=100)
+            with open(temp_output_dir / name, 'wb') as f:
+                writer.write(f)
+        (temp_output_dir / "notes.txt").write_text("not a pdf")
+        
+        readers = get_all_readers(str(temp_output_dir))
+        seen = []
+        previous = None
+        for filename, reader in readers:
+            if previous is not None:
+                assert previous.stream.closed
+            assert len(reader.pages) == 1
+            seen.append(filename)
+            previous = reader
+        
+        assert sorted(seen) == ["a.pdf", "b.pdf"]
+        assert previous.stream.closed
+    
+    def test_missing_folder(self, temp_output_dir):
+        """Test that a missing folder yields nothing."""
+        from utils import get_all_readers
+        
+        assert list(get_all_readers(str(temp_output_dir / "missing"))) == []
+
+
+class TestGetMetadataAndText:
+    """Tests for get_metadata_and_text function."""
+    
+    def test_single_pass_matches_separate_functions(self, mock_pdf_reader):
+        """Test that the fused pass gives the same metadata as the separate helpers."""
+        from utils import (
+            get_metadata_and_text,
+            get_basic_metadata,
+            get_num_pages,
+            get_total_words,
+            get_image_count,
+            get_attachment_count
+        )
+        
+        metadata, pages_text = get_metadata_and_text(mock_pdf_reader)
+        
+        expected = {
+            **get_basic_metadata(mock_pdf_reader),
+            **get_num_pages(mock_pdf_reader),
+            **get_total_words(mock_pdf_reader),
+            **get_image_count(mock_pdf_reader),
+            **get_attachment_count(mock_pdf_reader)
+        }
+        assert metadata == expected
+        assert pages_text == [page.extract_text.return_value for page in mock_pdf_reader.pages]
@@ -53,10 +53,14 @@ def mock_db():
 @pytest.fixture
 def mock_embeddings_manager():
     """Mock embeddings manager for testing."""
+    import web_api
+    
     with patch('web_api.get_embeddings_manager') as mock:
         manager = MagicMock()
         mock.return_value = manager
+        web_api._invalidate_collection_stats()
         yield manager
+        web_api._invalidate_collection_stats()
 
 
 class TestHTMLViews:
@@ -79,38 +83,61 @@ class TestHTMLViews:
         mock_db.get_all_pdfs.return_value = [
             {"id": 1, "filename": "test.pdf", "num_pages": 5}
         ]
+        mock_db.get_pdf_count.return_value = 1
         
         response = test_client.get("/pdfs")
         assert response.status_code == 200
         mock_db.get_all_pdfs.assert_called_once()
     
+    def test_pdfs_page_paginated(self, test_client, mock_db):
+        """Test that the PDFs page loads one page of documents."""
+        import web_api
+        
+        mock_db.get_all_pdfs.return_value = [{"id": 1, "filename": "test.pdf", "num_pages": 5}]
+        mock_db.get_pdf_count.return_value = web_api.PDFS_PAGE_SIZE * 2 + 1
+        
+        response = test_client.get("/pdfs?page=2")
+        assert response.status_code == 200
+        assert "Page 2 of 3" in response.text
+        mock_db.get_all_pdfs.assert_called_once_with(
+            limit=web_api.PDFS_PAGE_SIZE, offset=web_api.PDFS_PAGE_SIZE
+        )
+        
+        # Pages past the end show the last one
+        test_client.get("/pdfs?page=9")
+        mock_db.get_all_pdfs.assert_called_with(
+            limit=web_api.PDFS_PAGE_SIZE, offset=web_api.PDFS_PAGE_SIZE * 2
+        )
+    
     def test_pdf_detail_page_found(self, test_client, mock_db):
         """Test PDF detail page with existing PDF."""
-        mock_db.get_pdf_by_id.return_value = {
+        mock_db.get_pdf_with_children.return_value = {
             "id": 1, 
             "filename": "test.pdf",
-            "num_pages": 5
+            "num_pages": 5,
+            "images": [],
+            "text": None
         }
-        mock_db.get_images_by_pdf_id.return_value = []
-        mock_db.get_text_by_pdf_id.return_value = None
         
         response = test_client.get("/pdf/1")
         assert response.status_code == 200
-        mock_db.get_pdf_by_id.assert_called_once_with(1)
+        mock_db.get_pdf_with_children.assert_called_once_with(1)
     
     def test_pdf_detail_page_not_found(self, test_client, mock_db):
         """Test PDF detail page with non-existing PDF."""
-        mock_db.get_pdf_by_id.return_value = None
+        mock_db.get_pdf_with_children.return_value = None
         
         response = test_client.get("/pdf/999")
         assert response.status_code == 404
     
     def test_stats_page(self, test_client, mock_db, mock_embeddings_manager):
         """Test statistics page."""
-        mock_db.get_all_pdfs.return_value = [
-            {"id": 1, "num_pages": 5, "total_words": 1000, "total_images": 3}
-        ]
-        mock_db.get_pdfs_with_embeddings.return_value = []
+        mock_db.get_statistics.return_value = {
+            "total_pdfs": 1, "total_pages": 5, "total_words": 1000, "total_images": 3
+        }
+        mock_db.get_embeddings_statistics.return_value = {
+            "pdfs_with_embeddings": 0, "pdfs_without_embeddings": 1, "total_embeddings_chunks": 0
+        }
         mock_embeddings_manager.get_collection_stats.return_value = {
             "total_embeddings": 0,
             "total_pdfs_with_embeddings": 0,
@@ -122,8 +149,8 @@ class TestHTMLViews:
     
     def test_process_page(self, test_client):
         """Test process page."""
-        with patch('web_api.FileManager') as mock_fm:
-            mock_fm.return_value.get_pdf_files.return_value = []
+        with patch('web_api.file_manager') as mock_fm:
+            mock_fm.get_pdf_files.return_value = []
             response = test_client.get("/process")
             assert response.status_code == 200
     
@@ -156,19 +183,47 @@ class TestAPIEndpoints:
             {"id": 2, "filename": "test2.pdf"}
         ]
         mock_db.get_all_pdfs.return_value = expected_pdfs
+        mock_db.get_pdf_documents_version.return_value = "pdfs"
         
         response = test_client.get("/api/pdfs")
         assert response.status_code == 200
         assert response.json() == expected_pdfs
     
+    def test_get_pdfs_paginated(self, test_client, mock_db):
+        """Test GET /api/pdfs with limit and offset."""
+        mock_db.get_all_pdfs.return_value = [{"id": 3, "filename": "test3.pdf"}]
+        mock_db.get_pdf_documents_version.return_value = "paged"
+        
+        response = test_client.get("/api/pdfs?limit=1&offset=2")
+        assert response.status_code == 200
+        assert response.json() == [{"id": 3, "filename": "test3.pdf"}]
+        mock_db.get_all_pdfs.assert_called_once_with(limit=1, offset=2)
+        
+        assert test_client.get("/api/pdfs?limit=0").status_code == 422
+    
+    def test_stream_pdfs_ndjson(self, test_client, mock_db):
+        """Test GET /api/pdfs.ndjson streams one JSON document per line."""
+        import json
+        
+        mock_db.iter_all_pdfs.return_value = iter([
+            [{"id": 1, "filename": "test1.pdf"}, {"id": 2, "filename": "test2.pdf"}],
+            [{"id": 3, "filename": "test3.pdf"}]
+        ])
+        
+        response = test_client.get("/api/pdfs.ndjson")
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert [json.loads(line)["id"] for line in response.text.splitlines()] == [1, 2, 3]
+    
     def test_get_pdf_by_id_found(self, test_client, mock_db):
         """Test GET /api/pdf/{pdf_id} with existing PDF."""
-        mock_db.get_pdf_by_id.return_value = {
+        mock_db.get_pdf_with_children.return_value = {
             "id": 1,
-            "filename": "test.pdf"
+            "filename": "test.pdf",
+            "images": [],
+            "text": None
         }
-        mock_db.get_images_by_pdf_id.return_value = []
-        mock_db.get_text_by_pdf_id.return_value = None
         
         response = test_client.get("/api/pdf/1")
         assert response.status_code == 200
@@ -179,40 +234,45 @@ class TestAPIEndpoints:
     
     def test_get_pdf_by_id_not_found(self, test_client, mock_db):
         """Test GET /api/pdf/{pdf_id} with non-existing PDF."""
-        mock_db.get_pdf_by_id.return_value = None
+        mock_db.get_pdf_with_children.return_value = None
         
         response = test_client.get("/api/pdf/999")
         assert response.status_code == 404
     
     def test_get_pdf_by_filename_found(self, test_client, mock_db):
         """Test GET /api/pdf/by-filename/{filename}."""
-        mock_db.get_pdf_by_filename.return_value = {
+        mock_db.get_pdf_with_children.return_value = {
             "id": 1,
-            "filename": "test.pdf"
+            "filename": "test.pdf",
+            "images": [],
+            "text": None
         }
-        mock_db.get_images_by_pdf_id.return_value = []
-        mock_db.get_text_by_pdf_id.return_value = None
         
         response = test_client.get("/api/pdf/by-filename/test.pdf")
         assert response.status_code == 200
         assert response.json()["filename"] == "test.pdf"
+        mock_db.get_pdf_with_children.assert_called_once_with(filename="test.pdf")
     
     def test_get_stats_empty(self, test_client, mock_db):
         """Test GET /api/stats with no PDFs."""
-        mock_db.get_all_pdfs.return_value = []
+        mock_db.get_pdf_documents_version.return_value = "empty"
+        mock_db.get_statistics.return_value = {
+            "total_pdfs": 0, "total_pages": 0, "total_words": 0, "total_images": 0
+        }
         
         response = test_client.get("/api/stats")
         assert response.status_code == 200
         data = response.json()
         assert data["total_pdfs"] == 0
         assert data["total_pages"] == 0
+        assert data["avg_pages"] == 0
     
     def test_get_stats_with_data(self, test_client, mock_db):
         """Test GET /api/stats with PDF data."""
-        mock_db.get_all_pdfs.return_value = [
-            {"num_pages": 10, "total_words": 1000, "total_images": 5},
-            {"num_pages": 20, "total_words": 2000, "total_images": 3}
-        ]
+        mock_db.get_pdf_documents_version.return_value = "with-data"
+        mock_db.get_statistics.return_value = {
+            "total_pdfs": 2, "total_pages": 30, "total_words": 3000, "total_images": 8
+        }
         
         response = test_client.get("/api/stats")
         assert response.status_code == 200
@@ -224,10 +284,40 @@ class TestAPIEndpoints:
         assert data["avg_pages"] == 15.0
         assert data["avg_words"] == 1500.0
     
+    def test_get_stats_etag(self, test_client, mock_db):
+        """Test that unchanged data is served from cache or as 304."""
+        mock_db.get_pdf_documents_version.return_value = "v1"
+        mock_db.get_statistics.return_value = {
+            "total_pdfs": 1, "total_pages": 4, "total_words": 10, "total_images": 0
+        }
+        
+        response = test_client.get("/api/stats")
+        etag = response.headers["etag"]
+        assert test_client.get("/api/stats").json()["total_pages"] == 4
+        assert mock_db.get_statistics.call_count == 1
+        
+        response = test_client.get("/api/stats", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        
+        mock_db.get_pdf_documents_version.return_value = "v2"
+        response = test_client.get("/api/stats", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert mock_db.get_statistics.call_count == 2
+    
+    def test_large_json_responses_are_gzipped(self, test_client, mock_db):
+        """Test that large API responses are compressed for clients accepting gzip."""
+        mock_db.get_all_pdfs.return_value = [{"id": i, "filename": f"test{i}.pdf"} for i in range(200)]
+        mock_db.get_pdf_documents_version.return_value = "gzip"
+        
+        response = test_client.get("/api/pdfs", headers={"Accept-Encoding": "gzip"})
+        
+        assert response.headers["content-encoding"] == "gzip"
+        assert len(response.json()) == 200
+    
     def test_get_pending_files(self, test_client):
         """Test GET /api/pending endpoint."""
-        with patch('web_api.FileManager') as mock_fm:
-            mock_fm.return_value.get_pdf_files.return_value = [
+        with patch('web_api.file_manager') as mock_fm:
+            mock_fm.get_pdf_files.return_value = [
                 Path("test1.pdf"),
                 Path("test2.pdf")
             ]
@@ -266,6 +356,49 @@ class TestFileUpload:
         assert data["success"] is True
         assert data["uploaded"] == 2
     
+    def test_upload_large_pdf(self, test_client):
+        """Test that an upload spooled to disk is saved intact and atomically."""
+        import web_api
+        
+        content = bytes(range(256)) * 12000  # ~3 MB, larger than the spool size
+        files = {"files": ("large.pdf", content, "application/pdf")}
+        
+        response = test_client.post("/api/upload", files=files)
+        assert response.json()["uploaded"] == 1
+        
+        pending_dir = web_api.config.PENDING_DIR
+        assert (pending_dir / "large.pdf").read_bytes() == content
+        assert not list(pending_dir.glob("*.part"))
+    
+    def test_save_upload_from_memory(self, temp_dir):
+        """Test the buffered fallback for file objects without a descriptor."""
+        import io
+        from web_api import _save_upload
+        
+        _save_upload(io.BytesIO(b"in memory"), temp_dir / "mem.pdf")
+        
+        assert (temp_dir / "mem.pdf").read_bytes() == b"in memory"
+        assert not (temp_dir / "mem.pdf.part").exists()
+    
+    def test_upload_existing_pdf_rejected(self, test_client):
+        """Test that files already pending, or repeated in the request, are not overwritten."""
+        import web_api
+        
+        (web_api.config.PENDING_DIR / "old.pdf").write_bytes(b"old content")
+        files = [
+            ("files", ("old.pdf", b"new content", "application/pdf")),
+            ("files", ("new.pdf", b"first", "application/pdf")),
+            ("files", ("new.pdf", b"second", "application/pdf"))
+        ]
+        
+        response = test_client.post("/api/upload", files=files)
+        data = response.json()
+        
+        assert data["files"] == ["new.pdf"]
+        assert len(data["errors"]) == 2
+        assert (web_api.config.PENDING_DIR / "old.pdf").read_bytes() == b"old content"
+        assert (web_api.config.PENDING_DIR / "new.pdf").read_bytes() == b"first"
+    
     def test_upload_non_pdf_rejected(self, test_client):
         """Test that non-PDF files are rejected."""
         files = {"files": ("test.txt", b"text content", "text/plain")}
@@ -287,14 +420,50 @@ class TestProcessing:
     
     def test_process_pdfs_empty(self, test_client, mock_db):
         """Test processing with no pending files."""
-        with patch('web_api.FileManager') as mock_fm:
-            mock_fm.return_value.get_pdf_files.return_value = []
+        with patch('web_api.file_manager') as mock_fm:
+            mock_fm.get_pdf_files.return_value = []
             
             response = test_client.post("/api/process")
             assert response.status_code == 200
             data = response.json()
             assert data["success"] is True
             assert data["processed"] == 0
+    
+    def test_process_pdfs_saves_results_serially(self, test_client, mock_db):
+        """Test that extraction results are saved one by one in this process."""
+        pdf_files = [Path("a.pdf"), Path("b.pdf"), Path("c.pdf")]
+        results = [
+            (pdf_files[0], {"filename": "a.pdf", "error": None}, None),
+            (pdf_files[1], None, RuntimeError("boom")),
+            (pdf_files[2], {"filename": "c.pdf", "error": None}, None),
+        ]
+        mock_db.pdf_exists_many.return_value = set()
+        mock_db.pdf_exists_by_hash_many.return_value = set()
+        
+        with patch('web_api.file_manager') as mock_fm, \
+                patch('web_api.iter_results', return_value=results) as mock_iter, \
+                patch('web_api.save_result', return_value=True) as mock_save:
+            mock_fm.get_pdf_files.return_value = pdf_files
+            mock_fm.get_file_hashes.side_effect = lambda paths: [f"hash-{p.stem}" for p in paths]
+            
+            response = test_client.post("/api/process")
+            data = response.json()
+            
+            assert data["processed"] == 2
+            assert data["errors"] == 1
+            pending = mock_iter.call_args[0][0]
+            assert [p for p, _ in pending] == pdf_files
+            assert mock_save.call_count == 2
+            mock_save.assert_any_call(mock_db, results[2][1], "hash-c")
+    
+    def test_process_pdfs_refused_while_running(self, test_client, mock_db):
+        """Test that a second processing run is refused while one is in progress."""
+        import web_api
+        
+        with web_api._process_lock, patch('web_api.file_manager') as mock_fm:
+            response = test_client.post("/api/process")
+            assert response.status_code == 409
+            mock_fm.get_pdf_files.assert_not_called()
 
 
 class TestEmbeddingsAPI:
@@ -302,13 +471,8 @@ class TestEmbeddingsAPI:
     
     def test_generate_embeddings_success(self, test_client, mock_db, mock_embeddings_manager):
         """Test generating embeddings for a PDF."""
-        mock_db.get_pdf_by_id.return_value = {
-            "id": 1,
-            "filename": "test.pdf"
-        }
-        mock_db.get_text_by_pdf_id.return_value = {
-            "filename": "test_text.txt"
-        }
+        mock_db.get_pdf_by_id.return_value = {"id": 1, "filename": "test.pdf"}
+        mock_db.get_text_by_pdf_id.return_value = {"filename": "test_text.txt"}
         mock_embeddings_manager.add_pdf_embeddings.return_value = 10
         
         with patch('web_api.config') as mock_config:
@@ -323,6 +487,7 @@ class TestEmbeddingsAPI:
                 data = response.json()
                 assert data["success"] is True
                 assert data["embeddings_count"] == 10
+                mock_db.get_pdf_with_children.assert_not_called()
             finally:
                 shutil.rmtree(temp_dir)
     
@@ -341,6 +506,77 @@ class TestEmbeddingsAPI:
         response = test_client.post("/api/embeddings/generate/1")
         assert response.status_code == 400
     
+    def test_generate_all_embeddings(self, test_client, mock_db, mock_embeddings_manager):
+        """Test generating embeddings for every PDF in one batched call."""
+        mock_db.get_pdfs_without_embeddings.return_value = [
+            {"id": 1, "filename": "a.pdf"},
+            {"id": 2, "filename": "b.pdf"},
+            {"id": 3, "filename": "missing.pdf"}
+        ]
+        mock_db.get_texts_by_pdf_ids.side_effect = lambda pdf_ids: {
+            pdf_id: {"filename": f"text_{pdf_id}.txt"} for pdf_id in pdf_ids
+        }
+        mock_embeddings_manager.add_pdfs_embeddings.side_effect = lambda pdfs: [
+            (pdf_id, filename, len(text.split()), None) for pdf_id, filename, text in pdfs
+        ]
+        
+        with patch('web_api.config') as mock_config:
+            temp_dir = Path(tempfile.mkdtemp())
+            mock_config.TEXT_DIR = temp_dir
+            (temp_dir / "text_1.txt").write_text("one two")
+            (temp_dir / "text_2.txt").write_text("three")
+            
+            try:
+                response = test_client.post("/api/embeddings/generate-all")
+                assert response.status_code == 200
+                data = response.json()
+                assert data["processed"] == 2
+                assert data["errors"] == 1
+                mock_embeddings_manager.add_pdfs_embeddings.assert_called_once()
+                mock_db.update_embeddings_status_many.assert_called_once_with([(1, 2), (2, 1)])
+            finally:
+                shutil.rmtree(temp_dir)
+    
+    def test_generate_all_embeddings_failed_batch(self, test_client, mock_db, mock_embeddings_manager):
+        """Test that PDFs of a failed batch are reported while the other batches are saved."""
+        mock_db.get_pdfs_without_embeddings.return_value = [
+            {"id": 1, "filename": "a.pdf"},
+            {"id": 2, "filename": "b.pdf"}
+        ]
+        mock_db.get_texts_by_pdf_ids.side_effect = lambda pdf_ids: {
+            pdf_id: {"filename": f"text_{pdf_id}.txt"} for pdf_id in pdf_ids
+        }
+        mock_embeddings_manager.add_pdfs_embeddings.side_effect = lambda pdfs: [
+            (pdf_id, filename, 0, "disk full") if pdf_id == 1 else (pdf_id, filename, 3, None)
+            for pdf_id, filename, text in pdfs
+        ]
+        
+        with patch('web_api.config') as mock_config:
+            temp_dir = Path(tempfile.mkdtemp())
+            mock_config.TEXT_DIR = temp_dir
+            (temp_dir / "text_1.txt").write_text("one")
+            (temp_dir / "text_2.txt").write_text("two")
+            
+            try:
+                response = test_client.post("/api/embeddings/generate-all")
+                assert response.status_code == 200
+                data = response.json()
+                assert data["success"] is False
+                assert data["processed"] == 1
+                assert data["error_details"] == ["a.pdf: disk full"]
+                mock_db.update_embeddings_status_many.assert_called_once_with([(2, 3)])
+            finally:
+                shutil.rmtree(temp_dir)
+    
+    def test_generate_all_embeddings_refused_while_running(self, test_client, mock_db, mock_embeddings_manager):
+        """Test that a second generate-all run is refused while one is in progress."""
+        import web_api
+        
+        with web_api._generate_all_lock:
+            response = test_client.post("/api/embeddings/generate-all")
+        assert response.status_code == 409
+        mock_db.get_pdfs_without_embeddings.assert_not_called()
+    
     def test_delete_embeddings(self, test_client, mock_embeddings_manager, mock_db):
         """Test deleting embeddings for a PDF."""
         mock_embeddings_manager.delete_pdf_embeddings.return_value = 5
@@ -358,8 +594,9 @@ class TestEmbeddingsAPI:
             "total_embeddings": 100,
             "model_name": "test-model"
         }
-        mock_db.get_pdfs_with_embeddings.return_value = [{"id": 1}, {"id": 2}]
-        mock_db.get_pdfs_without_embeddings.return_value = [{"id": 3}]
+        mock_db.get_embeddings_statistics.return_value = {
+            "pdfs_with_embeddings": 2, "pdfs_without_embeddings": 1, "total_embeddings_chunks": 20
+        }
         
         response = test_client.get("/api/embeddings/stats")
         assert response.status_code == 200
@@ -368,6 +605,35 @@ class TestEmbeddingsAPI:
         assert data["pdfs_with_embeddings"] == 2
         assert data["pdfs_without_embeddings"] == 1
     
+    def test_embeddings_stats_cached_until_changed(self, test_client, mock_db, mock_embeddings_manager):
+        """Test that collection statistics are reused until embeddings change."""
+        mock_embeddings_manager.get_collection_stats.return_value = {"total_embeddings": 100}
+        mock_embeddings_manager.delete_pdf_embeddings.return_value = 40
+        mock_db.get_embeddings_statistics.return_value = {
+            "pdfs_with_embeddings": 2, "pdfs_without_embeddings": 1, "total_embeddings_chunks": 100
+        }
+        
+        test_client.get("/api/embeddings/stats")
+        test_client.get("/api/embeddings/stats")
+        assert mock_embeddings_manager.get_collection_stats.call_count == 1
+        
+        test_client.delete("/api/embeddings/1")
+        test_client.get("/api/embeddings/stats")
+        assert mock_embeddings_manager.get_collection_stats.call_count == 2
+    
+    def test_startup_warms_up_embeddings(self, mock_embeddings_manager):
+        """Test that the server startup loads the embedding model in the background."""
+        import threading
+        from web_api import app
+        
+        warmed_up = threading.Event()
+        mock_embeddings_manager.generate_embeddings.side_effect = lambda texts: warmed_up.set()
+        
+        with patch('web_api.config') as mock_config:
+            mock_config.WARM_UP_EMBEDDINGS = True
+            with TestClient(app):
+                assert warmed_up.wait(5)
+    
     def test_search_embeddings(self, test_client, mock_db, mock_embeddings_manager):
         """Test semantic search endpoint."""
         mock_embeddings_manager.search_embeddings.return_value = {
@@ -376,22 +642,33 @@ class TestEmbeddingsAPI:
                     "document": "test content",
                     "distance": 0.5,
                     "metadata": {"pdf_id": 1, "chunk_index": 0}
+                },
+                {
+                    "document": "more content",
+                    "distance": 0.6,
+                    "metadata": {"pdf_id": 1, "chunk_index": 1}
+                },
+                {
+                    "document": "orphan content",
+                    "distance": 0.7,
+                    "metadata": {"pdf_id": 2, "chunk_index": 0}
                 }
             ],
             "query": "test query"
         }
-        mock_db.get_pdf_by_id.return_value = {
-            "id": 1,
-            "filename": "test.pdf",
-            "title": "Test PDF"
+        mock_db.get_pdf_summaries_by_ids.return_value = {
+            1: {"id": 1, "filename": "test.pdf", "title": "Test PDF"}
         }
         
         response = test_client.post("/api/search", json={"query": "test query"})
         assert response.status_code == 200
         data = response.json()
         assert "results" in data
-        assert len(data["results"]) == 1
-        assert "pdf_info" in data["results"][0]
+        assert len(data["results"]) == 3
+        assert data["results"][0]["pdf_info"]["filename"] == "test.pdf"
+        assert data["results"][1]["pdf_info"]["title"] == "Test PDF"
+        assert "pdf_info" not in data["results"][2]
+        mock_db.get_pdf_summaries_by_ids.assert_called_once_with({1, 2})
     
     def test_search_embeddings_no_query(self, test_client):
         """Test search endpoint without query."""
@@ -432,3 +709,59 @@ class TestFileDownload:
                 assert response.status_code == 404
             finally:
                 shutil.rmtree(temp_dir)
+    
+    def test_get_text_gzip_sidecar(self, test_client):
+        """Test that text is served from the gzip sidecar when accepted."""
+        from file_manager import FileManager
+        
+        with patch('web_api.config') as mock_config:
+            temp_dir = Path(tempfile.mkdtemp())
+            mock_config.TEXT_DIR = temp_dir
+            filename, _ = FileManager.save_text_file("doc", ["page one", "page two"], temp_dir, "abcd1234")
+            
+            try:
+                response = test_client.get(f"/api/text/{filename}", headers={"Accept-Encoding": "gzip"})
+                assert response.status_code == 200
+                assert response.headers["content-encoding"] == "gzip"
+                assert response.text == "page one\npage two"
+                
+                response = test_client.get(f"/api/text/{filename}", headers={"Accept-Encoding": "identity"})
+                assert "content-encoding" not in response.headers
+                assert response.text == "page one\npage two"
+            finally:
+                shutil.rmtree(temp_dir)
+    
+    def test_get_image_not_modified(self, test_client):
+        """Test that a repeated image request with its ETag gets a 304."""
+        with patch('web_api.config') as mock_config:
+            temp_dir = Path(tempfile.mkdtemp())
+            mock_config.IMAGES_DIR = temp_dir
+            (temp_dir / "img.png").write_bytes(b"png data")
+            
+            try:
+                response = test_client.get("/api/image/img.png")
+                assert response.status_code == 200
+                assert response.content == b"png data"
+                assert "max-age" in response.headers["cache-control"]
+                etag = response.headers["etag"]
+                
+                response = test_client.get("/api/image/img.png", headers={"If-None-Match": etag})
+                assert response.status_code == 304
+                assert response.content == b""
+                
+                response = test_client.get("/api/image/img.png", headers={"If-None-Match": '"other"'})
+                assert response.status_code == 200
+                
+                assert test_client.get("/api/image/missing.png").status_code == 404
+            finally:
+                shutil.rmtree(temp_dir)
+    
+    def test_file_path_refuses_other_directories(self):
+        """Test that only plain file names are joined onto a data directory."""
+        import os
+        from web_api import _file_path
+        
+        assert _file_path("/data/images", "img.png") == os.path.join("/data/images", "img.png")
+        assert _file_path("/data/images", "a..b.png") == os.path.join("/data/images", "a..b.png")
+        for name in ("", ".", "..", "../secret.db", "sub/img.png", "..\\secret.db"):
+            assert _file_path("/data/images", name) is None
@@ -12,19 +12,23 @@ sys.path.insert(0, str(src_path))
 
 if __name__ == "__main__":
     import uvicorn
-    from web_api import app
+    import config
     
     print("=" * 60)
     print("Starting PDF-Insight Web Interface")
     print("=" * 60)
-    print("Access the application at: http://localhost:8000")
+    print(f"Access the application at: http://localhost:{config.WEB_PORT}")
     print("Press CTRL+C to stop the server")
     print("=" * 60)
     
+    # loop/http "auto" pick uvloop and httptools when installed (uvicorn[standard])
     uvicorn.run(
         "web_api:app",
-        host="0.0.0.0",
-        port=8011,
-        reload=True,
+        host=config.WEB_HOST,
+        port=config.WEB_PORT,
+        reload=config.WEB_RELOAD,
+        workers=None if config.WEB_RELOAD else config.WEB_WORKERS,
+        loop="auto",
+        http="auto",
         log_level="info"
     )